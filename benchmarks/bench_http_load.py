@@ -0,0 +1,192 @@
+# benchmarks/bench_http_load.py
+"""Test de încărcare HTTP: throughput și latență la cereri concurente pe API-ul backend.
+
+Rulare (din rădăcina repo-ului):
+    # server local pe SQLite, cu latență de rețea emulată în driverul DB
+    python benchmarks/bench_http_load.py --serve --db-latency-ms 5 --concurrency 64 --duration 15
+    # sau contra unui deployment existent
+    python benchmarks/bench_http_load.py --url http://localhost:8000 --concurrency 64
+
+Cu --serve, uvicorn pornește într-un proces separat pe o bază SQLite temporară cu
+--files fișiere. --db-latency-ms adaugă o pauză la fiecare statement, în thread-ul
+care execută statement-ul (trace callback sqlite3), ca un round-trip la MySQL: cu un
+driver sincron blochează event loop-ul, cu aiosqlite doar thread-ul driverului.
+"""
+import argparse
+import asyncio
+import datetime
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+import httpx
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def seed(db_path: str, n_files: int) -> list:
+    """Creează schema și n_files rânduri în `files` (driver sincron, înainte de server)."""
+    sys.path.insert(0, ROOT_DIR)
+    from sqlalchemy import create_engine
+    from model.base import Base
+    from model.file_model import File
+    import model.report_model  # noqa: F401  (tabela reports)
+
+    engine = create_engine(f"sqlite:///{db_path}")
+    Base.metadata.create_all(engine)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    ids = [str(uuid.uuid4()) for _ in range(n_files)]
+    rows = [
+        {"id": i, "name": f"bench_{k}.csv", "path": f"/files/{i}.csv", "brand": "mastercard" if k % 2 else "visa",
+         "timestamp": now, "row_count": 1000, "invalid_rows": 0, "downgraded_transaction": 0}
+        for k, i in enumerate(ids)
+    ]
+    with engine.begin() as conn:
+        conn.execute(File.__table__.insert(), rows)
+    engine.dispose()
+    return ids
+
+
+def serve(port: int, db_path: str, latency_ms: float) -> None:
+    """Procesul server (pornit de --serve): aplicația reală, opțional cu latență DB."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{db_path}"
+    os.chdir(ROOT_DIR)
+    sys.path.insert(0, ROOT_DIR)
+    import uvicorn
+    from sqlalchemy import event
+    import db
+
+    if latency_ms > 0:
+        sync_engine = getattr(db.engine, "sync_engine", db.engine)
+
+        @event.listens_for(sync_engine, "connect")
+        def _slow(dbapi_conn, record):
+            # sqlite3.Connection: direct (pysqlite) sau din aiosqlite (rulează în thread-ul lui)
+            raw = getattr(getattr(dbapi_conn, "driver_connection", None), "_conn", dbapi_conn)
+            raw.set_trace_callback(lambda _stmt: time.sleep(latency_ms / 1000))
+
+    from app import app
+    uvicorn.run(app, host="127.0.0.1", port=port, log_level="warning")
+
+
+async def run_load(base_url: str, paths: list, concurrency: int, duration: float) -> dict:
+    latencies, errors = [], 0
+    deadline = time.perf_counter() + duration
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60) as client:
+        async def worker():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                t0 = time.perf_counter()
+                try:
+                    r = await client.get(random.choice(paths))
+                    if r.status_code >= 400:
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - t0)
+
+        start = time.perf_counter()
+        stalled = False
+        try:
+            # un server cu event loop-ul blocat nu mai răspunde deloc: oprim după o limită
+            await asyncio.wait_for(asyncio.gather(*(worker() for _ in range(concurrency))), duration + 60)
+        except asyncio.TimeoutError:
+            stalled = True
+        elapsed = time.perf_counter() - start
+        try:
+            pool = (await client.get("/db/pool", timeout=10)).json()
+        except (httpx.HTTPError, ValueError):
+            pool = None
+
+    latencies.sort()
+    pct = lambda p: latencies[min(len(latencies) - 1, int(p * len(latencies)))] * 1000 if latencies else 0.0
+    return {"requests": len(latencies), "errors": errors, "stalled": stalled, "rps": len(latencies) / elapsed,
+            "p50_ms": pct(0.50), "p95_ms": pct(0.95), "p99_ms": pct(0.99), "pool": pool}
+
+
+def _wait_ready(base_url: str, timeout: float = 120) -> None:
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(base_url + "/files/all", timeout=5).status_code < 500:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise RuntimeError("server did not start")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrent HTTP load test for the backend API")
+    parser.add_argument("--url", help="Base URL of a running backend (omit with --serve)")
+    parser.add_argument("--serve", action="store_true", help="Start the app locally on a temporary SQLite DB")
+    parser.add_argument("--files", type=int, default=200, help="Rows seeded into `files` with --serve")
+    parser.add_argument("--db-latency-ms", type=float, default=0.0, help="Emulated per-statement DB latency with --serve")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=15.0, help="Seconds of load")
+    parser.add_argument("--path", action="append", help="Path to request (repeatable; default: GET /files/<id> + /reports/all)")
+    parser.add_argument("--_server", nargs=3, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args._server:
+        port, db_path, latency = args._server
+        serve(int(port), db_path, float(latency))
+        return
+
+    proc = None
+    ids = []
+    if args.serve:
+        tmp = tempfile.mkdtemp()
+        db_path = os.path.join(tmp, "bench.db")
+        ids = seed(db_path, args.files)
+        port = _free_port()
+        proc = subprocess.Popen([sys.executable, os.path.abspath(__file__), "--_server", str(port), db_path,
+                                 str(args.db_latency_ms)])
+        base_url = f"http://127.0.0.1:{port}"
+    elif args.url:
+        base_url = args.url.rstrip("/")
+    else:
+        parser.error("either --url or --serve is required")
+
+    try:
+        _wait_ready(base_url)
+        if args.path:
+            paths = args.path
+        else:
+            if not ids:
+                ids = [f["id"] for f in httpx.get(base_url + "/files/all", timeout=60).json().get("files", [])]
+            paths = [f"/files/{i}" for i in ids[:500]] + ["/reports/all"] * max(1, len(ids[:500]) // 10)
+        res = asyncio.run(run_load(base_url, paths, args.concurrency, args.duration))
+    finally:
+        if proc is not None:
+            proc.terminate()
+            proc.wait()
+
+    print(f"url={base_url} concurrency={args.concurrency} duration={args.duration}s "
+          f"db_latency_ms={args.db_latency_ms if args.serve else 'n/a'}")
+    print(f"{'requests':>9} {'errors':>7} {'req/s':>9} {'p50_ms':>8} {'p95_ms':>8} {'p99_ms':>8}")
+    print(f"{res['requests']:>9} {res['errors']:>7} {res['rps']:>9.1f} {res['p50_ms']:>8.1f} "
+          f"{res['p95_ms']:>8.1f} {res['p99_ms']:>8.1f}")
+    if res["stalled"]:
+        print("server stalled: in-flight requests did not finish within duration + 60s")
+    if res["pool"]:
+        p = res["pool"]
+        print(f"pool: in_use_max={p.get('in_use_max')} checkout_wait_max={p.get('checkout_wait_seconds_max')}s "
+              f"timeouts={p.get('checkout_timeouts')}")
+
+
+if __name__ == "__main__":
+    main()
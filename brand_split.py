@@ -0,0 +1,179 @@
+import csv
+import io
+from typing import Any, Callable, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from file_store import SCHEMAS
+from upload_validation import UploadValidator
+
+# Export mixt (Visa + Mastercard în același fișier) împărțit într-o singură trecere:
+# bucățile primite se taie la ultimul '\n', blocul e parsat de pyarrow (tot ca text,
+# valorile rămân exact ca în sursă), fiecare rând primește un brand, iar rândurile
+# fiecărui brand se scriu în partiția lui, doar cu coloanele brandului. Fiecare
+# partiție trece prin propriul UploadValidator pe măsură ce e scrisă.
+
+# coloane care spun direct brandul rândului (altfel decide grupul de coloane completat)
+BRAND_COLUMNS = ("brand", "card_brand", "scheme", "card_scheme", "network")
+MAX_UNASSIGNED_SAMPLES = 20
+
+
+def partition_columns(header: List[str]) -> Dict[str, List[str]]:
+    """Coloanele fiecărei partiții: cele cu prefixul brandului, primele (brandul se
+    detectează din prima coloană), apoi coloanele comune ale brandului sau ale nimănui."""
+    prefixes = tuple(s.prefix for s in SCHEMAS.values())
+    shared = [c for c in header if not c.lower().startswith(prefixes) and c.lower() not in BRAND_COLUMNS]
+    out = {}
+    for brand, schema in SCHEMAS.items():
+        own = [c for c in header if c.lower().startswith(schema.prefix)]
+        if not own:
+            continue
+        others = [s for s in SCHEMAS.values() if s is not schema]
+        extra = [
+            c for c in shared
+            if c in schema.dtypes or c in schema.required
+            or not any(c in s.dtypes or c in s.required for s in others)
+        ]
+        out[brand] = own + extra
+    return out
+
+
+class BrandSplitter:
+    """`open_partition(brand)` întoarce fișierul binar în care se scrie partiția brandului."""
+
+    def __init__(self, open_partition: Callable[[str], Any]):
+        self.open_partition = open_partition
+        self.header: Optional[List[str]] = None
+        self.columns: Dict[str, List[str]] = {}
+        self.rows = 0
+        self.unassigned = 0
+        self.unassigned_samples: List[int] = []
+        self.counts: Dict[str, int] = {}
+        self._out: Dict[str, Any] = {}
+        self._validators: Dict[str, UploadValidator] = {}
+        self._brand_column: Optional[str] = None
+        self._tail = b""
+
+    def feed(self, chunk: bytes) -> None:
+        self._tail += chunk
+        if self.header is None:
+            nl = self._tail.find(b"\n")
+            if nl < 0:
+                return
+            line, self._tail = self._tail[:nl + 1], self._tail[nl + 1:]
+            self._start(next(csv.reader([line.decode("utf-8-sig").rstrip("\r\n")])))
+        self._flush(final=False)
+
+    def close(self) -> Dict[str, Any]:
+        if self.header is None and self._tail:
+            self.feed(b"\n")
+        if self.header is not None:
+            self._flush(final=True)
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "unassigned_rows": self.unassigned,
+            "unassigned_samples": self.unassigned_samples,
+            "partitions": {
+                brand: {"rows": self.counts.get(brand, 0), "validation": v.close()}
+                for brand, v in self._validators.items()
+            },
+        }
+
+    # -------- intern --------
+    def _start(self, header: List[str]) -> None:
+        self.header = header
+        self.columns = partition_columns(header)
+        self._brand_column = next((c for c in header if c.lower() in BRAND_COLUMNS), None)
+
+    def _partition(self, brand: str):
+        out = self._out.get(brand)
+        if out is None:
+            out = self._out[brand] = self.open_partition(brand)
+            buf = io.StringIO()
+            csv.writer(buf, lineterminator="\n").writerow(self.columns[brand])
+            head = buf.getvalue().encode("utf-8")
+            out.write(head)
+            validator = self._validators[brand] = UploadValidator()
+            validator.feed(head)
+            validator.start(SCHEMAS[brand])
+        return out, self._validators[brand]
+
+    def _flush(self, final: bool) -> None:
+        cut = len(self._tail) if final else self._tail.rfind(b"\n") + 1
+        if cut <= 0:
+            return
+        block, self._tail = self._tail[:cut], self._tail[cut:]
+        if block.strip():
+            self._split(block)
+
+    def _filled(self, table: pa.Table, columns: List[str]) -> pa.Array:
+        filled = None
+        for c in columns:
+            has = pc.not_equal(pc.utf8_trim_whitespace(table.column(c)), "")
+            filled = has if filled is None else pc.or_(filled, has)
+        return filled
+
+    def _split(self, block: bytes) -> None:
+        table = pacsv.read_csv(
+            io.BytesIO(block),
+            read_options=pacsv.ReadOptions(column_names=self.header, use_threads=True),
+            convert_options=pacsv.ConvertOptions(
+                column_types={c: pa.string() for c in self.header},
+                strings_can_be_null=False,
+                quoted_strings_can_be_null=False,
+            ),
+        )
+        n = table.num_rows
+        # grupul de coloane completat: un brand doar dacă exact un grup are valori pe rând
+        groups = {
+            brand: self._filled(table, [c for c in cols if c.lower().startswith(SCHEMAS[brand].prefix)])
+            for brand, cols in self.columns.items()
+        }
+        masks: Dict[str, pa.Array] = {}
+        for brand, filled in groups.items():
+            alone = filled
+            for other, f in groups.items():
+                if other != brand:
+                    alone = pc.and_(alone, pc.invert(f))
+            masks[brand] = alone
+        if self._brand_column is not None:
+            # coloana explicită are prioritate; valorile necunoscute cad pe grupul de coloane
+            value = pc.utf8_lower(pc.utf8_trim_whitespace(table.column(self._brand_column)))
+            is_mc = pc.or_(pc.match_substring(value, "master"), pc.equal(value, "mc"))
+            named = pc.if_else(pc.match_substring(value, "visa"), "visa",
+                               pc.if_else(is_mc, "mastercard", pa.scalar(None, pa.string())))
+            for brand in masks:
+                masks[brand] = pc.if_else(pc.is_null(named), masks[brand], pc.equal(named, brand))
+
+        assigned = pa.array([False] * n)
+        for brand, mask in masks.items():
+            assigned = pc.or_(assigned, mask)
+            count = pc.sum(mask).as_py() or 0
+            if not count:
+                continue
+            out, validator = self._partition(brand)
+            part = table.filter(mask).select(self.columns[brand])
+            buf = io.BytesIO()
+            try:
+                pacsv.write_csv(part, buf, pacsv.WriteOptions(include_header=False, quoting_style="none"))
+            except pa.ArrowInvalid:   # virgule/ghilimele în valori: se citează
+                buf = io.BytesIO()
+                pacsv.write_csv(part, buf, pacsv.WriteOptions(include_header=False, quoting_style="needed"))
+            data = buf.getvalue()
+            out.write(data)
+            validator.feed(data)
+            self.counts[brand] = self.counts.get(brand, 0) + count
+
+        missing = pc.invert(assigned)
+        lost = pc.sum(missing).as_py() or 0
+        if lost:
+            room = MAX_UNASSIGNED_SAMPLES - len(self.unassigned_samples)
+            if room > 0:
+                self.unassigned_samples += [self.rows + i + 2 for i in pc.indices_nonzero(missing)[:room].to_pylist()]
+            self.unassigned += lost
+        self.rows += n
@@ -1,8 +1,13 @@
+import os
 from fastapi import FastAPI
 from compliance_controller import router
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from src.compliance.serialization import CompactJSONResponse
+from src.compliance.compression import GZIP_LEVEL
 
-app = FastAPI()
+# răspunsurile JSON se randează compact cu orjson (compliance.serialization)
+app = FastAPI(default_response_class=CompactJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -12,6 +17,10 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# răspunsurile mari se comprimă cu gzip dacă clientul îl acceptă (Accept-Encoding);
+# cele care au deja Content-Encoding (rapoartele stocate comprimat) trec neatinse
+app.add_middleware(GZipMiddleware, minimum_size=int(os.getenv("GZIP_MIN_BYTES", "1024")), compresslevel=GZIP_LEVEL)
+
 # Înregistrează rutele definite în controller/routes.py
 app.include_router(router)
 
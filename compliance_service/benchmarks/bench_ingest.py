@@ -0,0 +1,69 @@
+# benchmarks/bench_ingest.py
+"""Citire tipizată (pyarrow, coloane selectate) vs pd.read_csv cu inferență.
+
+Rulare (din compliance_service/):
+    python benchmarks/bench_ingest.py --rows 1000000
+"""
+import argparse
+import os, sys
+import tempfile
+import time
+
+import pandas as pd
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [os.path.join(SERVICE_DIR, "src")]
+os.chdir(SERVICE_DIR)
+
+from compliance.ingest import detect_brand, get_schema, read_csv_typed  # noqa: E402
+from compliance.mapper_mastercard import INPUT_COLUMNS as MC_INPUT_COLUMNS  # noqa: E402
+from compliance.mapper_visa import INPUT_COLUMNS as VISA_INPUT_COLUMNS  # noqa: E402
+
+
+def best_of(fn, repeat):
+    best, out = float("inf"), None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, out
+
+
+def main():
+    parser = argparse.ArgumentParser(description="CSV ingestion benchmark")
+    parser.add_argument("--input", default="data/mastercard_transactions_final.csv")
+    parser.add_argument("--rows", type=int, default=1_000_000, help="Input is replicated up to this many rows")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing per reader")
+    args = parser.parse_args()
+
+    seed = pd.read_csv(args.input, dtype=str, keep_default_na=False)
+    brand = detect_brand(list(seed.columns))
+    schema = get_schema(brand)
+    mapper_cols = MC_INPUT_COLUMNS if brand == "mastercard" else VISA_INPUT_COLUMNS
+    reps = -(-args.rows // len(seed))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "bench.csv")
+        pd.concat([seed] * reps, ignore_index=True).iloc[:args.rows].to_csv(path, index=False)
+        size_mb = os.path.getsize(path) / 1e6
+        features = [c for c in schema.features if c in seed.columns]
+        compliance = [c for c in mapper_cols if c in seed.columns]
+
+        cases = [
+            ("pd.read_csv (all, inferred)", lambda: pd.read_csv(path)),
+            ("read_csv_typed (all)", lambda: read_csv_typed(path, brand)),
+            ("pd.read_csv (features, usecols)", lambda: pd.read_csv(path, usecols=features)),
+            ("read_csv_typed (features)", lambda: read_csv_typed(path, brand, features)),
+            ("pd.read_csv (compliance, usecols)", lambda: pd.read_csv(path, usecols=compliance)),
+            ("read_csv_typed (compliance)", lambda: read_csv_typed(path, brand, compliance)),
+        ]
+        print(f"rows={args.rows} size={size_mb:.1f}MB brand={brand} cpus={os.cpu_count()}")
+        print(f"{'reader':<36} {'best_s':>8} {'MB/s':>8} {'mem_MB':>8}")
+        for name, fn in cases:
+            t, df = best_of(fn, args.repeat)
+            mem = df.memory_usage(index=True, deep=True).sum() / 1e6
+            print(f"{name:<36} {t:>8.3f} {size_mb / t:>8.1f} {mem:>8.1f}")
+
+
+if __name__ == "__main__":
+    main()
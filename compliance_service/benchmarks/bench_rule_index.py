@@ -0,0 +1,68 @@
+# benchmarks/bench_rule_index.py
+"""Dispatch indexat vs. evaluarea fiecărei reguli pe toate rândurile, pe un ruleset sintetic
+de tip "interchange qualification table" (mii de reguli cu gărzi de egalitate).
+
+Rulare (din compliance_service/):
+    python benchmarks/bench_rule_index.py --rules 3000
+"""
+import argparse
+import functools
+import itertools
+import os, sys
+import time
+
+import numpy as np
+import pandas as pd
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [SERVICE_DIR, os.path.join(SERVICE_DIR, "src")]
+os.chdir(SERVICE_DIR)  # mapper-ul MC caută data/bin_table*.csv relativ
+
+from main import map_by_format  # noqa: E402
+from compliance.compiler import compile_rule, rule_hits  # noqa: E402
+from compliance.facts import derive_facts  # noqa: E402
+from compliance.ruleset import load_ruleset  # noqa: E402
+
+
+def synthetic_rules(facts: pd.DataFrame, count: int) -> list:
+    countries = sorted(facts["merchant_country"].dropna().unique()) + [f"X{i}" for i in range(40)]
+    combos = itertools.product(["Mastercard", "Visa"], countries, ["ECOM", "POS"],
+                               sorted(facts["pos_entry_mode"].unique()) + ["00", "07"])
+    rules = []
+    for i, (brand, cc, ch, pem) in enumerate(itertools.islice(combos, count)):
+        rules.append(compile_rule({
+            "id": f"Q{i}", "title": "", "message": "", "remediation": "", "severity": "LOW",
+            "when": f"brand == '{brand}' and merchant_country == '{cc}' and channel == '{ch}' "
+                    f"and pos_entry_mode == '{pem}' and amount > {50 + i % 200}",
+        }))
+    return rules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Indexed rule dispatch benchmark")
+    parser.add_argument("--input", default="data/mastercard_transactions_final.csv")
+    parser.add_argument("--rows", type=int, default=50_000)
+    parser.add_argument("--rules", type=int, default=3000)
+    args = parser.parse_args()
+
+    thresholds, base_rules = load_ruleset("config")
+    seed = pd.read_csv(args.input)
+    df_raw = pd.concat([seed] * -(-args.rows // len(seed)), ignore_index=True).iloc[:args.rows]
+    facts = derive_facts(map_by_format(df_raw, force_format="auto").reset_index(drop=True), thresholds)
+    rules = base_rules + synthetic_rules(facts, args.rules)
+    print(f"rows={len(facts)} rules={len(rules)}")
+
+    timings = {}
+    results = {}
+    for name, fn in [("indexed", functools.partial(rule_hits, indexed=True)),
+                     ("full_scan", functools.partial(rule_hits, indexed=False))]:
+        t0 = time.perf_counter()
+        results[name] = fn(facts, rules)
+        timings[name] = time.perf_counter() - t0
+        print(f"{name:>10}: {timings[name]:8.3f}s")
+    same = all(np.array_equal(results["indexed"][r["id"]], results["full_scan"][r["id"]]) for r in rules)
+    print(f"speedup={timings['full_scan'] / timings['indexed']:.1f}x identical_hits={same}")
+
+
+if __name__ == "__main__":
+    main()
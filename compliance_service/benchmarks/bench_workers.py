@@ -0,0 +1,52 @@
+# benchmarks/bench_workers.py
+"""Scaling benchmark pentru evaluarea paralelă: 1..16 workeri pe același input.
+
+Rulare (din compliance_service/):
+    python benchmarks/bench_workers.py --rows 200000
+"""
+import argparse
+import functools
+import os, sys
+import time
+
+import pandas as pd
+
+SERVICE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [SERVICE_DIR, os.path.join(SERVICE_DIR, "src")]
+os.chdir(SERVICE_DIR)  # mapper-ul MC caută data/bin_table*.csv relativ
+
+from main import map_by_format  # noqa: E402
+from compliance.parallel import run_compliance_parallel  # noqa: E402
+from compliance.ruleset import load_ruleset  # noqa: E402
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compliance parallel scaling benchmark")
+    parser.add_argument("--input", default="data/mastercard_transactions_final.csv")
+    parser.add_argument("--rows", type=int, default=200_000, help="Input is replicated up to this many rows")
+    parser.add_argument("--workers", default="1,2,4,8,16", help="Comma-separated worker counts")
+    parser.add_argument("--repeat", type=int, default=3, help="Best-of-N timing per worker count")
+    args = parser.parse_args()
+
+    thresholds, rules = load_ruleset("config")
+    seed = pd.read_csv(args.input)
+    reps = -(-args.rows // len(seed))
+    df_raw = pd.concat([seed] * reps, ignore_index=True).iloc[:args.rows]
+
+    print(f"rows={len(df_raw)} rules={len(rules)} cpus={os.cpu_count()}")
+    print(f"{'workers':>7} {'best_s':>8} {'rows/s':>10} {'speedup':>8}")
+    map_fn = functools.partial(map_by_format, force_format="auto")
+    base = None
+    for w in [int(x) for x in args.workers.split(",")]:
+        best = float("inf")
+        for _ in range(args.repeat):
+            t0 = time.perf_counter()
+            _, summary = run_compliance_parallel(df_raw, map_fn, thresholds, rules, workers=w)
+            best = min(best, time.perf_counter() - t0)
+        base = base or best
+        print(f"{w:>7} {best:>8.3f} {len(df_raw) / best:>10.0f} {base / best:>7.2f}x"
+              f"   non_compliant={summary['non_compliant']}")
+
+
+if __name__ == "__main__":
+    main()
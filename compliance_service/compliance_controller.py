@@ -1,11 +1,13 @@
 # controller/compliance_controller.py
-import io, os, sys, uuid
+import datetime, functools, io, os, sys, threading, uuid
 from typing import Dict, Any, List, Optional
 
-from fastapi import APIRouter, UploadFile, File, Form, HTTPException
+from fastapi import APIRouter, BackgroundTasks, UploadFile, File, Form, HTTPException, Query
+from sqlalchemy import select, text
+from sqlalchemy.exc import SQLAlchemyError
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 import pandas as pd
-import yaml
 
 # permite import din pachet
 BASE_DIR = os.path.dirname(os.path.dirname(__file__))          # smartpay/
@@ -14,27 +16,90 @@ sys.path.append(PKG_SRC)
 
 # pipeline
 from src.compliance.facts import derive_facts
-from src.compliance.evaluator import run_rules
-from src.compliance.impact import estimate_impact
-from src.compliance.mapper_mastercard import map_mastercard
-from src.compliance.mapper_visa import map_visa   # <-- NOU
+from src.compliance.evaluator import (run_rules, assemble_findings, hits_from_results, summarize_hits, finding_records,
+                                     RESULT_COLUMNS)
+from src.compliance.simulate import run_scenarios
+from src.compliance.impact import estimate_impact, IMPACT_COLUMNS
+from src.compliance.config_manager import ConfigManager, Ruleset
+from src.compliance.compiler import get_dag
+from src.compliance.incremental import FILE_ID_RE, state_dir, save_state, refresh_state
+from src.compliance.result_cache import ResultCache, cache_key, pack_entry, unpack_hits
+from src.compliance.mapper_mastercard import map_mastercard, INPUT_COLUMNS as MC_INPUT_COLUMNS
+from src.compliance.mapper_visa import map_visa, INPUT_COLUMNS as VISA_INPUT_COLUMNS   # <-- NOU
+from src.compliance.sidecar import FRAMES, available_columns, load_transactions
+from src.compliance.storage import ShardedStore
+from src.compliance.compression import resolve as resolve_codec
+from src.compliance.parallel import default_workers, make_pool, run_partitioned, summarize, merge_summaries
+from src.compliance.ingest import SCHEMAS
+from src.compliance.summaries import compliance_summary
+from src.compliance.summary_tables import SOURCE_COMPLIANCE, engine_from_env, write_summary
+from src.compliance.findings_tables import RISK_LEVELS, compliance_finding_rules, compliance_findings, replace_findings
 
 router = APIRouter(prefix="/api/compliance", tags=["compliance"])
 
 CONFIG_DIR = os.path.join(os.path.dirname(__file__), "config")
 REPORTS_DIR = os.path.join(BASE_DIR, "reports")
+STATE_DIR = os.path.join(REPORTS_DIR, "compliance_state")   # fapte + potriviri per fișier
 os.makedirs(REPORTS_DIR, exist_ok=True)
 
-def _load_rules_thresholds():
-    with open(os.path.join(CONFIG_DIR, "thresholds.yaml"), encoding="utf-8") as f:
-        thresholds = yaml.safe_load(f)
-    rules: List[dict] = []
-    for rel in ["rules_common.yaml", os.path.join("schemes", "visa.yaml"), os.path.join("schemes", "mastercard.yaml")]:
-        with open(os.path.join(CONFIG_DIR, rel), encoding="utf-8") as f:
-            rules += yaml.safe_load(f)["rules"]
-    return thresholds, rules
+# upload-urile (volum comun cu aplicația principală; citite și comprimate) și exporturile,
+# în shard-uri calculate din id; exporturile se scriu comprimat, ca rapoartele
+FILES = ShardedStore(os.getenv("FILES_DIR", "/app/files"))
+RESULTS = ShardedStore(REPORTS_DIR, codec=resolve_codec(os.getenv("REPORTS_COMPRESSION", "gzip")))
 
-THRESHOLDS, RULES = _load_rules_thresholds()
+# rezultate /check per (hash fișier, severitate, format, versiune ruleset): LRU în memorie + disc
+CACHE = ResultCache(
+    os.path.join(REPORTS_DIR, "compliance_cache"),
+    max_bytes=int(os.getenv("COMPLIANCE_CACHE_MAX_BYTES", str(64 << 20))),
+    disk_max_bytes=int(os.getenv("COMPLIANCE_CACHE_DISK_MAX_BYTES", str(1 << 30))),
+)
+
+# sumarele verificărilor ajung în tabelele de sumar din DB-ul comun (DATABASE_URL / MYSQL_*);
+# fără configurare serviciul rulează ca înainte, fără DB
+SUMMARY_DB = engine_from_env()
+# findings-urile per tranzacție merg în același DB, inserate în loturi
+FINDINGS_BATCH_ROWS = int(os.getenv("COMPLIANCE_FINDINGS_BATCH_ROWS", "5000"))
+FINDINGS_MAX_LIMIT = 10000
+
+# scrierile din fundal (după răspuns) nu pot întoarce erori clientului: rezultatul lor se
+# numără aici și apare în /health, iar eșecurile de findings și în răspunsul /findings
+_PERSIST_LOCK = threading.Lock()
+PERSIST_STATS = {kind: {"written": 0, "failed": 0, "last_error": None, "last_failed_file_id": None}
+                 for kind in ("summary", "findings")}
+
+def _record_persist(kind: str, file_id: str, error: Optional[Exception] = None) -> None:
+    with _PERSIST_LOCK:
+        stats = PERSIST_STATS[kind]
+        if error is None:
+            stats["written"] += 1
+        else:
+            stats["failed"] += 1
+            stats["last_error"] = f"{type(error).__name__}: {error}"
+            stats["last_failed_file_id"] = file_id
+    if error is not None:
+        print(f"[compliance] {kind} write failed for {file_id}: {error}")
+
+# reguli + praguri compilate, reîncărcate la cald când se schimbă config/ (versionate)
+CONFIG = ConfigManager(CONFIG_DIR, poll_seconds=float(os.getenv("COMPLIANCE_CONFIG_POLL_SECONDS", "2")))
+router.add_event_handler("startup", CONFIG.start)
+router.add_event_handler("shutdown", CONFIG.stop)
+
+# -------- paralelism (COMPLIANCE_WORKERS > 1 => process pool pe intervale de rânduri) --------
+WORKERS = default_workers()
+PARALLEL_MIN_ROWS = int(os.getenv("COMPLIANCE_PARALLEL_MIN_ROWS", "10000"))
+_POOL = None
+_POOL_VERSION = None
+
+def _get_pool(rs: Ruleset):
+    """Pool creat leneș; fiecare worker primește regulile la pornire, deci la o versiune
+    nouă de ruleset pool-ul vechi se închide și se creează altul."""
+    global _POOL, _POOL_VERSION
+    if _POOL is None or _POOL_VERSION != rs.version:
+        if _POOL is not None:
+            _POOL.shutdown(wait=False)
+        _POOL = make_pool(WORKERS, rs.thresholds, rs.rules)
+        _POOL_VERSION = rs.version
+    return _POOL
 
 # -------- helpers format detection --------
 def is_visa_like(df: pd.DataFrame) -> bool:
@@ -58,12 +123,31 @@ def map_by_format(df_raw: pd.DataFrame, force_format: str) -> pd.DataFrame:
     # fallback: lasă nemapat (în caz de format necunoscut)
     return df_raw
 
-def _run(df_raw: pd.DataFrame, min_fail_severity="MEDIUM", force_format: str = "auto") -> pd.DataFrame:
+def _run(rs: Ruleset, df_raw: pd.DataFrame, min_fail_severity="MEDIUM", force_format: str = "auto"):
+    if WORKERS > 1 and len(df_raw) >= PARALLEL_MIN_ROWS:
+        map_fn = functools.partial(map_by_format, force_format=force_format)
+        return run_partitioned(df_raw, _get_pool(rs), WORKERS, map_fn, min_fail_severity=min_fail_severity)
     df = map_by_format(df_raw, force_format=force_format)
-    df1 = derive_facts(df, THRESHOLDS)
-    df2 = run_rules(df1, RULES, min_fail_severity=min_fail_severity)
+    df1 = derive_facts(df, rs.thresholds)
+    df2 = run_rules(df1, rs.rules, min_fail_severity=min_fail_severity)
     df3 = estimate_impact(df2)
-    return df3
+    return df3, merge_summaries([summarize(df3)])
+
+def _run_incremental(rs: Ruleset, file_id: str, min_fail_severity="MEDIUM", force_format: str = "auto"):
+    """Ca `_run`, dar refolosește starea salvată a fișierului: după o modificare în config/
+    se re-evaluează doar regulile afectate; prima rulare salvează faptele și potrivirile."""
+    path = _state_path(file_id, force_format)
+    st = refresh_state(path, rs.thresholds, rs.rules)
+    if st is not None:
+        res = estimate_impact(assemble_findings(st["facts"], rs.rules, st["hits"], min_fail_severity=min_fail_severity))
+        return res, summarize_hits(st["facts"], rs.rules, st["hits"], min_fail_severity=min_fail_severity)
+
+    df_raw = _read_file(file_id, force_format)
+    res, summary = _run(rs, df_raw, min_fail_severity=min_fail_severity, force_format=force_format)
+    mapped_columns = list(map_by_format(df_raw.head(1), force_format=force_format).columns)
+    facts = res.drop(columns=RESULT_COLUMNS + IMPACT_COLUMNS)
+    save_state(path, mapped_columns, facts, rs.thresholds, rs.rules, hits_from_results(res, rs.rules))
+    return res, summary
 
 # -------- response model --------
 class CheckSummary(BaseModel):
@@ -74,89 +158,317 @@ class CheckSummary(BaseModel):
     rule_counts: Dict[str, int]
     download: Optional[str] = None
     results: Optional[list] = None
+    ruleset_version: Optional[str] = None
+
+class Scenario(BaseModel):
+    name: Optional[str] = None
+    apply_sca: bool = False
+    force_avs: bool = False
+    validate_enhanced: bool = False
+    reduce_delay_to: Optional[int] = None
+
+class SimulateRequest(BaseModel):
+    file_id: str
+    scenarios: List[Scenario]
+    min_fail_severity: str = "MEDIUM"
+    force_format: str = "auto"     # "auto" | "mastercard" | "visa"
+
+class ScenarioResult(BaseModel):
+    name: str
+    toggles: Dict[str, Any]
+    rows: int
+    non_compliant: int
+    compliance_rate: float
+    total_estimated_impact: float
+    delta_non_compliant: int
+    delta_estimated_impact: float
+    rule_counts: Dict[str, int]
+    reevaluated_rules: List[str]
+
+class SimulateSummary(BaseModel):
+    baseline: CheckSummary
+    scenarios: List[ScenarioResult]
+    ruleset_version: str
+
+def _file_path(file_id: str) -> str:
+    if not FILE_ID_RE.match(file_id or ""):
+        raise HTTPException(404, f"Fișierul cu id '{file_id}' nu există în /files.")
+    file_path = FILES.locate(file_id, ".csv")
+    if file_path is None:
+        raise HTTPException(404, f"Fișierul cu id '{file_id}' nu există în /files.")
+    return file_path
+
+def _partitions(file_id: str) -> List[Dict[str, str]]:
+    """Partițiile per brand ale unui upload mixt (tabela `files` a aplicației, aceeași bază); [] fără DB."""
+    if SUMMARY_DB is None:
+        return []
+    try:
+        with SUMMARY_DB.connect() as conn:
+            rows = conn.execute(text("SELECT id, brand FROM files WHERE parent_id = :id ORDER BY brand"),
+                                {"id": file_id}).all()
+    except SQLAlchemyError as e:
+        # fără listă: părintele se recunoaște în continuare după header
+        print(f"[compliance] partition lookup failed for {file_id}: {e}")
+        return []
+    return [{"file_id": r[0], "brand": r[1]} for r in rows]
+
+def _checkable_path(file_id: str) -> str:
+    """Ca `_file_path`, dar refuză părinții uploadurilor mixte (/files/upload/mixed): au rânduri Visa
+    și Mastercard, iar mapper-ul le-ar trata pe toate ca un singur brand. Verificarea rulează pe partiții."""
+    file_path = _file_path(file_id)
+    partitions = _partitions(file_id)
+    cols = available_columns(file_path)
+    if partitions or (any(c.startswith("visa_") for c in cols) and any(c.startswith("mc_") for c in cols)):
+        raise HTTPException(400, {
+            "message": f"Fișierul '{file_id}' e un upload mixt (Visa + Mastercard); verificați partițiile per brand.",
+            "partitions": partitions,
+        })
+    return file_path
+
+def _state_path(file_id: str, force_format: str) -> str:
+    """Directorul de stare incrementală; id-ul și formatul se validează înainte de orice acces la disc."""
+    try:
+        return state_dir(STATE_DIR, file_id, force_format)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+def _detect_format(file_path: str, force_format: str) -> str:
+    """"visa" | "mastercard" | "auto" (format necunoscut) pentru mapper-ul care va rula."""
+    fmt = (force_format or "auto").lower()
+    if fmt == "auto":
+        cols = available_columns(file_path)
+        fmt = "visa" if any(c.startswith("visa_") for c in cols) else (
+              "mastercard" if any(c.startswith("mc_") for c in cols) else "auto")
+    return fmt
+
+def _input_columns(file_path: str, force_format: str) -> Optional[List[str]]:
+    """Coloanele citite de mapper-ul care va rula (None = format necunoscut, tot fișierul)."""
+    return {"visa": VISA_INPUT_COLUMNS, "mastercard": MC_INPUT_COLUMNS}.get(_detect_format(file_path, force_format))
+
+def _persist_summary(file_id: str, fmt: str, res: pd.DataFrame, ruleset_version: str) -> None:
+    """Scrie sumarul verificării (total, brand/grup MCC/canal, rollup-uri zilnice); rulează după răspuns.
+    Mapper-ele nu păstrează coloanele brute, deci dimensiunile se citesc separat din fișier."""
+    schema = SCHEMAS.get(fmt)
+    try:
+        columns = list(schema.dimensions.values()) + list(schema.rollup_keys.values()) if schema else []
+        frame = load_transactions(file_id, _file_path(file_id), columns) if columns else pd.DataFrame()
+        if len(frame) != len(res):
+            frame = pd.DataFrame()
+        summary = compliance_summary(res, frame, schema)
+        with SUMMARY_DB.begin() as conn:
+            write_summary(conn, file_id, SOURCE_COMPLIANCE, summary, ruleset_version=ruleset_version)
+    except Exception as e:
+        _record_persist("summary", file_id, e)
+    else:
+        _record_persist("summary", file_id)
+
+def _persist_findings(file_id: str, ids: List[str], rules: List[dict], hits: Dict[str, Any], impact,
+                      ruleset_version: str) -> None:
+    """Scrie findings-urile per tranzacție (reguli, risc, impact) în compliance_findings; după răspuns."""
+    try:
+        findings, rule_rows = finding_records(ids, rules, hits, impact)
+        with SUMMARY_DB.begin() as conn:
+            replace_findings(conn, file_id, findings, rule_rows, ruleset_version, batch_rows=FINDINGS_BATCH_ROWS)
+    except Exception as e:
+        _record_persist("findings", file_id, e)
+    else:
+        _record_persist("findings", file_id)
+
+def _read_file(file_id: str, force_format: str = "auto") -> pd.DataFrame:
+    file_path = _file_path(file_id)
+    try:
+        return load_transactions(file_id, file_path, _input_columns(file_path, force_format))
+    except Exception as e:
+        raise HTTPException(400, f"Eroare la citirea fișierului: {e}")
+
+def _transaction_ids(res: pd.DataFrame) -> List[str]:
+    if "transaction_id" in res.columns:
+        return res["transaction_id"].astype(str).tolist()
+    return [str(i) for i in res.index]
+
+def _results_from_hits(ids: List[str], rules: List[dict], hits: Dict[str, Any]) -> list:
+    """Per-transaction results array: only transactions with findings (violated rules).
+    Findings-urile apar în ordinea regulilor, ca în `assemble_findings`."""
+    per_row: Dict[int, list] = {}
+    for r in rules:
+        for i in hits[r["id"]].nonzero()[0]:
+            per_row.setdefault(int(i), []).append({
+                "id": r["id"],
+                "title": r["title"],
+                "severity": r["severity"],
+                "message": r["message"],
+                "remediation": r["remediation"],
+                "impact_hint_bps": r.get("impact_hint_bps", 0.0),
+                "impact_hint_per_item": r.get("impact_hint_per_item", 0.0),
+            })
+    # riskLevel = cea mai mare severitate din findings
+    severity_order = {"LOW": 1, "MEDIUM": 2, "HIGH": 3}
+    results = []
+    for i in sorted(per_row):
+        findings = per_row[i]
+        max_sev = max((f["severity"] for f in findings), key=lambda s: severity_order.get(str(s).upper(), 0))
+        results.append({"id": ids[i], "riskLevel": max_sev, "findings": findings})
+    return results
 
 # -------- endpoints --------
 @router.get("/health")
 def health():
-    return {"ok": True}
+    with _PERSIST_LOCK:
+        persistence = {kind: dict(stats) for kind, stats in PERSIST_STATS.items()}
+    return {"ok": True, "ruleset_version": CONFIG.version, "result_cache": CACHE.stats(),
+            "frame_cache": FRAMES.stats(), "persistence": persistence}
+
+@router.get("/profile")
+def profile():
+    """Timpi cumulați per regulă și per subexpresie comună (DAG-ul de predicate al ruleset-ului curent;
+    cu COMPLIANCE_WORKERS > 1 acoperă doar evaluările făcute în procesul serverului)."""
+    rs = CONFIG.snapshot()
+    return {"ruleset_version": rs.version, **get_dag(rs.rules).timings()}
 
 @router.post("/check", response_model=CheckSummary)
 async def check_csv(
+    background_tasks: BackgroundTasks,
     file_id: str = Form(...),
     min_fail_severity: str = Form("MEDIUM"),
     force_format: str = Form("auto"),     # "auto" | "mastercard" | "visa"
     return_csv: bool = Form(False),
 ):
-    # 1) citește fișierul din /files
-    files_dir = "/app/files"
-    file_path = os.path.join(files_dir, f"{file_id}.csv")
-    if not os.path.exists(file_path):
-        raise HTTPException(404, f"Fișierul cu id '{file_id}' nu există în /files.")
-    try:
-        df_raw = pd.read_csv(file_path, encoding="utf-8")
-    except Exception as e:
-        raise HTTPException(400, f"Eroare la citirea fișierului: {e}")
+    # 1) cache: fișierele încărcate nu se schimbă, deci același (conținut, severitate,
+    #    format, versiune ruleset) dă același rezultat
+    rs = CONFIG.snapshot()
+    # interogarea DB (partiții) și hash-ul fișierului sunt blocante: în threadpool, nu pe event loop
+    file_hash = await run_in_threadpool(lambda: CACHE.file_hash(_checkable_path(file_id)))
+    key = cache_key(file_hash, min_fail_severity, force_format, rs.version)
+    entry = None if return_csv else CACHE.get(key)
 
-    # 2) rulează pipeline-ul (cu mapping Visa/MC)
-    res = _run(df_raw, min_fail_severity=min_fail_severity, force_format=force_format)
+    # 2) miss: citește fișierul din /files și rulează pipeline-ul (cu mapping Visa/MC),
+    #    sau refolosește starea salvată a fișierului
+    if entry is None:
+        res, summary = _run_incremental(rs, file_id, min_fail_severity=min_fail_severity, force_format=force_format)
+        hits = hits_from_results(res, rs.rules)
+        entry = pack_entry(summary, _transaction_ids(res), hits)
+        CACHE.put(key, entry)
+        if SUMMARY_DB is not None:
+            background_tasks.add_task(_persist_summary, file_id, _detect_format(_file_path(file_id), force_format),
+                                      res, rs.version)
+            background_tasks.add_task(_persist_findings, file_id, entry["ids"], rs.rules, hits,
+                                      res["impact_estimated_total"].to_numpy(dtype=float), rs.version)
+    else:
+        hits = unpack_hits(entry, rs.rules)
 
     # 3) sumar & (opțional) CSV out
-    n = len(res)
-    non = int((~res["is_compliant"]).sum()) if n else 0
-    impact = float(res.get("impact_estimated_total", pd.Series(0.0, index=res.index)).sum())
-    counts = (
-        res.get("findings_ids", pd.Series([""]*n)).fillna("").astype(str)
-          .str.split(",").explode().value_counts()
-          .to_dict()
-    )
-    counts.pop("", None) if "" in counts else None
-    rule_counts = {k:int(v) for k,v in counts.items()}
-
-    # Build per-transaction results array: only transactions with findings (violated rules)
-    results = []
-    for idx, row in res.iterrows():
-        findings = row.get("compliance_findings", [])
-        # If findings is a string, try to parse as list (from eval or json)
-        if isinstance(findings, str):
-            import ast
-            try:
-                findings_list = ast.literal_eval(findings)
-                if isinstance(findings_list, list):
-                    findings = findings_list
-                else:
-                    findings = [findings] if findings else []
-            except Exception:
-                findings = [findings] if findings else []
-        # Only include transactions with non-empty findings list
-        if findings and isinstance(findings, list) and len(findings) > 0:
-            # Determine riskLevel as the highest severity in findings
-            severity_order = {"LOW": 1, "MEDIUM": 2, "HIGH": 3}
-            max_severity = "Unknown"
-            if all(isinstance(f, dict) for f in findings):
-                severities = [f.get("severity", "Unknown") for f in findings]
-                # Pick the highest severity
-                if severities:
-                    max_sev = max(severities, key=lambda s: severity_order.get(str(s).upper(), 0))
-                    max_severity = max_sev
-            results.append({
-                "id": str(row.get("transaction_id", idx)),
-                "riskLevel": max_severity,
-                "findings": findings
-            })
+    results = _results_from_hits(entry["ids"], rs.rules, hits)
 
     download = None
     if return_csv:
         token = uuid.uuid4().hex[:8]
-        out_path = os.path.join(REPORTS_DIR, f"results_{token}.csv")
-        res.to_csv(out_path, index=False)
-        download = out_path
+        download = RESULTS.put_bytes(f"results_{token}", ".csv", res.to_csv(index=False).encode("utf-8"))
 
     return CheckSummary(
-        rows=n,
-        non_compliant=non,
-        compliance_rate=((n-non)/n if n else 1.0),
-        total_estimated_impact=impact,
-        rule_counts=rule_counts,
+        **entry["summary"],
         download=download,
         results=results,
+        ruleset_version=rs.version,
+    )
+
+@router.get("/findings")
+def findings(
+    rule: Optional[str] = None,
+    risk_level: Optional[str] = None,
+    date_from: Optional[datetime.datetime] = None,   # [date_from, date_to) pe momentul verificării
+    date_to: Optional[datetime.datetime] = None,
+    file_id: Optional[str] = None,
+    limit: int = Query(1000, ge=1, le=FINDINGS_MAX_LIMIT),
+):
+    """Findings-urile persistate, fără să se ruleze pipeline-ul. Cu `rule`, căutarea pornește
+    din indexul (rule_id, risk_level, checked_at); altfel din (risk_level, checked_at)."""
+    if SUMMARY_DB is None:
+        raise HTTPException(503, "Findings store is not configured (DATABASE_URL / MYSQL_HOST).")
+    if risk_level is not None:
+        risk_level = risk_level.upper()
+        if risk_level not in RISK_LEVELS:
+            raise HTTPException(400, f"risk_level must be one of {list(RISK_LEVELS)}")
+    f = compliance_findings
+    # filtrele se aplică pe tabela care are indexul potrivit
+    src = f
+    stmt = select(f)
+    if rule:
+        src = compliance_finding_rules
+        stmt = stmt.join(src, (src.c.file_id == f.c.file_id) & (src.c.row_index == f.c.row_index)) \
+                   .where(src.c.rule_id == rule)
+    if risk_level:
+        stmt = stmt.where(src.c.risk_level == risk_level)
+    if date_from:
+        stmt = stmt.where(src.c.checked_at >= date_from)
+    if date_to:
+        stmt = stmt.where(src.c.checked_at < date_to)
+    if file_id:
+        stmt = stmt.where(src.c.file_id == file_id)
+    stmt = stmt.order_by(src.c.checked_at.desc(), src.c.file_id, src.c.row_index).limit(limit + 1)
+    r = compliance_finding_rules
+    with SUMMARY_DB.connect() as conn:
+        rows = conn.execute(stmt).mappings().all()
+        # regulile fiecărei tranzacții din pagină, din tabela inversată (sursa de adevăr)
+        rules: Dict[tuple, List[str]] = {}
+        for fid in {row["file_id"] for row in rows[:limit]}:
+            page_rows = [row["row_index"] for row in rows[:limit] if row["file_id"] == fid]
+            for start in range(0, len(page_rows), 1000):
+                for row_index, rule_id in conn.execute(
+                        select(r.c.row_index, r.c.rule_id)
+                        .where(r.c.file_id == fid, r.c.row_index.in_(page_rows[start:start + 1000]))
+                        .order_by(r.c.row_index, r.c.rule_id)):
+                    rules.setdefault((fid, row_index), []).append(rule_id)
+    out = [{**row, "rules": rules.get((row["file_id"], row["row_index"]), [])} for row in rows[:limit]]
+    with _PERSIST_LOCK:
+        failures = dict(PERSIST_STATS["findings"])
+    return {"findings": out, "truncated": len(rows) > limit,
+            # scrierile eșuate ale procesului: findings-urile acelor fișiere lipsesc sau sunt vechi
+            "write_failures": failures["failed"], "last_write_error": failures["last_error"],
+            "last_failed_file_id": failures["last_failed_file_id"]}
+
+@router.post("/simulate", response_model=SimulateSummary)
+async def simulate(req: SimulateRequest):
+    """What-if pe mai multe scenarii: faptele se derivă o singură dată, iar fiecare
+    scenariu re-evaluează doar regulile ale căror coloane sunt modificate."""
+    rs = CONFIG.snapshot()
+    # ca /check: doar fișiere încărcate (404), nu părinți mixți (400); interogarea DB în threadpool
+    await run_in_threadpool(_checkable_path, req.file_id)
+    st = refresh_state(_state_path(req.file_id, req.force_format), rs.thresholds, rs.rules)
+    if st is not None:
+        facts, base_hits = st["facts"], st["hits"]
+    else:
+        df_raw = _read_file(req.file_id, req.force_format)
+        df = map_by_format(df_raw, force_format=req.force_format).reset_index(drop=True)
+        facts, base_hits = derive_facts(df, rs.thresholds), None
+    out = run_scenarios(
+        facts, rs.rules,
+        [sc.model_dump(exclude_none=True) for sc in req.scenarios],
+        min_fail_severity=req.min_fail_severity,
+        base_hits=base_hits,
     )
+    return SimulateSummary(baseline=CheckSummary(**out["baseline"], ruleset_version=rs.version),
+                           scenarios=out["scenarios"], ruleset_version=rs.version)
+
+@router.post("/reevaluate")
+def reevaluate(file_id: Optional[str] = Form(None)):
+    """După editarea config/: recompilează imediat (fără să aștepte watcher-ul) și patch-uiește
+    rezultatele salvate, re-evaluând doar regulile afectate (pentru un fișier sau pentru toate)."""
+    CONFIG.check(force=True)
+    rs = CONFIG.snapshot()
+    updated = []
+    names = sorted(os.listdir(STATE_DIR)) if os.path.isdir(STATE_DIR) else []
+    for name in names:
+        if file_id and not name.startswith(f"{file_id}__"):
+            continue
+        st = refresh_state(os.path.join(STATE_DIR, name), rs.thresholds, rs.rules)
+        if st is None:
+            continue
+        plan = st["plan"]
+        updated.append({
+            "state": name,
+            "reevaluated_rules": plan["reevaluate"],
+            "removed_rules": plan["removed"],
+            "changed_thresholds": plan["changed_thresholds"],
+            "rederived_facts": plan["rederive_facts"],
+        })
+    return {"ruleset_version": rs.version, "updated": updated}
@@ -1,8 +1,8 @@
 # main.py
 import argparse
+import functools
 import os, sys
 import pandas as pd
-import yaml
 
 # permite importul din src/compliance/
 sys.path.append(os.path.join(os.path.dirname(__file__), "src"))
@@ -13,21 +13,9 @@ from compliance.impact import estimate_impact
 from compliance.simulate import apply_simulation  # dacă vrei what-if
 from compliance.mapper_mastercard import map_mastercard
 from compliance.mapper_visa import map_visa
-
-
-def load_yaml_rules(config_dir):
-    with open(f"{config_dir}/rules_common.yaml") as f:
-        common = yaml.safe_load(f)["rules"]
-    with open(f"{config_dir}/schemes/visa.yaml") as f:
-        visa = yaml.safe_load(f)["rules"]
-    with open(f"{config_dir}/schemes/mastercard.yaml") as f:
-        mc = yaml.safe_load(f)["rules"]
-    return common + visa + mc
-
-
-def load_thresholds(config_dir):
-    with open(f"{config_dir}/thresholds.yaml") as f:
-        return yaml.safe_load(f)
+from compliance.parallel import run_compliance_parallel
+from compliance.config_manager import ConfigManager
+from compliance.ingest import read_csv_typed
 
 
 # auto-detect după prefixele coloanelor
@@ -64,31 +52,29 @@ def main():
                         help="LOW/MEDIUM/HIGH/CRITICAL (mark non-compliant if severity >= threshold)")
     parser.add_argument("--force_format", choices=["mastercard","visa","raw","auto"], default="auto",
                         help="Force mapping to a specific scheme or let it auto-detect")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="Worker processes; input is split into row ranges evaluated in parallel")
     args = parser.parse_args()
 
     # 1) load configs
-    thresholds = load_thresholds(args.config)
-    rules = load_yaml_rules(args.config)
+    rs = ConfigManager(args.config).snapshot()
+    thresholds, rules = rs.thresholds, rs.rules
 
     # 2) load data (raw)
-    df_raw = pd.read_csv(args.input)
+    df_raw = read_csv_typed(args.input, args.force_format)
 
 
-    # 3) mapping (Visa/Mastercard/Raw)
-    df = map_by_format(df_raw, force_format=args.force_format)
+    # 3-6) mapping (Visa/Mastercard/Raw) -> facts -> rules -> impact,
+    #      pe intervale de rânduri în paralel dacă --workers > 1
+    map_fn = functools.partial(map_by_format, force_format=args.force_format)
+    df3, _summary = run_compliance_parallel(
+        df_raw, map_fn, thresholds, rules,
+        min_fail_severity=args.min_fail_severity, workers=args.workers,
+    )
 
     # 3a) asigurăm existența coloanei ID (după mapare, ca să nu fie aruncată de mapper)
-    if "id" not in df.columns:
-        df["id"] = range(1, len(df) + 1)
-
-    # 4) derive facts
-    df1 = derive_facts(df, thresholds)
-
-    # 5) apply rules
-    df2 = run_rules(df1, rules, min_fail_severity=args.min_fail_severity)
-
-    # 6) estimate impact
-    df3 = estimate_impact(df2)
+    if "id" not in df3.columns:
+        df3["id"] = range(1, len(df3) + 1)
 
     # 6a) adăugăm coloana risk_level pe baza COMPLIANCE_FINDINGS (NU 'findings')
     def get_risk_level(findings):
@@ -123,12 +109,14 @@ def main():
 
     # aplicăm
     df3["risk_level"] = df3["compliance_findings"].apply(get_risk_level)
+    df3["ruleset_version"] = rs.version
 
     # 7) write output
     os.makedirs(os.path.dirname(args.out) or ".", exist_ok=True)
     df3.to_csv(args.out, index=False)
     print(f"Done. Wrote {len(df3)} rows to {args.out}")
     print(f"Non-compliant rows: {(~df3['is_compliant']).sum()}")
+    print(f"Ruleset version: {rs.version}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,422 @@
+# src/compliance/compiler.py
+"""Compilarea regulilor: coloanele citite, gărzile de egalitate și dispatch indexat.
+
+O regulă `a == 'x' and b in ['y', 'z'] and flag and <rest>` are gărzile
+{a: ['x'], b: ['y', 'z']} și flag-ul `flag`. Rândurile se grupează după valorile
+coloanelor-gardă, iar pentru fiecare grup se caută în index (hash valoare -> reguli)
+doar regulile candidate; restul regulilor sunt sigur False pe acel grup.
+"""
+import ast
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# chei adăugate de compile_rule (nu fac parte din definiția regulii din YAML)
+COMPILED_KEYS = ("inputs", "guards", "flags")
+
+# peste atâtea valori distincte într-un batch, o coloană nu mai e folosită ca cheie de grupare
+MAX_GUARD_CARDINALITY = 4096
+
+def to_pandas_expr(expr: str) -> str:
+    return expr.replace(" and ", " & ").replace(" or ", " | ")
+
+def _parse(expr: str) -> Optional[ast.AST]:
+    try:
+        return ast.parse(expr, mode="eval").body
+    except SyntaxError:
+        return None
+
+def rule_inputs(expr: str) -> List[str]:
+    """Coloanele de fapte citite de o expresie `when` (nume libere din expresie)."""
+    tree = _parse(expr)
+    if tree is None:
+        return []
+    names = {n.id for n in ast.walk(tree) if isinstance(n, ast.Name)}
+    return sorted(names - {"True", "False", "None"})
+
+def _guard(term: ast.AST) -> Tuple[Optional[str], List[Any]]:
+    if isinstance(term, ast.Compare) and len(term.ops) == 1:
+        left, op, right = term.left, term.ops[0], term.comparators[0]
+        if isinstance(op, ast.Eq):
+            if isinstance(left, ast.Name) and isinstance(right, ast.Constant) and right.value is not None:
+                return left.id, [right.value]
+            if isinstance(right, ast.Name) and isinstance(left, ast.Constant) and left.value is not None:
+                return right.id, [left.value]
+        if (isinstance(op, ast.In) and isinstance(left, ast.Name)
+                and isinstance(right, (ast.List, ast.Tuple, ast.Set))
+                and all(isinstance(e, ast.Constant) and e.value is not None for e in right.elts)):
+            return left.id, [e.value for e in right.elts]
+    return None, []
+
+def extract_guards(expr: str) -> Tuple[Dict[str, List[Any]], List[str]]:
+    """Gărzile de egalitate și flag-urile (nume simple) din conjuncția de pe nivelul de sus."""
+    tree = _parse(expr)
+    if tree is None:
+        return {}, []
+    terms = tree.values if isinstance(tree, ast.BoolOp) and isinstance(tree.op, ast.And) else [tree]
+    guards: Dict[str, List[Any]] = {}
+    flags: List[str] = []
+    for t in terms:
+        if isinstance(t, ast.Name):
+            flags.append(t.id)
+            continue
+        col, vals = _guard(t)
+        if col is None:
+            continue
+        guards[col] = [v for v in guards[col] if v in vals] if col in guards else vals
+    return guards, flags
+
+def compile_rule(rule: dict) -> dict:
+    rule["inputs"] = rule_inputs(rule["when"])
+    rule["guards"], rule["flags"] = extract_guards(rule["when"])
+    return rule
+
+# -------- dispatch --------
+def _effective_guards(df: pd.DataFrame, rule: dict) -> Dict[str, List[Any]]:
+    """Gărzile aplicabile pe df; flag-urile contează doar pe coloane bool (altfel semantica diferă)."""
+    if "guards" not in rule:
+        rule = compile_rule(dict(rule))
+    g = {c: v for c, v in rule["guards"].items() if c in df.columns}
+    for c in rule["flags"]:
+        if c in df.columns and df[c].dtype == bool and c not in g:
+            g[c] = [True]
+    return g
+
+# -------- DAG comun de predicate --------
+class _EvalError(Exception):
+    pass
+
+_CMP = {
+    ast.Eq: lambda a, b: a == b, ast.NotEq: lambda a, b: a != b,
+    ast.Lt: lambda a, b: a < b, ast.LtE: lambda a, b: a <= b,
+    ast.Gt: lambda a, b: a > b, ast.GtE: lambda a, b: a >= b,
+}
+
+def _is_const(node: ast.AST) -> bool:
+    return isinstance(node, ast.Constant) or (
+        isinstance(node, (ast.List, ast.Tuple, ast.Set)) and all(isinstance(e, ast.Constant) for e in node.elts))
+
+def _const_value(node: ast.AST) -> Any:
+    return node.value if isinstance(node, ast.Constant) else [e.value for e in node.elts]
+
+def _to_bool(v: Any, n: int) -> np.ndarray:
+    if isinstance(v, np.ndarray) and v.dtype == bool:
+        return v
+    if isinstance(v, pd.Series):
+        return v.fillna(False).astype(bool).to_numpy()
+    return np.full(n, bool(v))
+
+def _take(v: Any, rows: Optional[np.ndarray]) -> Any:
+    if rows is None:
+        return v
+    if isinstance(v, np.ndarray):
+        return v[rows]
+    if isinstance(v, pd.Series):
+        return v.iloc[rows]
+    return v
+
+class _Node:
+    __slots__ = ("key", "kind", "children", "payload", "src", "cost")
+
+    def __init__(self, key, kind, children, payload, src, cost):
+        self.key, self.kind, self.children = key, kind, children
+        self.payload, self.src, self.cost = payload, src, cost
+
+class PredicateDAG:
+    """Toate expresiile `when` parsate într-un singur DAG: fiecare subexpresie distinctă
+    (normalizată, cu operanzii lui and/or sortați) este un nod. Nodurile folosite de
+    mai multe reguli se calculează o singură dată per batch, pe toate rândurile, și se
+    refolosesc; conjuncțiile se evaluează întâi pe operanzii deja calculați, apoi pe cei
+    ieftini și selectivi, cu oprire când masca devine complet False (sau, la `or`, complet True).
+    Oprirea sare doar peste operanzi care nu pot eșua: unul care ar ridica eroare e evaluat
+    oricum, ca regula să dea același rezultat ca df.eval pe toată expresia (eroare => False).
+
+    Statisticile (node_stats, rule_stats) se actualizează sub `_stats_lock`: același DAG e
+    folosit concurent din thread-urile serverului.
+    """
+
+    def __init__(self, rules: List[Dict[str, Any]]):
+        self.nodes: Dict[str, _Node] = {}
+        self.roots: Dict[str, Optional[str]] = {}
+        self.users: Dict[str, set] = defaultdict(set)
+        self.node_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {"evals": 0, "seconds": 0.0, "true_rate": 0.5})
+        self.rule_stats: Dict[str, Dict[str, float]] = defaultdict(lambda: {"evals": 0, "seconds": 0.0})
+        self._stats_lock = threading.Lock()
+        for r in rules:
+            tree = _parse(r["when"])
+            key = self._add(tree, r["id"]) if tree is not None else None
+            self.roots[r["id"]] = key
+
+    def _add(self, node: ast.AST, rule_id: str) -> str:
+        if isinstance(node, ast.BoolOp):
+            op = "and" if isinstance(node.op, ast.And) else "or"
+            flat = []
+            for v in node.values:   # a and (b and c) -> and(a, b, c)
+                if isinstance(v, ast.BoolOp) and type(v.op) is type(node.op):
+                    flat.extend(v.values)
+                else:
+                    flat.append(v)
+            children = sorted({self._add(v, rule_id) for v in flat})
+            if len(children) == 1:
+                return children[0]
+            key = f"{op}({', '.join(children)})"
+            src = f" {op} ".join(f"({self.nodes[c].src})" for c in children)
+            return self._node(key, op, children, None, src, sum(self.nodes[c].cost for c in children), rule_id)
+        if isinstance(node, ast.UnaryOp) and isinstance(node.op, ast.Not):
+            child = self._add(node.operand, rule_id)
+            return self._node(f"not({child})", "not", [child], None,
+                              f"not ({self.nodes[child].src})", self.nodes[child].cost + 1, rule_id)
+        if isinstance(node, ast.Name):
+            return self._node(node.id, "name", [], node.id, node.id, 1, rule_id)
+        if isinstance(node, ast.Compare) and all(type(o) in _CMP or isinstance(o, (ast.In, ast.NotIn)) for o in node.ops):
+            operands = [node.left] + list(node.comparators)
+            if all(isinstance(o, ast.Name) or _is_const(o) for o in operands):
+                key = ast.unparse(node)
+                payload = ([("name", o.id) if isinstance(o, ast.Name) else ("const", _const_value(o)) for o in operands],
+                           [type(o) for o in node.ops])
+                cost = 1 + sum(len(c[1]) if c[0] == "const" and isinstance(c[1], list) else 1 for c in payload[0])
+                return self._node(key, "cmp", [], payload, key, cost, rule_id)
+        if isinstance(node, ast.Constant):
+            return self._node(repr(node.value), "const", [], node.value, repr(node.value), 0, rule_id)
+        # orice altceva (aritmetică, apeluri...) -> df.eval pe subexpresie
+        src = ast.unparse(node)
+        return self._node(f"eval({src})", "eval", [], src, src, 10, rule_id)
+
+    def _node(self, key, kind, children, payload, src, cost, rule_id) -> str:
+        if key not in self.nodes:
+            self.nodes[key] = _Node(key, kind, children, payload, src, cost)
+        self.users[key].add(rule_id)
+        return key
+
+    def shared(self, key: str) -> bool:
+        return len(self.users[key]) > 1
+
+    # -------- evaluare --------
+    def eval_rule(self, df: pd.DataFrame, rule_id: str, memo: Dict[str, Any],
+                  rows: Optional[np.ndarray] = None) -> np.ndarray:
+        """Masca regulii pe toate rândurile (rows=None) sau doar pe pozițiile `rows`.
+
+        `memo` ține valorile calculate pe tot batch-ul și se partajează între reguli.
+        """
+        n = len(df) if rows is None else len(rows)
+        t0 = time.perf_counter()
+        key = self.roots.get(rule_id)
+        try:
+            if key is None:
+                raise _EvalError(rule_id)
+            out = _to_bool(self._eval(df, key, memo, rows, {}), n)
+        except _EvalError:
+            out = np.zeros(n, dtype=bool)
+        elapsed = time.perf_counter() - t0
+        with self._stats_lock:
+            st = self.rule_stats[rule_id]
+            st["evals"] += 1
+            st["seconds"] += elapsed
+        return out
+
+    def _eval(self, df, key, memo, rows, local):
+        if key in memo:
+            v = memo[key]
+            if v is _EvalError:
+                raise _EvalError(key)
+            return _take(v, rows)
+        if rows is not None and self.shared(key):
+            # nod comun: calculat o singură dată pe tot batch-ul, apoi feliat
+            self._eval(df, key, memo, None, {})
+            return self._eval(df, key, memo, rows, local)
+        if key in local:
+            return local[key]
+
+        node = self.nodes[key]
+        t0 = time.perf_counter()
+        try:
+            v = self._compute(df, node, memo, rows, local)
+        except _EvalError:
+            if rows is None:
+                memo[key] = _EvalError
+            raise
+        except Exception:
+            if rows is None:
+                memo[key] = _EvalError
+            raise _EvalError(key)
+        elapsed = time.perf_counter() - t0
+        rate = float(v.mean()) if isinstance(v, np.ndarray) and v.dtype == bool and len(v) else None
+        with self._stats_lock:
+            st = self.node_stats[key]
+            st["evals"] += 1
+            st["seconds"] += elapsed
+            if rate is not None:
+                st["true_rate"] = 0.8 * st["true_rate"] + 0.2 * rate
+        if rows is None:
+            memo[key] = v
+        else:
+            local[key] = v
+        return v
+
+    def _order(self, children, memo, descending_rate=False):
+        def rank(c):
+            st = self.node_stats.get(c)
+            rate = st["true_rate"] if st is not None else 0.5
+            return (c not in memo, self.nodes[c].cost, -rate if descending_rate else rate)
+        return sorted(children, key=rank)
+
+    def _cannot_raise(self, df, key, memo) -> bool:
+        """Dacă evaluarea nodului sigur nu ridică eroare (nu se poate sări peste el altfel).
+        Egalitatea și `in` nu eșuează pe tipuri amestecate; comparațiile de ordine și df.eval pot."""
+        if key in memo:
+            return memo[key] is not _EvalError
+        node = self.nodes[key]
+        if node.kind == "const":
+            return True
+        if node.kind == "name":
+            return node.payload in df.columns
+        if node.kind in ("and", "or", "not"):
+            return all(self._cannot_raise(df, c, memo) for c in node.children)
+        if node.kind == "cmp":
+            operands, ops = node.payload
+            return (all(v in df.columns for kind, v in operands if kind == "name")
+                    and all(op in (ast.In, ast.NotIn) or (op in (ast.Eq, ast.NotEq) and not isinstance(b[1], list))
+                            for op, b in zip(ops, operands[1:])))
+        return False
+
+    def _compute(self, df, node, memo, rows, local):
+        n = len(df) if rows is None else len(rows)
+        if node.kind in ("and", "or"):
+            # and: oprire când masca e complet False; or: când e complet True
+            is_and = node.kind == "and"
+            order = self._order(node.children, memo, descending_rate=not is_and)
+            acc = None
+            for i, c in enumerate(order):
+                v = _to_bool(self._eval(df, c, memo, rows, local), n)
+                acc = v if acc is None else (acc & v if is_and else acc | v)
+                decided = not acc.any() if is_and else acc.all()
+                if decided and all(self._cannot_raise(df, r, memo) for r in order[i + 1:]):
+                    return np.full(n, not is_and)
+            return acc
+        if node.kind == "not":
+            return ~_to_bool(self._eval(df, node.children[0], memo, rows, local), n)
+        if node.kind == "name":
+            if node.payload not in df.columns:
+                raise _EvalError(node.payload)
+            return _take(df[node.payload], rows)
+        if node.kind == "const":
+            return node.payload
+        if node.kind == "cmp":
+            operands, ops = node.payload
+            vals = []
+            for kind, v in operands:
+                if kind == "name":
+                    if v not in df.columns:
+                        raise _EvalError(v)
+                    v = _take(df[v], rows)
+                vals.append(v)
+            acc = None
+            for op, a, b in zip(ops, vals, vals[1:]):
+                if op in (ast.In, ast.NotIn):
+                    r = a.isin(b if isinstance(b, list) else [b]) if isinstance(a, pd.Series) else (a in b)
+                    r = _to_bool(r, n)
+                    r = ~r if op is ast.NotIn else r
+                else:
+                    r = _to_bool(_CMP[op](a, b), n)
+                acc = r if acc is None else acc & r
+            return acc
+        # eval: subexpresie pe care interpretorul nu o tratează direct
+        sub = df if rows is None else df.iloc[rows]
+        return sub.eval(to_pandas_expr(node.payload))
+
+    def timings(self) -> Dict[str, Any]:
+        """Timpi cumulați per regulă și per subexpresie (cu câte reguli o folosesc)."""
+        with self._stats_lock:
+            rule_stats = {rid: dict(st) for rid, st in self.rule_stats.items()}
+            node_stats = {k: dict(st) for k, st in self.node_stats.items()}
+        return {
+            "rules": rule_stats,
+            "subexpressions": sorted(
+                ({"expr": self.nodes[k].src, "kind": self.nodes[k].kind, "rules": len(self.users[k]), **st}
+                 for k, st in node_stats.items()),
+                key=lambda d: -d["seconds"],
+            ),
+        }
+
+# DAG-urile se păstrează per ruleset (id + when), ca timpii să se acumuleze între apeluri
+_DAG_CACHE: "OrderedDict[Tuple, PredicateDAG]" = OrderedDict()
+_DAG_CACHE_SIZE = 32
+_DAG_CACHE_LOCK = threading.Lock()   # watcher-ul de config și thread-urile serverului
+
+def get_dag(rules: List[Dict[str, Any]]) -> PredicateDAG:
+    key = tuple((r["id"], r["when"]) for r in rules)
+    with _DAG_CACHE_LOCK:
+        dag = _DAG_CACHE.get(key)
+        if dag is not None:
+            _DAG_CACHE.move_to_end(key)
+            return dag
+    built = PredicateDAG(rules)   # construit în afara lock-ului
+    with _DAG_CACHE_LOCK:
+        # dacă alt thread l-a construit între timp, se păstrează al lui (timpii se acumulează pe unul singur)
+        dag = _DAG_CACHE.setdefault(key, built)
+        _DAG_CACHE.move_to_end(key)
+        while len(_DAG_CACHE) > _DAG_CACHE_SIZE:
+            _DAG_CACHE.popitem(last=False)
+    return dag
+
+def rule_hits(df: pd.DataFrame, rules: List[Dict[str, Any]], indexed: bool = True) -> Dict[str, np.ndarray]:
+    """Vectorul boolean de potriviri (pozițional) pentru fiecare regulă, după id.
+
+    Cu `indexed=True` fiecare regulă cu gărzi se evaluează doar pe grupurile de rânduri
+    ale căror chei îi satisfac gărzile, deci costul crește cu regulile care se potrivesc,
+    nu cu numărul total de reguli. Subexpresiile comune se calculează o singură dată
+    per apel (vezi `PredicateDAG`).
+    """
+    n = len(df)
+    guards = [_effective_guards(df, r) for r in rules] if indexed and n else [{} for _ in rules]
+    key_cols = sorted({c for g in guards for c in g})
+    key_cols = [c for c in key_cols if df[c].nunique(dropna=False) <= MAX_GUARD_CARDINALITY]
+    guards = [{c: v for c, v in g.items() if c in key_cols} for g in guards]
+
+    dag = get_dag(rules)
+    memo: Dict[str, Any] = {}
+    hits: Dict[str, np.ndarray] = {}
+    guarded = [i for i, g in enumerate(guards) if g]
+    for i, r in enumerate(rules):
+        if not guards[i]:
+            hits[r["id"]] = dag.eval_rule(df, r["id"], memo)
+    if not guarded:
+        return hits
+
+    # index: (poziție coloană-cheie, valoare) -> reguli
+    index: List[Dict[Any, List[int]]] = [defaultdict(list) for _ in key_cols]
+    for i in guarded:
+        for c, vals in guards[i].items():
+            j = key_cols.index(c)
+            for v in set(vals):
+                index[j][v].append(i)
+
+    rows_for: Dict[int, List[np.ndarray]] = defaultdict(list)
+    for key, pos in df.groupby(key_cols, dropna=False, sort=False).indices.items():
+        key = key if isinstance(key, tuple) else (key,)
+        matched: Dict[int, int] = defaultdict(int)
+        for j, v in enumerate(key):
+            try:
+                for i in index[j].get(v, ()):
+                    matched[i] += 1
+            except TypeError:   # valoare nehashabilă => nicio gardă nu o poate egala
+                continue
+        for i, cnt in matched.items():
+            if cnt == len(guards[i]):
+                rows_for[i].append(pos)
+
+    for i in guarded:
+        r = rules[i]
+        h = np.zeros(n, dtype=bool)
+        if rows_for[i]:
+            rows = np.concatenate(rows_for[i])
+            if len(rows) == n:
+                h = dag.eval_rule(df, r["id"], memo)
+            else:
+                h[rows] = dag.eval_rule(df, r["id"], memo, rows)
+        hits[r["id"]] = h
+    return {r["id"]: hits[r["id"]] for r in rules}
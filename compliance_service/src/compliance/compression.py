@@ -0,0 +1,123 @@
+# src/compliance/compression.py
+"""Compresia artefactelor stocate (files/, reports/) și negocierea Content-Encoding.
+
+    <id>.csv   ->  <id>.csv.zst   (zstd, codec-ul din pyarrow)
+    <id>.json  ->  <id>.json.gz   (gzip, stdlib)
+
+Codec-ul unui fișier se vede din extensie, deci cititorii decomprimă transparent
+și fișierele vechi, necomprimate, rămân valide. Numele codec-urilor sunt chiar
+content-coding-urile HTTP, așa că un raport comprimat se poate trimite ca atare
+clienților care acceptă encoding-ul lui.
+
+zstd folosește codec-ul inclus în pyarrow (fără pachetul `zstandard`); fără el,
+scriitorii revin la gzip.
+
+Modulul nu are importuri relative: îl folosește și aplicația principală
+(compliance_service/src în sys.path, ca `compliance.compression`).
+"""
+import gzip
+import os
+import shutil
+from typing import IO, Optional
+
+CODECS = {"zstd": ".zst", "gzip": ".gz"}    # content-coding HTTP -> extensie
+COPY_CHUNK_BYTES = 1 << 20
+GZIP_LEVEL = int(os.getenv("GZIP_LEVEL", "6"))
+
+
+def _zstd_available() -> bool:
+    try:
+        import pyarrow as pa
+    except ImportError:
+        return False
+    return pa.Codec.is_available("zstd")
+
+
+def resolve(codec: Optional[str]) -> Optional[str]:
+    """Codec-ul efectiv pentru o setare ("zstd" | "gzip" | "none"); zstd indisponibil -> gzip."""
+    codec = (codec or "").strip().lower()
+    if codec in ("", "none", "identity"):
+        return None
+    if codec not in CODECS:
+        raise ValueError(f"Unknown compression codec {codec!r} (expected one of: {', '.join(CODECS)}, none)")
+    if codec == "zstd" and not _zstd_available():
+        return "gzip"
+    return codec
+
+
+def codec_of(path: str) -> Optional[str]:
+    """Codec-ul fișierului, după extensie (None = necomprimat)."""
+    for codec, ext in CODECS.items():
+        if path.endswith(ext):
+            return codec
+    return None
+
+
+def strip_codec(path: str) -> str:
+    """Calea fără extensia de compresie: files/<id>.csv.zst -> files/<id>.csv."""
+    codec = codec_of(path)
+    return path[:-len(CODECS[codec])] if codec else path
+
+
+def open_read(path: str) -> IO[bytes]:
+    """Stream binar cu conținutul decomprimat."""
+    codec = codec_of(path)
+    if codec == "gzip":
+        return gzip.open(path, "rb")
+    if codec == "zstd":
+        import pyarrow as pa
+        return pa.input_stream(path, compression="zstd")
+    return open(path, "rb")
+
+
+def _open_write(path: str, codec: Optional[str]) -> IO[bytes]:
+    if codec == "gzip":
+        # mtime=0: aceleași date dau aceiași bytes (content_hash stabil)
+        return gzip.GzipFile(path, "wb", compresslevel=GZIP_LEVEL, mtime=0)
+    if codec == "zstd":
+        import pyarrow as pa
+        return pa.output_stream(path, compression="zstd")
+    return open(path, "wb")
+
+
+def read_bytes(path: str) -> bytes:
+    """Conținutul decomprimat."""
+    with open_read(path) as f:
+        return f.read()
+
+
+def write_bytes(path: str, data: bytes, codec: Optional[str]) -> None:
+    """Scrie `data` comprimat cu `codec` la `path` (extensia e a apelantului), atomic."""
+    tmp = path + ".tmp"
+    with _open_write(tmp, codec) as out:
+        out.write(data)
+    os.replace(tmp, path)
+
+
+def compress_file(src: str, path: str, codec: Optional[str]) -> None:
+    """Copiază `src` comprimat la `path`, în flux (fără să încarce fișierul în memorie), atomic."""
+    tmp = path + ".tmp"
+    with open(src, "rb") as f, _open_write(tmp, codec) as out:
+        shutil.copyfileobj(f, out, COPY_CHUNK_BYTES)
+    os.replace(tmp, path)
+
+
+def accepts(accept_encoding: Optional[str], codec: str) -> bool:
+    """Dacă header-ul Accept-Encoding al clientului permite `codec` (q=0 îl exclude; `*` acceptă orice)."""
+    explicit = wildcard = None
+    for item in (accept_encoding or "").split(","):
+        name, _, params = item.strip().partition(";")
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        name = name.strip().lower()
+        if name == codec:
+            explicit = q > 0
+        elif name == "*":
+            wildcard = q > 0
+    return explicit if explicit is not None else bool(wildcard)
@@ -0,0 +1,102 @@
+# src/compliance/config_manager.py
+"""Configurație de reguli/praguri reîncărcabilă la cald și versionată.
+
+Un thread de fundal urmărește mtime-urile fișierelor din config/; la o modificare
+recompilează ruleset-ul (YAML -> reguli compilate + DAG) și îl înlocuiește atomic.
+Versiunea este hash-ul conținutului fișierelor, deci aceeași configurație are aceeași
+versiune și după un restart (poate fi folosită în cheile de cache). Hash-ul și ruleset-ul
+se calculează din aceiași bytes, citiți o singură dată: o scriere între două citiri nu poate
+da o versiune care nu corespunde regulilor încărcate.
+"""
+import hashlib, os, threading, time
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from .compiler import get_dag
+from .ruleset import CONFIG_FILES, parse_ruleset, read_config
+
+class Ruleset(NamedTuple):
+    version: str
+    thresholds: dict
+    rules: List[dict]
+    loaded_at: float
+
+class ConfigManager:
+    def __init__(self, config_dir: str, poll_seconds: float = 2.0):
+        self.config_dir = config_dir
+        self.poll_seconds = poll_seconds
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._mtimes = self._stat()
+        self._current = self._compile()
+
+    def _stat(self) -> Tuple:
+        out = []
+        for rel in CONFIG_FILES:
+            try:
+                st = os.stat(os.path.join(self.config_dir, rel))
+                out.append((rel, st.st_mtime_ns, st.st_size))
+            except FileNotFoundError:
+                out.append((rel, None, None))
+        return tuple(out)
+
+    @staticmethod
+    def _version(contents: Dict[str, bytes]) -> str:
+        h = hashlib.sha1()
+        for rel in CONFIG_FILES:
+            h.update(rel.encode("utf-8") + b"\0" + contents[rel])
+        return h.hexdigest()[:12]
+
+    def _compile(self) -> Ruleset:
+        contents = read_config(self.config_dir)
+        version = self._version(contents)
+        thresholds, rules = parse_ruleset(contents)
+        get_dag(rules)   # DAG-ul se construiește acum, nu la primul request
+        return Ruleset(version, thresholds, rules, time.time())
+
+    def snapshot(self) -> Ruleset:
+        """Ruleset-ul curent; un request folosește același snapshot de la început la sfârșit."""
+        return self._current
+
+    @property
+    def version(self) -> str:
+        return self._current.version
+
+    def check(self, force: bool = False) -> bool:
+        """Recompilează dacă s-a schimbat ceva în config/; întoarce True dacă versiunea s-a schimbat."""
+        with self._lock:
+            mtimes = self._stat()
+            if not force and mtimes == self._mtimes:
+                return False
+            self._mtimes = mtimes   # la eroare nu reîncercăm până la următoarea modificare
+            try:
+                new = self._compile()
+            except Exception as e:   # YAML invalid / fișier scris pe jumătate: păstrăm versiunea veche
+                print(f"[compliance] config reload failed, keeping {self._current.version}: {e}")
+                return False
+            changed = new.version != self._current.version
+            if changed:
+                self._current = new
+            return changed
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.poll_seconds):
+            self.check()
+
+    def start(self) -> None:
+        if self._thread is None or not self._thread.is_alive():
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._watch, name="compliance-config-watch", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+_MANAGERS: Dict[str, ConfigManager] = {}
+
+def get_manager(config_dir: str) -> ConfigManager:
+    """Un manager per director (fără thread de fundal: `check()` se apelează explicit)."""
+    key = os.path.abspath(config_dir)
+    if key not in _MANAGERS:
+        _MANAGERS[key] = ConfigManager(config_dir)
+    return _MANAGERS[key]
@@ -1,26 +1,27 @@
 # src/compliance/evaluator.py
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Tuple
+
+from .impact import impact_total
+from .compiler import rule_hits, rule_inputs  # noqa: F401  (re-export)
 
 SEV_MAP = {"LOW":1, "MEDIUM":2, "HIGH":3, "CRITICAL":4}
 
-def _mask(df: pd.DataFrame, expr: str) -> pd.Series:
-    expr2 = expr.replace(" and ", " & ").replace(" or ", " | ")
-    try:
-        return df.eval(expr2)
-    except Exception:
-        return pd.Series(False, index=df.index)
+# coloanele adăugate de assemble_findings peste fapte
+RESULT_COLUMNS = ["compliance_findings", "impact_hint_bps_sum", "impact_hint_per_item_sum",
+                  "is_compliant", "findings_ids", "findings_text"]
 
-def run_rules(df: pd.DataFrame, rules: List[Dict[str, Any]], min_fail_severity: str = "MEDIUM") -> pd.DataFrame:
+def assemble_findings(df: pd.DataFrame, rules: List[Dict[str, Any]], hits: Dict[str, np.ndarray],
+                      min_fail_severity: str = "MEDIUM") -> pd.DataFrame:
+    """Construiește coloanele de findings din vectorii de potriviri (vezi `rule_hits`)."""
     out = df.copy()
     findings = [[] for _ in range(len(out))]
     hint_bps = [0.0]*len(out)
     hint_fee = [0.0]*len(out)
 
     for r in rules:
-        m = _mask(out, r["when"])
-        idxs = out.index[m]
-        for i in idxs:
+        for i in np.flatnonzero(hits[r["id"]]):
             findings[i].append({
                 "id": r["id"],
                 "title": r["title"],
@@ -47,3 +48,70 @@ def run_rules(df: pd.DataFrame, rules: List[Dict[str, Any]], min_fail_severity:
     out["findings_ids"] = out["compliance_findings"].apply(lambda L: ",".join(f["id"] for f in L) if L else "")
     out["findings_text"] = out["compliance_findings"].apply(lambda L: " | ".join(f["message"] for f in L) if L else "")
     return out
+
+def hits_from_results(res: pd.DataFrame, rules: List[Dict[str, Any]]) -> Dict[str, np.ndarray]:
+    """Reconstruiește vectorii de potriviri din coloana `findings_ids` a unui rezultat."""
+    split = res["findings_ids"].fillna("").astype(str).str.split(",").to_list()
+    pos = np.repeat(np.arange(len(split)), [len(L) for L in split])
+    ids = np.array([x for L in split for x in L], dtype=object)
+    hits = {}
+    for r in rules:
+        h = np.zeros(len(res), dtype=bool)
+        h[pos[ids == r["id"]]] = True
+        hits[r["id"]] = h
+    return hits
+
+def summarize_hits(df: pd.DataFrame, rules: List[Dict[str, Any]], hits: Dict[str, np.ndarray],
+                   min_fail_severity: str = "MEDIUM") -> Dict[str, Any]:
+    """Sumarul (non-conformitate, impact, contoare) calculat vectorial direct din potriviri."""
+    n = len(df)
+    cutoff = SEV_MAP.get(min_fail_severity.upper(), 2)
+    fail = np.zeros(n, dtype=bool)
+    bps = np.zeros(n)
+    per_item = np.zeros(n)
+    rule_counts = {}
+    for r in rules:
+        h = hits[r["id"]]
+        if SEV_MAP.get(r["severity"], 2) >= cutoff:
+            fail |= h
+        bps += h * r.get("impact_hint_bps", 0.0)
+        per_item += h * r.get("impact_hint_per_item", 0.0)
+        if h.any():
+            rule_counts[r["id"]] = int(h.sum())
+    amount = df["amount"].to_numpy(dtype=float) if "amount" in df.columns else np.zeros(n)
+    non = int(fail.sum())
+    return {
+        "rows": n,
+        "non_compliant": non,
+        "compliance_rate": ((n - non) / n if n else 1.0),
+        "total_estimated_impact": float(impact_total(amount, bps, per_item).sum()),
+        "rule_counts": dict(sorted(rule_counts.items(), key=lambda kv: -kv[1])),
+    }
+
+def finding_records(ids: List[str], rules: List[Dict[str, Any]], hits: Dict[str, np.ndarray],
+                    impact: np.ndarray) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """Rândurile pentru compliance.findings_tables, doar tranzacțiile cu findings:
+    (findings cu numărul de reguli și riscul maxim, perechi (rând, regulă) pentru tabela inversată)."""
+    n = len(ids)
+    count = np.zeros(n, dtype=np.int64)
+    rank = np.zeros(n, dtype=np.int64)
+    for r in rules:
+        h = hits[r["id"]]
+        count += h
+        rank[h] = np.maximum(rank[h], SEV_MAP.get(str(r["severity"]).upper(), 2))
+    levels = {v: k for k, v in SEV_MAP.items()}
+    rows = np.flatnonzero(count)
+    risk = {int(i): levels[int(rank[i])] for i in rows}
+    findings = [
+        {"row_index": int(i), "transaction_id": str(ids[i])[:64], "rule_count": int(count[i]),
+         "risk_level": risk[int(i)], "impact": float(impact[i])}
+        for i in rows
+    ]
+    rule_rows = [
+        {"row_index": int(i), "rule_id": r["id"], "risk_level": risk[int(i)]}
+        for r in rules for i in np.flatnonzero(hits[r["id"]])
+    ]
+    return findings, rule_rows
+
+def run_rules(df: pd.DataFrame, rules: List[Dict[str, Any]], min_fail_severity: str = "MEDIUM") -> pd.DataFrame:
+    return assemble_findings(df, rules, rule_hits(df, rules), min_fail_severity=min_fail_severity)
@@ -7,6 +7,14 @@ EU = {
     "LV","LT","LU","MT","NL","PL","PT","RO","SK","SI","ES","SE"
 }
 
+# coloanele de fapte care depind de fiecare prag din thresholds.yaml (cheie "secțiune.nume");
+# pragurile care nu apar aici nu sunt citite de derive_facts
+THRESHOLD_COLUMNS = {
+    "defaults.pos_clearing_hours": ["cfg_pos_hours"],
+    "defaults.cnp_clearing_hours": ["cfg_cnp_hours"],
+    "defaults.low_value_threshold": ["sca_required"],
+}
+
 def _region_from_country(cc: str) -> str:
     if not isinstance(cc, str) or cc == "":
         return "ROW"
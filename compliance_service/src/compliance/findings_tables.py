@@ -0,0 +1,70 @@
+# src/compliance/findings_tables.py
+"""Findings-urile verificărilor de conformitate, persistate și indexate.
+
+/api/compliance/check scrie un rând per tranzacție cu cel puțin o regulă încălcată:
+
+    compliance_findings       (file_id, row_index)           tranzacția, nr. de reguli, risc, impact
+    compliance_finding_rules  (file_id, row_index, rule_id)  regulile încălcate; index (regulă, risc, dată)
+
+Sursa de adevăr pentru regulile unei tranzacții e tabela inversată: un rând per
+(tranzacție, regulă), fără limită pe numărul de reguli din ruleset (o mască pe
+biți ar fi plafonat ruleset-urile la 63 de reguli distincte, pentru totdeauna).
+Întrebările pe o regulă („toate findings-urile HIGH pentru V1 luna asta”) folosesc
+indexul (rule_id, risk_level, checked_at); combinațiile de reguli se rezolvă cu
+join-uri pe aceeași tabelă.
+
+Rândurile unui fișier se înlocuiesc la fiecare verificare (ultima versiune de
+ruleset câștigă). Inserările se fac în loturi de `batch_rows` rânduri.
+
+Doar SQLAlchemy Core, fără numpy: modulul e importat și de migrările din init-db/.
+"""
+import datetime
+from typing import Dict, List
+
+from sqlalchemy import Column, DateTime, Float, Index, Integer, String, Table, delete
+
+from .summary_tables import METADATA
+
+RISK_LEVELS = ("LOW", "MEDIUM", "HIGH", "CRITICAL")
+
+compliance_findings = Table(
+    "compliance_findings", METADATA,
+    Column("file_id", String(36), primary_key=True),
+    Column("row_index", Integer, primary_key=True),
+    Column("transaction_id", String(64)),
+    Column("rule_count", Integer, nullable=False),          # câte reguli încalcă (detaliile: finding_rules)
+    Column("risk_level", String(16), nullable=False),      # cea mai mare severitate din findings
+    Column("impact", Float, nullable=False, default=0.0),  # impact_estimated_total
+    Column("ruleset_version", String(64)),
+    Column("checked_at", DateTime, nullable=False),
+    Index("ix_compliance_findings_risk_checked", "risk_level", "checked_at"),
+    Index("ix_compliance_findings_transaction_id", "transaction_id"),
+)
+
+compliance_finding_rules = Table(
+    "compliance_finding_rules", METADATA,
+    Column("file_id", String(36), primary_key=True),
+    Column("row_index", Integer, primary_key=True),
+    Column("rule_id", String(64), primary_key=True),
+    Column("risk_level", String(16), nullable=False),
+    Column("checked_at", DateTime, nullable=False),
+    Index("ix_compliance_finding_rules_rule_risk_checked", "rule_id", "risk_level", "checked_at"),
+)
+
+
+def replace_findings(conn, file_id: str, findings: List[Dict], rule_rows: List[Dict], ruleset_version: str,
+                     batch_rows: int = 5000) -> None:
+    """Înlocuiește findings-urile fișierului în tranzacția conexiunii primite.
+
+    `findings`: {row_index, transaction_id, rule_count, risk_level, impact};
+    `rule_rows`: {row_index, rule_id, risk_level}, câte unul per regulă încălcată.
+    """
+    now = datetime.datetime.utcnow()
+    conn.execute(delete(compliance_finding_rules).where(compliance_finding_rules.c.file_id == file_id))
+    conn.execute(delete(compliance_findings).where(compliance_findings.c.file_id == file_id))
+    for table, rows, extra in (
+        (compliance_findings, findings, {"file_id": file_id, "ruleset_version": ruleset_version, "checked_at": now}),
+        (compliance_finding_rules, rule_rows, {"file_id": file_id, "checked_at": now}),
+    ):
+        for start in range(0, len(rows), batch_rows):
+            conn.execute(table.insert(), [{**r, **extra} for r in rows[start:start + batch_rows]])
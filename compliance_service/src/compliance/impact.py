@@ -1,6 +1,12 @@
 # src/compliance/impact.py
 import pandas as pd
 
+IMPACT_COLUMNS = ["impact_estimated_bps_amt", "impact_estimated_per_item_amt", "impact_estimated_total"]
+
+def impact_total(amount, hint_bps_sum, hint_per_item_sum):
+    """Impact estimat: bps aplicat pe sumă + taxa fixă pe tranzacție (acceptă Series sau ndarray)."""
+    return amount * (hint_bps_sum / 10000.0) + hint_per_item_sum
+
 def estimate_impact(df: pd.DataFrame) -> pd.DataFrame:
     out = df.copy()
     out["impact_estimated_bps_amt"] = out["amount"] * (out["impact_hint_bps_sum"] / 10000.0)
@@ -0,0 +1,113 @@
+# src/compliance/incremental.py
+"""Stare persistată per fișier (fapte + vectori de potriviri per regulă), ca după o
+modificare în config/ să re-evaluăm doar regulile afectate.
+
+Structura pe disc:
+    <root>/<file_id>__<format>/manifest.json   coloane mapate, fingerprint reguli, praguri
+    <root>/<file_id>__<format>/facts.pkl       faptele derivate
+    <root>/<file_id>__<format>/hits/<rule>.npy potrivirile unei reguli (np.packbits)
+
+Fiecare fișier se scrie atomic (temporar unic + os.replace), iar manifestul ultimul:
+cititorii și scriitorii concurenți nu văd niciodată un fișier parțial.
+"""
+import json, os, re, uuid
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from .evaluator import rule_hits
+from .facts import derive_facts
+from .ruleset import plan_update, rule_fingerprint, threshold_values
+
+FORMATS = ("auto", "mastercard", "visa")
+FILE_ID_RE = re.compile(r"^[0-9A-Za-z][0-9A-Za-z_-]{0,63}$")   # uuid-uri (și id-uri vechi), fără separatori
+
+def state_dir(root: str, file_id: str, force_format: str = "auto") -> str:
+    """Directorul de stare; ValueError pentru id-uri sau formate care ar ieși din `root`."""
+    fmt = (force_format or "auto").lower()
+    if not FILE_ID_RE.match(file_id or ""):
+        raise ValueError(f"Invalid file id {file_id!r}")
+    if fmt not in FORMATS:
+        raise ValueError(f"Invalid format {force_format!r} (expected one of: {', '.join(FORMATS)})")
+    return os.path.join(root, f"{file_id}__{fmt}")
+
+def _atomic_write(target: str, write) -> None:
+    # temporar unic: două procese care scriu aceeași stare nu-și amestecă octeții
+    tmp = f"{target}.{uuid.uuid4().hex}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            write(f)
+        os.replace(tmp, target)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+def _write_hit(path: str, rule_id: str, hit: np.ndarray) -> None:
+    _atomic_write(os.path.join(path, "hits", f"{rule_id}.npy"), lambda f: np.save(f, np.packbits(hit)))
+
+def _write_facts(path: str, facts: pd.DataFrame) -> None:
+    _atomic_write(os.path.join(path, "facts.pkl"), facts.to_pickle)
+
+def _write_manifest(path: str, manifest: dict) -> None:
+    _atomic_write(os.path.join(path, "manifest.json"), lambda f: f.write(json.dumps(manifest).encode("utf-8")))
+
+def save_state(path: str, mapped_columns: List[str], facts: pd.DataFrame, thresholds: dict,
+               rules: List[dict], hits: Dict[str, np.ndarray]) -> None:
+    os.makedirs(os.path.join(path, "hits"), exist_ok=True)
+    _write_facts(path, facts)
+    for rid, hit in hits.items():
+        _write_hit(path, rid, hit)
+    _write_manifest(path, {
+        "rows": len(facts),
+        "mapped_columns": list(mapped_columns),
+        "rules": {r["id"]: rule_fingerprint(r) for r in rules},
+        "thresholds": threshold_values(thresholds),
+    })
+
+def load_state(path: str) -> Optional[Dict[str, Any]]:
+    manifest_path = os.path.join(path, "manifest.json")
+    if not os.path.exists(manifest_path):
+        return None
+    with open(manifest_path, encoding="utf-8") as f:
+        manifest = json.load(f)
+    facts = pd.read_pickle(os.path.join(path, "facts.pkl"))
+    n = manifest["rows"]
+    hits = {
+        rid: np.unpackbits(np.load(os.path.join(path, "hits", f"{rid}.npy")), count=n).astype(bool)
+        for rid in manifest["rules"]
+    }
+    return {"manifest": manifest, "facts": facts, "hits": hits}
+
+def refresh_state(path: str, thresholds: dict, rules: List[dict]) -> Optional[Dict[str, Any]]:
+    """Aduce starea salvată la zi cu configurația curentă, patch-uind doar ce s-a schimbat.
+
+    Întoarce None dacă nu există stare salvată (=> rulare completă + `save_state`).
+    """
+    state = load_state(path)
+    if state is None:
+        return None
+    plan = plan_update(state["manifest"], thresholds, rules)
+    facts, hits = state["facts"], state["hits"]
+
+    if plan["rederive_facts"]:
+        facts = derive_facts(facts[state["manifest"]["mapped_columns"]], thresholds)
+        _write_facts(path, facts)
+
+    todo = [r for r in rules if r["id"] in set(plan["reevaluate"])]
+    if todo:
+        new_hits = rule_hits(facts, todo)
+        for rid, hit in new_hits.items():
+            _write_hit(path, rid, hit)
+        hits.update(new_hits)
+    for rid in plan["removed"]:
+        hits.pop(rid, None)
+        try:
+            os.remove(os.path.join(path, "hits", f"{rid}.npy"))
+        except FileNotFoundError:
+            pass
+
+    if todo or plan["removed"] or plan["changed_thresholds"]:
+        _write_manifest(path, {**state["manifest"], "rules": plan["rules"], "thresholds": plan["thresholds"]})
+    return {"facts": facts, "hits": hits, "plan": plan}
@@ -0,0 +1,227 @@
+# src/compliance/ingest.py
+"""Registrul de scheme per brand și citirea tipizată a fișierelor de tranzacții.
+
+O singură sursă pentru: coloanele obligatorii la upload, tipurile coloanelor,
+domeniile categoriale și features-urile modelelor. `read_csv_typed` citește doar
+coloanele cerute, cu tipuri explicite, prin parserul CSV multithreaded din pyarrow.
+
+Tipurile sunt cele pe care pd.read_csv le deducea pe fișierele de antrenare
+(ex. `mc_eci_indicator` float64: "05" -> 5.0), deci valorile, și `str(val)` pe ele,
+rămân aceleași pentru modele, SHAP și mapper-e. Coloanele nedeclarate sunt deduse
+de pyarrow (fără timestamp-uri); dacă pyarrow nu poate converti fișierul, se
+revine la pd.read_csv cu inferență.
+
+CSV-urile stocate comprimat (<id>.csv.zst / .csv.gz) se citesc la fel: pyarrow
+decomprimă după extensie, iar `csv_columns` și fallback-ul pandas trec prin
+`compression.open_read`.
+
+Modulul îl folosește și aplicația principală (compliance_service/src în sys.path,
+ca `compliance.ingest`); singurul import intern e compression.py, din același pachet.
+"""
+import os
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import pandas as pd
+
+from .compression import open_read
+
+class BrandSchema(NamedTuple):
+    brand: str
+    prefix: str
+    dtypes: Dict[str, str]          # coloană -> "int64" | "float64" | "bool" | "string"
+    required: List[str]             # coloanele cerute la upload
+    features: List[str]             # intrările modelului de interchange
+    domains: Dict[str, list]        # valorile permise (coduri numerice comparate ca numere)
+    not_null: Tuple[str, ...] = ()  # coloane care nu pot lipsi pe niciun rând
+    dimensions: Dict[str, str] = {}   # dimensiunile tabelelor de sumar -> coloana din fișier
+    rollup_keys: Dict[str, str] = {}  # "date" / "merchant" pentru rollup-urile zilnice -> coloana din fișier
+    identity: Tuple[str, ...] = ()    # (referință RRN/ARN, sumă, dată): cheia de deduplicare între upload-uri
+
+MASTERCARD = BrandSchema(
+    brand="mastercard",
+    prefix="mc_",
+    dtypes={
+        "mc_mti": "int64",
+        "mc_processing_code": "int64",
+        "mc_acquirer_bin": "int64",
+        "mc_issuer_bin": "int64",
+        "mc_merchant_category_code": "int64",
+        "mc_merchant_country_code": "string",
+        "mc_card_acceptor_id_code": "string",
+        "mc_card_acceptor_name_location": "string",
+        "mc_transaction_currency_code": "string",
+        "mc_settlement_currency_code": "string",
+        "mc_transaction_amount": "float64",
+        "mc_settlement_amount": "float64",
+        "mc_exchange_rate": "float64",
+        "mc_presentment_date": "string",
+        "mc_pos_entry_mode": "int64",
+        "mc_eci_indicator": "float64",
+        "mc_ucaf_collection_indicator": "int64",
+        "mc_cvv2_result_code": "string",
+        "mc_avs_result_code": "string",
+        "mc_cross_border_indicator": "bool",
+        "mc_retrieval_reference_number": "string",
+        "mc_auth_id_response": "int64",
+        "mcc_group": "string",
+        "downgraded": "int64",
+        "channel_type": "string",
+        "eci_3ds_auth": "int64",
+        # interchange_fee / rate_pct / fixed_fee / cross_border_flag apar și ca text ("5.19 EUR",
+        # "1.50%"), și ca numere, în funcție de export: rămân deduse
+    },
+    required=[
+        "mc_mti", "mc_processing_code", "mc_acquirer_bin", "mc_issuer_bin", "mc_merchant_category_code",
+        "mc_merchant_country_code", "mc_card_acceptor_id_code", "mc_card_acceptor_name_location",
+        "mc_transaction_currency_code", "mc_settlement_currency_code", "mc_transaction_amount",
+        "mc_settlement_amount", "mc_exchange_rate", "mc_presentment_date", "mc_pos_entry_mode",
+        "mc_eci_indicator", "mc_ucaf_collection_indicator", "mc_cvv2_result_code", "mc_avs_result_code",
+        "mc_cross_border_indicator", "mc_retrieval_reference_number", "mc_auth_id_response",
+        "interchange_fee", "rate_pct", "fixed_fee", "mcc_group", "downgraded", "channel_type",
+        "cross_border_flag", "eci_3ds_auth",
+    ],
+    features=[
+        "mc_pos_entry_mode",
+        "mc_eci_indicator",
+        "mc_ucaf_collection_indicator",
+        "mc_cvv2_result_code",
+        "mc_avs_result_code",
+        "mc_cross_border_indicator",
+        "mcc_group",
+        "channel_type",
+    ],
+    domains={
+        "mc_eci_indicator": [0, 1, 2, 5, 6, 7],
+        "mc_pos_entry_mode": [0, 1, 2, 3, 4, 5, 7, 9, 10, 79, 80, 81, 82, 90, 91],
+        "mc_ucaf_collection_indicator": [0, 1, 2, 3, 4, 5, 6, 7],
+        "mc_cvv2_result_code": ["M", "N", "P", "S", "U"],
+        "mc_avs_result_code": ["A", "N", "R", "S", "U", "W", "X", "Y", "Z"],
+        "mcc_group": ["airline", "fuel", "other", "supermarket"],
+        "channel_type": ["card_present", "card_present_chip", "card_present_contactless", "card_present_manual",
+                         "card_present_swipe", "ecommerce", "ecommerce_3ds", "ecommerce_non3ds"],
+    },
+    not_null=("mc_acquirer_bin", "mc_issuer_bin", "mc_transaction_amount", "mc_transaction_currency_code",
+              "mc_merchant_country_code", "mc_retrieval_reference_number"),
+    dimensions={"mcc_group": "mcc_group", "channel": "channel_type"},
+    rollup_keys={"date": "mc_presentment_date", "merchant": "mc_card_acceptor_id_code"},
+    identity=("mc_retrieval_reference_number", "mc_transaction_amount", "mc_presentment_date"),
+)
+
+VISA = BrandSchema(
+    brand="visa",
+    prefix="visa_",
+    dtypes={
+        "visa_cross_border_indicator": "string",
+        "visa_channel_type": "string",
+        "visa_eci_indicator": "int64",
+        "visa_cvv2_result_code": "string",
+        "visa_avs_result_code": "string",
+        "visa_pos_entry_mode": "int64",
+        "visa_terminal_capability_code": "int64",
+        "visa_merchant_category_code": "int64",
+        "fee_rate": "float64",
+        "currency": "string",
+        "visa_merchant_country_code": "string",
+        "visa_transaction_currency_code": "string",
+        "visa_settlement_currency_code": "string",
+        "visa_transaction_amount": "float64",
+        "visa_settlement_amount": "float64",
+        "visa_exchange_rate": "float64",
+        "visa_presentment_date": "string",
+        "visa_auth_date": "string",
+        "visa_retrieval_reference_number": "string",
+        "visa_arn": "string",
+        "visa_card_acceptor_id_code": "string",
+        "visa_product_code": "string",
+        "merchant_name": "string",
+        "issuer_country": "string",
+    },
+    required=[
+        "visa_cross_border_indicator",
+        "visa_channel_type",
+        "visa_eci_indicator",
+        "visa_cvv2_result_code",
+        "visa_avs_result_code",
+        "visa_pos_entry_mode",
+        "visa_terminal_capability_code",
+        "visa_merchant_category_code",
+    ],
+    features=[
+        "visa_cross_border_indicator",      # binary categorical: 'Y' or 'N'
+        "visa_channel_type",                # categorical: 'ecommerce', 'card_present', etc.
+        "visa_eci_indicator",               # numeric or ordinal: integer (e.g., 2 to 7)
+        "visa_cvv2_result_code",            # categorical: 'M', 'N', 'U', etc.
+        "visa_avs_result_code",             # categorical: 'Y', 'N', 'A', 'Z', 'U', etc.
+        "visa_pos_entry_mode",              # numeric: e.g., 1 = manual, 5 = chip, 7 = contactless
+        "visa_terminal_capability_code",    # numeric: terminal risk profile (low = risky)
+        "visa_merchant_category_code",      # categorical: MCC code, can be grouped or one-hot
+    ],
+    domains={
+        "visa_cross_border_indicator": ["N", "Y"],
+        "visa_channel_type": ["card_present", "card_present_chip", "card_present_contactless", "card_present_manual",
+                              "card_present_swipe", "ecommerce", "ecommerce_3ds", "ecommerce_non3ds", "moto"],
+        "visa_eci_indicator": [0, 1, 2, 3, 4, 5, 6, 7],
+        "visa_pos_entry_mode": [0, 1, 2, 3, 4, 5, 7, 10, 90, 91],
+        "visa_cvv2_result_code": ["M", "N", "P", "S", "U"],
+        "visa_avs_result_code": ["A", "N", "R", "S", "U", "W", "X", "Y", "Z"],
+    },
+    not_null=("visa_issuer_bin", "visa_transaction_amount", "visa_merchant_country_code"),
+    # exporturile Visa nu au grup MCC: grupul e chiar codul MCC
+    dimensions={"mcc_group": "visa_merchant_category_code", "channel": "visa_channel_type"},
+    rollup_keys={"date": "visa_presentment_date", "merchant": "visa_card_acceptor_id_code"},
+    identity=("visa_arn", "visa_transaction_amount", "visa_presentment_date"),
+)
+
+SCHEMAS: Dict[str, BrandSchema] = {s.brand: s for s in (MASTERCARD, VISA)}
+
+def get_schema(brand: Optional[str]) -> Optional[BrandSchema]:
+    return SCHEMAS.get((brand or "").lower())
+
+def detect_brand(columns: List[str]) -> Optional[str]:
+    """Brandul după prefixul coloanelor (visa_ are prioritate, ca la mapare)."""
+    for s in (VISA, MASTERCARD):
+        if any(str(c).lower().startswith(s.prefix) for c in columns):
+            return s.brand
+    return None
+
+def csv_columns(path: str) -> List[str]:
+    """Header-ul, fără să citească datele (și din CSV-uri comprimate, vezi `compression`)."""
+    with open_read(path) as f:
+        return list(pd.read_csv(f, nrows=0, encoding="utf-8").columns)
+
+def _arrow_type(dtype: str):
+    import pyarrow as pa
+    return {"int64": pa.int64(), "float64": pa.float64(), "bool": pa.bool_(), "string": pa.string()}[dtype]
+
+def read_csv_typed(path: str, brand: Optional[str] = None,
+                   columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Citește `columns` (None = toate; cele absente din fișier sunt ignorate) cu tipurile
+    din schema brandului (dedus din header dacă lipsește)."""
+    header = csv_columns(path)
+    if columns is not None:
+        present = set(header)
+        columns = [c for c in columns if c in present]
+    schema = get_schema(brand) or get_schema(detect_brand(header))
+    dtypes = schema.dtypes if schema else {}
+    wanted = header if columns is None else columns
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pacsv
+        table = pacsv.read_csv(
+            path,
+            read_options=pacsv.ReadOptions(use_threads=True),
+            convert_options=pacsv.ConvertOptions(
+                include_columns=wanted,
+                column_types={c: _arrow_type(dtypes[c]) for c in wanted if c in dtypes},
+                strings_can_be_null=True,
+                timestamp_parsers=[],     # datele rămân text, ca la pd.read_csv
+            ),
+        )
+        df = table.to_pandas()
+    except (ImportError, ValueError, KeyError) as e:   # pa.ArrowInvalid e ValueError
+        print(f"[ingest] pyarrow failed for {os.path.basename(path)}, falling back to pandas: {e}")
+        with open_read(path) as f:
+            return pd.read_csv(f, encoding="utf-8", usecols=columns)[wanted]
+    for c in df.columns[df.dtypes == object]:   # None (Arrow) -> NaN (ca read_csv)
+        df[c] = df[c].fillna(float("nan"))
+    return df
@@ -16,6 +16,14 @@ def _pick(df: pd.DataFrame, names, default=None):
             return df[n]
     return pd.Series([default] * len(df))
 
+# coloanele brute citite de map_mastercard (restul fișierului nu e necesar)
+INPUT_COLUMNS = [
+    "mc_merchant_country_code", "mc_issuer_bin", "mc_transaction_amount", "mc_transaction_currency_code",
+    "mc_settlement_amount", "mc_settlement_currency_code", "channel_type", "mc_pos_entry_mode",
+    "mc_avs_result_code", "mc_eci_indicator", "mc_merchant_category_code", "mc_cross_border_indicator",
+    "mc_retrieval_reference_number",
+]
+
 def map_mastercard(df_in: pd.DataFrame) -> pd.DataFrame:
     """
     Mapper pentru fișierul tău MC cu headere fixe:
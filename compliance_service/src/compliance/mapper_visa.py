@@ -34,6 +34,15 @@ def _load_bin_map():
                                 tbl["country"].str.strip().str.upper()))
     return {}
 
+# coloanele brute citite de map_visa (opționalele lipsă sunt tratate în mapper)
+INPUT_COLUMNS = [
+    "visa_merchant_country_code", "visa_transaction_amount", "visa_transaction_currency_code",
+    "visa_channel_type", "visa_pos_entry_mode", "visa_avs_result_code", "visa_eci_indicator",
+    "visa_eci_3ds_auth", "visa_product_code", "visa_cross_border_indicator", "visa_issuer_bin",
+    "issuer_country", "visa_presentment_date", "visa_auth_date", "visa_arn",
+    "visa_retrieval_reference_number", "visa_card_acceptor_id_code", "merchant_name",
+]
+
 def map_visa(df_in: pd.DataFrame) -> pd.DataFrame:
     """
     Transformă dataset-ul VISA (clearing-like) la schema internă a Compliance Checker.
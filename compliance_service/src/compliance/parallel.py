@@ -0,0 +1,122 @@
+# src/compliance/parallel.py
+import os
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .facts import derive_facts
+from .evaluator import run_rules
+from .impact import estimate_impact
+
+MapFn = Optional[Callable[[pd.DataFrame], pd.DataFrame]]
+
+# starea fiecărui proces worker (setată o singură dată de initializer)
+_WORKER: Dict[str, Any] = {}
+
+
+def default_workers() -> int:
+    """Numărul de workeri din env (COMPLIANCE_WORKERS); 1 = fără pool."""
+    try:
+        return max(1, int(os.getenv("COMPLIANCE_WORKERS", "1")))
+    except ValueError:
+        return 1
+
+
+def partition_rows(n: int, parts: int) -> List[Tuple[int, int]]:
+    """Împarte [0, n) în `parts` intervale contigue, cât mai egale."""
+    parts = max(1, min(parts, n)) if n else 1
+    step, extra = divmod(n, parts)
+    bounds, start = [], 0
+    for i in range(parts):
+        stop = start + step + (1 if i < extra else 0)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+def evaluate_partition(df_raw: pd.DataFrame, map_fn: MapFn, thresholds: dict,
+                       rules: List[dict], min_fail_severity: str = "MEDIUM") -> pd.DataFrame:
+    """map -> facts -> rules -> impact pe o bucată de rânduri (index 0..n-1)."""
+    df = df_raw.reset_index(drop=True)
+    if map_fn is not None:
+        df = map_fn(df).reset_index(drop=True)
+    df1 = derive_facts(df, thresholds)
+    df2 = run_rules(df1, rules, min_fail_severity=min_fail_severity)
+    return estimate_impact(df2)
+
+
+def summarize(res: pd.DataFrame) -> Dict[str, Any]:
+    """Sumarul unei bucăți de rezultate; se combină cu `merge_summaries`."""
+    n = len(res)
+    counts = (
+        res.get("findings_ids", pd.Series([""] * n, dtype=object)).fillna("").astype(str)
+          .str.split(",").explode().value_counts()
+          .to_dict()
+    )
+    counts.pop("", None)
+    return {
+        "rows": n,
+        "non_compliant": int((~res["is_compliant"]).sum()) if n else 0,
+        "total_estimated_impact": float(res.get("impact_estimated_total", pd.Series(0.0, index=res.index)).sum()),
+        "rule_counts": {k: int(v) for k, v in counts.items()},
+    }
+
+
+def merge_summaries(parts: List[Dict[str, Any]]) -> Dict[str, Any]:
+    rows = sum(p["rows"] for p in parts)
+    non = sum(p["non_compliant"] for p in parts)
+    rule_counts: Dict[str, int] = {}
+    for p in parts:
+        for k, v in p["rule_counts"].items():
+            rule_counts[k] = rule_counts.get(k, 0) + v
+    return {
+        "rows": rows,
+        "non_compliant": non,
+        "compliance_rate": ((rows - non) / rows if rows else 1.0),
+        "total_estimated_impact": float(sum(p["total_estimated_impact"] for p in parts)),
+        "rule_counts": dict(sorted(rule_counts.items(), key=lambda kv: -kv[1])),
+    }
+
+
+# -------- process pool --------
+def _init_worker(thresholds: dict, rules: List[dict]) -> None:
+    _WORKER["thresholds"] = thresholds
+    _WORKER["rules"] = rules
+
+
+def _run_worker(df_part: pd.DataFrame, map_fn: MapFn,
+                min_fail_severity: str) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    res = evaluate_partition(df_part, map_fn, _WORKER["thresholds"],
+                             _WORKER["rules"], min_fail_severity=min_fail_severity)
+    return res, summarize(res)
+
+
+def make_pool(workers: int, thresholds: dict, rules: List[dict]) -> ProcessPoolExecutor:
+    """Pool cu regulile/pragurile încărcate o singură dată în fiecare worker."""
+    return ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                               initargs=(thresholds, rules))
+
+
+def run_partitioned(df_raw: pd.DataFrame, pool: Executor, workers: int, map_fn: MapFn,
+                    min_fail_severity: str = "MEDIUM") -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Rulează pipeline-ul pe intervale de rânduri în pool; rezultatele revin în ordinea inițială.
+
+    `map_fn` trebuie să fie picklable (funcție de modul sau functools.partial).
+    """
+    bounds = partition_rows(len(df_raw), workers)
+    futures = [pool.submit(_run_worker, df_raw.iloc[a:b], map_fn, min_fail_severity) for a, b in bounds]
+    parts = [f.result() for f in futures]
+    res = pd.concat([p[0] for p in parts], ignore_index=True)
+    return res, merge_summaries([p[1] for p in parts])
+
+
+def run_compliance_parallel(df_raw: pd.DataFrame, map_fn: MapFn, thresholds: dict, rules: List[dict],
+                            min_fail_severity: str = "MEDIUM",
+                            workers: int = 1) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Variantă one-shot (CLI): cu workers <= 1 rulează în procesul curent."""
+    if workers <= 1 or len(df_raw) < 2:
+        res = evaluate_partition(df_raw, map_fn, thresholds, rules, min_fail_severity=min_fail_severity)
+        return res, merge_summaries([summarize(res)])
+    with make_pool(workers, thresholds, rules) as pool:
+        return run_partitioned(df_raw, pool, workers, map_fn, min_fail_severity=min_fail_severity)
@@ -1,17 +1,18 @@
 # src/compliance/pipeline.py
-import yaml, pandas as pd
+import pandas as pd
 from .facts import derive_facts
 from .evaluator import run_rules
 from .impact import estimate_impact
+from .config_manager import get_manager
 
 def run_compliance(df: pd.DataFrame, config_dir: str, min_fail_severity: str = "MEDIUM") -> pd.DataFrame:
-    thr = yaml.safe_load(open(f"{config_dir}/thresholds.yaml"))
-    rules = []
-    rules += yaml.safe_load(open(f"{config_dir}/rules_common.yaml"))["rules"]
-    rules += yaml.safe_load(open(f"{config_dir}/schemes/visa.yaml"))["rules"]
-    rules += yaml.safe_load(open(f"{config_dir}/schemes/mastercard.yaml"))["rules"]
+    # YAML-urile se recompilează doar dacă s-au schimbat (mtime), nu la fiecare apel
+    manager = get_manager(config_dir)
+    manager.check()
+    rs = manager.snapshot()
 
-    df1 = derive_facts(df, thr)
-    df2 = run_rules(df1, rules, min_fail_severity=min_fail_severity)
+    df1 = derive_facts(df, rs.thresholds)
+    df2 = run_rules(df1, rs.rules, min_fail_severity=min_fail_severity)
     df3 = estimate_impact(df2)
+    df3["ruleset_version"] = rs.version
     return df3
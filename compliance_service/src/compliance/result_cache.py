@@ -0,0 +1,177 @@
+# src/compliance/result_cache.py
+"""Cache de rezultate pentru /check, cheiat pe (hash conținut fișier, severitate, format,
+versiune ruleset). Fișierele încărcate nu se schimbă, deci un check repetat nu mai
+citește CSV-ul și nu mai rulează pipeline-ul.
+
+Intrarea e compactă: sumarul, id-urile tranzacțiilor și potrivirile per regulă
+(np.packbits); findings-urile se reconstruiesc din reguli la citire.
+
+Două niveluri:
+    memorie  LRU limitat în bytes (dimensiunea intrării serializate)
+    disc     <root>/<cheie>.pkl, scris la `put`, limitat și el în bytes (cele mai vechi ies primele)
+
+Dimensiunea de pe disc se ține ca total curent; directorul se listează doar când totalul
+depășește limita sau la DISK_RESCAN_SECONDS (alte procese scriu în același director).
+O intrare de pe disc care nu se poate citi se șterge și contează ca miss.
+"""
+import hashlib, os, pickle, threading, time, uuid
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .sidecar import content_hash
+
+DISK_RESCAN_SECONDS = 300
+
+def cache_key(file_hash: str, min_fail_severity: str, force_format: str, ruleset_version: str) -> str:
+    raw = "|".join([file_hash, (min_fail_severity or "MEDIUM").upper(),
+                    (force_format or "auto").lower(), ruleset_version])
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+def pack_entry(summary: Dict[str, Any], ids: List[str], hits: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    return {
+        "summary": summary,
+        "rows": len(ids),
+        "ids": list(ids),
+        "hits": {rid: np.packbits(h) for rid, h in hits.items() if h.any()},
+    }
+
+def unpack_hits(entry: Dict[str, Any], rules: List[dict]) -> Dict[str, np.ndarray]:
+    n = entry["rows"]
+    packed = entry["hits"]
+    return {
+        r["id"]: (np.unpackbits(packed[r["id"]], count=n).astype(bool) if r["id"] in packed
+                  else np.zeros(n, dtype=bool))
+        for r in rules
+    }
+
+class ResultCache:
+    def __init__(self, root: str, max_bytes: int = 64 << 20, disk_max_bytes: int = 1 << 30):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.disk_max_bytes = disk_max_bytes
+        self._lock = threading.Lock()
+        self._mem: "OrderedDict[str, Tuple[Dict[str, Any], int]]" = OrderedDict()
+        self._bytes = 0
+        self.counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0,
+                         "disk_evictions": 0, "disk_errors": 0}
+        os.makedirs(root, exist_ok=True)
+        self._prune_lock = threading.Lock()
+        self._disk_bytes = 0
+        self._scanned_at = 0.0
+        self._prune_disk()
+
+    # -------- hash fișier (memorat pe (cale, mtime, size)) --------
+    def file_hash(self, path: str) -> str:
+        return content_hash(path)
+
+    # -------- memorie --------
+    def _remember(self, key: str, entry: Dict[str, Any], size: int) -> None:
+        if size > self.max_bytes:
+            return
+        if key in self._mem:
+            self._bytes -= self._mem.pop(key)[1]
+        self._mem[key] = (entry, size)
+        self._bytes += size
+        while self._bytes > self.max_bytes:
+            _, (_, s) = self._mem.popitem(last=False)
+            self._bytes -= s
+            self.counters["evictions"] += 1
+
+    # -------- disc --------
+    def _path(self, key: str) -> str:
+        return os.path.join(self.root, f"{key}.pkl")
+
+    def _prune_disk(self) -> None:
+        """Listează directorul, recalculează totalul și șterge cele mai vechi intrări peste limită.
+        Rulează fără `_lock` (get/put nu așteaptă după listdir), un singur thread odată."""
+        if not self._prune_lock.acquire(blocking=False):
+            return
+        try:
+            files = []
+            for name in os.listdir(self.root):
+                if name.endswith(".pkl"):
+                    try:
+                        st = os.stat(os.path.join(self.root, name))
+                    except FileNotFoundError:
+                        continue
+                    files.append((st.st_mtime, st.st_size, name))
+            total, evicted = sum(f[1] for f in files), 0
+            for _, size, name in sorted(files):
+                if total <= self.disk_max_bytes:
+                    break
+                try:
+                    os.remove(os.path.join(self.root, name))
+                    evicted += 1
+                except FileNotFoundError:
+                    pass
+                total -= size
+            with self._lock:
+                self._disk_bytes = total
+                self._scanned_at = time.monotonic()
+                self.counters["disk_evictions"] += evicted
+        finally:
+            self._prune_lock.release()
+
+    def _drop(self, key: str) -> None:
+        try:
+            size = os.path.getsize(self._path(key))
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            return
+        with self._lock:
+            self._disk_bytes -= size
+
+    # -------- API --------
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            item = self._mem.get(key)
+            if item is not None:
+                self._mem.move_to_end(key)
+                self.counters["memory_hits"] += 1
+                return item[0]
+        try:
+            with open(self._path(key), "rb") as f:
+                blob = f.read()
+            entry = pickle.loads(blob)
+        except FileNotFoundError:
+            with self._lock:
+                self.counters["misses"] += 1
+            return None
+        except Exception:
+            # trunchiată, coruptă, scrisă de altă versiune: se șterge și se recalculează
+            self._drop(key)
+            with self._lock:
+                self.counters["misses"] += 1
+                self.counters["disk_errors"] += 1
+            return None
+        with self._lock:
+            self.counters["disk_hits"] += 1
+            self._remember(key, entry, len(blob))
+        return entry
+
+    def put(self, key: str, entry: Dict[str, Any]) -> None:
+        blob = pickle.dumps(entry, protocol=pickle.HIGHEST_PROTOCOL)
+        path = self._path(key)
+        try:
+            previous = os.path.getsize(path)
+        except FileNotFoundError:
+            previous = 0
+        tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, path)
+        with self._lock:
+            self._remember(key, entry, len(blob))
+            self._disk_bytes += len(blob) - previous
+            rescan = (self._disk_bytes > self.disk_max_bytes
+                      or time.monotonic() - self._scanned_at >= DISK_RESCAN_SECONDS)
+        if rescan:
+            self._prune_disk()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {**self.counters, "entries": len(self._mem), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes, "disk_bytes": self._disk_bytes,
+                    "disk_max_bytes": self.disk_max_bytes}
@@ -0,0 +1,91 @@
+# src/compliance/ruleset.py
+import hashlib, json, os
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+from .compiler import COMPILED_KEYS, compile_rule, rule_inputs
+from .facts import THRESHOLD_COLUMNS
+
+RULE_FILES = ["rules_common.yaml", os.path.join("schemes", "visa.yaml"), os.path.join("schemes", "mastercard.yaml")]
+
+CONFIG_FILES = ["thresholds.yaml"] + RULE_FILES
+
+def read_config(config_dir: str) -> Dict[str, bytes]:
+    """Conținutul brut al fișierelor de configurație (cale relativă -> bytes), citit o singură dată."""
+    out: Dict[str, bytes] = {}
+    for rel in CONFIG_FILES:
+        with open(os.path.join(config_dir, rel), "rb") as f:
+            out[rel] = f.read()
+    return out
+
+def parse_ruleset(contents: Dict[str, bytes]) -> Tuple[dict, List[dict]]:
+    """Pragurile și regulile compilate din conținutul lui `read_config`: `inputs` = coloanele de fapte
+    citite de `when`, `guards`/`flags` = condițiile de egalitate folosite la dispatch-ul indexat."""
+    thresholds = yaml.safe_load(contents["thresholds.yaml"].decode("utf-8"))
+    rules: List[dict] = []
+    for rel in RULE_FILES:
+        rules += yaml.safe_load(contents[rel].decode("utf-8"))["rules"]
+    return thresholds, [compile_rule(r) for r in rules]
+
+def load_thresholds(config_dir: str) -> dict:
+    with open(os.path.join(config_dir, "thresholds.yaml"), encoding="utf-8") as f:
+        return yaml.safe_load(f)
+
+def load_rules(config_dir: str) -> List[dict]:
+    return parse_ruleset(read_config(config_dir))[1]
+
+def load_ruleset(config_dir: str) -> Tuple[dict, List[dict]]:
+    return parse_ruleset(read_config(config_dir))
+
+def rule_fingerprint(rule: dict) -> str:
+    body = {k: v for k, v in rule.items() if k not in COMPILED_KEYS}
+    return hashlib.sha1(json.dumps(body, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+def threshold_values(thresholds: dict, prefix: str = "") -> Dict[str, Any]:
+    """Pragurile aplatizate: {"defaults.pos_clearing_hours": 24, ...}."""
+    flat: Dict[str, Any] = {}
+    for k, v in (thresholds or {}).items():
+        key = f"{prefix}{k}"
+        if isinstance(v, dict):
+            flat.update(threshold_values(v, prefix=f"{key}."))
+        else:
+            flat[key] = v
+    return flat
+
+def dependency_graph(thresholds: dict, rules: List[dict]) -> Dict[str, Dict[str, List[str]]]:
+    """Ce coloane citește fiecare regulă și ce coloane produce fiecare prag."""
+    return {
+        "rules": {r["id"]: list(r.get("inputs") or rule_inputs(r["when"])) for r in rules},
+        "thresholds": {k: THRESHOLD_COLUMNS.get(k, []) for k in threshold_values(thresholds)},
+    }
+
+def plan_update(manifest: dict, thresholds: dict, rules: List[dict]) -> Dict[str, Any]:
+    """Compară configurația salvată (manifest) cu cea curentă și decide ce trebuie recalculat.
+
+    - regulile noi sau modificate se re-evaluează;
+    - un prag modificat re-derivă coloanele lui de fapte și re-evaluează regulile care le citesc;
+    - regulile șterse se elimină din rezultate.
+    """
+    old_rules = manifest.get("rules", {})
+    new_rules = {r["id"]: rule_fingerprint(r) for r in rules}
+    old_thr = manifest.get("thresholds", {})
+    new_thr = threshold_values(thresholds)
+
+    changed_thr = sorted(k for k in set(old_thr) | set(new_thr) if old_thr.get(k) != new_thr.get(k))
+    columns = sorted({c for k in changed_thr for c in THRESHOLD_COLUMNS.get(k, [])})
+    graph = dependency_graph(thresholds, rules)["rules"]
+
+    reevaluate = [
+        r["id"] for r in rules
+        if old_rules.get(r["id"]) != new_rules[r["id"]] or set(graph[r["id"]]) & set(columns)
+    ]
+    return {
+        "rederive_facts": bool(columns),
+        "changed_thresholds": changed_thr,
+        "changed_columns": columns,
+        "reevaluate": reevaluate,
+        "removed": sorted(set(old_rules) - set(new_rules)),
+        "rules": new_rules,
+        "thresholds": new_thr,
+    }
@@ -0,0 +1,73 @@
+# src/compliance/serialization.py
+"""Serializarea JSON a rapoartelor și a răspunsurilor API.
+
+Rapoartele se scriu compact (fără indentare, UTF-8) cu orjson; indentarea se
+activează doar cu JSON_DEBUG=1, pentru inspecție manuală. Fără orjson instalat,
+se folosește json din stdlib, cu aceeași ieșire compactă.
+
+orjson serializează direct tipurile numpy (scalari și array-uri) și cheile
+non-string; NaN/Infinity devin null (stdlib ar scrie `NaN`, care nu e JSON valid).
+
+Modulul nu are importuri relative: îl folosește și aplicația principală
+(compliance_service/src în sys.path, ca `compliance.serialization`).
+"""
+import json
+import os
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:     # dependență opțională
+    orjson = None
+
+DEBUG_JSON = os.getenv("JSON_DEBUG", "").lower() in ("1", "true", "yes")
+MEDIA_TYPE = "application/json"
+
+
+def _default(obj: Any):
+    if hasattr(obj, "item"):        # scalari numpy
+        return obj.item()
+    if hasattr(obj, "tolist"):      # array-uri numpy
+        return obj.tolist()
+    if hasattr(obj, "isoformat"):   # datetime / Timestamp
+        return obj.isoformat()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+if orjson is not None:
+    _OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if DEBUG_JSON:
+        _OPTIONS |= orjson.OPT_INDENT_2
+
+    def dumps(obj: Any) -> bytes:
+        """JSON-ul obiectului, ca bytes UTF-8 (compact; indentat doar cu JSON_DEBUG)."""
+        return orjson.dumps(obj, default=_default, option=_OPTIONS)
+
+    def loads(data) -> Any:
+        return orjson.loads(data)
+else:
+    def dumps(obj: Any) -> bytes:
+        """JSON-ul obiectului, ca bytes UTF-8 (compact; indentat doar cu JSON_DEBUG)."""
+        text = json.dumps(obj, ensure_ascii=False, default=_default,
+                          indent=2 if DEBUG_JSON else None, separators=None if DEBUG_JSON else (",", ":"))
+        return text.encode("utf-8")
+
+    def loads(data) -> Any:
+        return json.loads(data)
+
+
+def write_json(path: str, obj: Any) -> None:
+    """Scrie JSON-ul atomic (fișier temporar + os.replace): cititorii nu văd un fișier parțial."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(dumps(obj))
+    os.replace(tmp, path)
+
+
+class CompactJSONResponse(JSONResponse):
+    """Răspunsul implicit al aplicațiilor: același conținut, randat cu `dumps`."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
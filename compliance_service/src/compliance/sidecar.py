@@ -0,0 +1,116 @@
+# src/compliance/sidecar.py
+"""Citirea upload-urilor din sidecar-ul Parquet scris de aplicația principală
+(files/<id>.parquet lângă files/<id>.csv[.zst]), doar cu coloanele cerute, plus un cache
+LRU (limitat în bytes) de cadre deja parsate, cheiat pe (id fișier, hash conținut, coloane).
+
+E singura implementare: aplicația principală o importă prin `file_store`
+(compliance_service/src în sys.path, ca `compliance.sidecar`), serviciul ca `src.compliance.sidecar`.
+"""
+import hashlib, os, threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import pandas as pd
+
+from .compression import strip_codec
+from .ingest import csv_columns, read_csv_typed
+
+def sidecar_path(csv_path: str) -> str:
+    return os.path.splitext(strip_codec(csv_path))[0] + ".parquet"
+
+def available_columns(csv_path: str) -> List[str]:
+    sidecar = sidecar_path(csv_path)
+    if os.path.exists(sidecar):
+        import pyarrow.parquet as pq
+        return list(pq.read_schema(sidecar).names)
+    return csv_columns(csv_path)
+
+def read_transactions(csv_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Sidecar-ul dacă există, altfel CSV-ul (citire tipizată, vezi `ingest`);
+    coloanele cerute dar absente sunt ignorate."""
+    sidecar = sidecar_path(csv_path)
+    if not os.path.exists(sidecar):
+        return read_csv_typed(csv_path, columns=columns)
+    if columns is not None:
+        present = set(available_columns(csv_path))
+        columns = [c for c in columns if c in present]
+    df = pd.read_parquet(sidecar, engine="pyarrow", columns=columns)
+    for c in df.columns[df.dtypes == object]:   # None (Parquet) -> NaN (ca read_csv)
+        df[c] = df[c].fillna(float("nan"))
+    return df
+
+# -------- cache de DataFrame-uri parsate (per proces) --------
+# LRU limitat la HASH_CACHE_ENTRIES semnături; citit din thread-urile serverului, deci sub lock
+HASH_CACHE_ENTRIES = int(os.getenv("HASH_CACHE_ENTRIES", "4096"))
+_HASHES: "OrderedDict[Tuple[str, int, int], str]" = OrderedDict()
+_HASHES_LOCK = threading.Lock()
+
+def content_hash(path: str) -> str:
+    """sha1 al fișierului, memorat pe (cale, mtime, size)."""
+    st = os.stat(path)
+    sig = (path, st.st_mtime_ns, st.st_size)
+    with _HASHES_LOCK:
+        h = _HASHES.get(sig)
+        if h is not None:
+            _HASHES.move_to_end(sig)
+            return h
+    d = hashlib.sha1()     # citirea fișierului în afara lock-ului
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            d.update(chunk)
+    h = d.hexdigest()
+    with _HASHES_LOCK:
+        _HASHES[sig] = h
+        _HASHES.move_to_end(sig)
+        while len(_HASHES) > HASH_CACHE_ENTRIES:
+            _HASHES.popitem(last=False)
+    return h
+
+class FrameCache:
+    """LRU limitat în bytes (memory_usage(deep=True) al fiecărui cadru)."""
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._frames: "OrderedDict[tuple, Tuple[pd.DataFrame, int]]" = OrderedDict()
+        self._bytes = 0
+        self.counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, key: tuple) -> Optional[pd.DataFrame]:
+        with self._lock:
+            item = self._frames.get(key)
+            if item is None:
+                self.counters["misses"] += 1
+                return None
+            self._frames.move_to_end(key)
+            self.counters["hits"] += 1
+            return item[0]
+
+    def put(self, key: tuple, df: pd.DataFrame) -> None:
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._frames:
+                self._bytes -= self._frames.pop(key)[1]
+            self._frames[key] = (df, size)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                _, (_, s) = self._frames.popitem(last=False)
+                self._bytes -= s
+                self.counters["evictions"] += 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self.counters, "entries": len(self._frames), "bytes": self._bytes,
+                    "max_bytes": self.max_bytes}
+
+FRAMES = FrameCache(int(os.getenv("FRAME_CACHE_MAX_BYTES", str(256 << 20))))
+
+def load_transactions(file_id: str, csv_path: str, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """Ca `read_transactions`, dar trece întâi prin FRAMES. Cadrul întors e partajat: nu se modifică."""
+    key = (file_id, content_hash(csv_path), tuple(columns) if columns is not None else None)
+    df = FRAMES.get(key)
+    if df is None:
+        df = read_transactions(csv_path, columns)
+        FRAMES.put(key, df)
+    return df
@@ -1,16 +1,79 @@
 # src/compliance/simulate.py
+from typing import Any, Dict, List, Optional
+
+import numpy as np
 import pandas as pd
 
-def apply_simulation(df: pd.DataFrame, toggles: dict) -> pd.DataFrame:
-    sim = df.copy()
+from .evaluator import rule_hits, rule_inputs, summarize_hits
+
+# coloanele de fapte modificate de fiecare toggle (restul regulilor nu trebuie re-evaluate)
+TOGGLE_COLUMNS = {
+    "apply_sca": ["sca_applied"],
+    "force_avs": ["avs_used"],
+    "validate_enhanced": ["enhanced_fields_present", "enhanced_validated"],
+    "reduce_delay_to": ["settlement_delay_hours"],
+}
+
+def simulate_columns(df: pd.DataFrame, toggles: dict) -> Dict[str, pd.Series]:
+    """Doar coloanele schimbate de toggles, fără a copia tot DataFrame-ul."""
+    cols: Dict[str, pd.Series] = {}
     if toggles.get("apply_sca"):
-        sim.loc[sim["is_eu_uk"] & sim["is_ecom"], "sca_applied"] = True
+        s = df["sca_applied"].copy()
+        s[df["is_eu_uk"] & df["is_ecom"]] = True
+        cols["sca_applied"] = s
     if toggles.get("force_avs"):
-        sim.loc[sim["is_ecom"], "avs_used"] = True
+        s = df["avs_used"].copy()
+        s[df["is_ecom"]] = True
+        cols["avs_used"] = s
     if toggles.get("validate_enhanced"):
-        mask = sim["is_commercial"]
-        sim.loc[mask, "enhanced_fields_present"] = True
-        sim.loc[mask, "enhanced_validated"] = True
+        mask = df["is_commercial"]
+        for c in TOGGLE_COLUMNS["validate_enhanced"]:
+            s = df[c].copy()
+            s[mask] = True
+            cols[c] = s
     if "reduce_delay_to" in toggles:
-        sim["settlement_delay_hours"] = sim["settlement_delay_hours"].clip(upper=int(toggles["reduce_delay_to"]))
+        cols["settlement_delay_hours"] = df["settlement_delay_hours"].clip(upper=int(toggles["reduce_delay_to"]))
+    return cols
+
+def apply_simulation(df: pd.DataFrame, toggles: dict) -> pd.DataFrame:
+    sim = df.copy()
+    for c, s in simulate_columns(df, toggles).items():
+        sim[c] = s
     return sim
+
+def run_scenarios(facts: pd.DataFrame, rules: List[Dict[str, Any]], scenarios: List[dict],
+                  min_fail_severity: str = "MEDIUM",
+                  base_hits: Optional[Dict[str, np.ndarray]] = None) -> Dict[str, Any]:
+    """What-if pe mai multe scenarii peste aceleași fapte (derivate o singură dată).
+
+    Pentru fiecare scenariu se re-evaluează doar regulile care citesc coloanele
+    schimbate de toggles; celelalte refolosesc potrivirile din baseline.
+    """
+    if base_hits is None:
+        base_hits = rule_hits(facts, rules)
+    baseline = summarize_hits(facts, rules, base_hits, min_fail_severity=min_fail_severity)
+    inputs = {r["id"]: set(rule_inputs(r["when"])) for r in rules}
+
+    results = []
+    for i, sc in enumerate(scenarios):
+        # `v is False`, nu `v == False`: reduce_delay_to=0 e o valoare validă (0 == False)
+        toggles = {k: v for k, v in sc.items() if k in TOGGLE_COLUMNS and not (v is None or v is False)}
+        changed = simulate_columns(facts, toggles)
+        affected = [r for r in rules if inputs[r["id"]] & set(changed)]
+        hits = dict(base_hits)
+        if affected:
+            needed = set().union(*(inputs[r["id"]] for r in affected))
+            view = facts[[c for c in facts.columns if c in needed]].copy()
+            for c, s in changed.items():
+                view[c] = s
+            hits.update(rule_hits(view, affected))
+        summary = summarize_hits(facts, rules, hits, min_fail_severity=min_fail_severity)
+        results.append({
+            "name": sc.get("name") or f"scenario_{i + 1}",
+            "toggles": toggles,
+            **summary,
+            "delta_non_compliant": summary["non_compliant"] - baseline["non_compliant"],
+            "delta_estimated_impact": summary["total_estimated_impact"] - baseline["total_estimated_impact"],
+            "reevaluated_rules": [r["id"] for r in affected],
+        })
+    return {"baseline": baseline, "scenarios": results}
@@ -0,0 +1,141 @@
+# src/compliance/storage.py
+"""Stocare pe disc cu subdirectoare de fan-out, calculate din id.
+
+    <root>/<id>.csv  ->  <root>/3f/a9/<id>.csv      (sha1(id)[:2] / sha1(id)[2:4])
+
+Un director plat cu milioane de intrări face listarea, backup-ul și lookup-urile de
+inode lente; cu 2 niveluri x 2 hex sunt 65536 de directoare frunză. Calea depinde
+doar de id (partea dinaintea primului '.'), deci nu e nevoie de DB: fișierele
+derivate (<id>.parquet) ajung în același director cu <id>.csv.
+
+Până la migrare (`python migrate_storage.py`), `locate` găsește și fișierele vechi,
+rămase direct în <root>. Intrările ascunse (.uploads/, .upload-*.part) și
+subdirectoarele existente (compliance_cache/, compliance_state/) nu sunt atinse.
+
+Cu un codec (vezi compression.py), `put` scrie <id>.csv.zst / <id>.json.gz, iar
+`locate(id, ".csv")` găsește oricare variantă, comprimată sau nu.
+
+Modulul îl folosește și aplicația principală (compliance_service/src în sys.path,
+ca `compliance.storage`); singurul import intern e compression.py, din același pachet.
+"""
+import hashlib
+import os
+from typing import Dict, Iterator, Optional
+
+from .compression import CODECS, codec_of, compress_file, write_bytes
+
+FANOUT_LEVELS = int(os.getenv("STORAGE_FANOUT_LEVELS", "2"))
+FANOUT_WIDTH = 2    # caractere hex per nivel
+
+
+class ShardedStore:
+    def __init__(self, root: str, levels: int = FANOUT_LEVELS, width: int = FANOUT_WIDTH,
+                 codec: Optional[str] = None):
+        self.root = root
+        self.levels = levels
+        self.width = width
+        self.codec = codec      # codec-ul scriitorilor (`put`); None = necomprimat
+
+    def shard(self, key: str) -> str:
+        """Subdirectorul relativ al cheii (ex. '3f/a9')."""
+        digest = hashlib.sha1(key.split(".", 1)[0].encode("utf-8")).hexdigest()
+        return os.path.join(*[digest[i * self.width:(i + 1) * self.width] for i in range(self.levels)]) if self.levels else ""
+
+    def path(self, key: str, suffix: str = "") -> str:
+        """Calea canonică (shard-uită), fără să verifice existența."""
+        return os.path.join(self.root, self.shard(key), f"{key}{suffix}")
+
+    def prepare(self, key: str, suffix: str = "") -> str:
+        """Calea canonică, cu directorul shard-ului creat; pentru scriitori."""
+        path = self.path(key, suffix)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        return path
+
+    def locate(self, key: str, suffix: str = "") -> Optional[str]:
+        """Calea existentă, necomprimată sau comprimată: shard-ul, apoi layout-ul plat vechi;
+        None dacă lipsește."""
+        variants = [suffix] + [suffix + ext for ext in CODECS.values()]
+        for variant in variants:
+            path = self.path(key, variant)
+            if os.path.exists(path):
+                return path
+        for variant in variants:
+            legacy = os.path.join(self.root, f"{key}{variant}")
+            if os.path.isfile(legacy):
+                return legacy
+        return None
+
+    def _stored_path(self, key: str, suffix: str) -> str:
+        path = self.prepare(key, suffix + (CODECS[self.codec] if self.codec else ""))
+        # o variantă rămasă de la alt codec ar fi găsită de `locate` înaintea celei noi
+        for variant in [suffix] + [suffix + ext for ext in CODECS.values()]:
+            other = self.path(key, variant)
+            if other != path and os.path.exists(other):
+                os.remove(other)
+        return path
+
+    def put(self, src: str, key: str, suffix: str = "") -> str:
+        """Mută `src` în store (comprimat cu codec-ul store-ului); întoarce calea stocată."""
+        path = self._stored_path(key, suffix)
+        if self.codec is None:
+            os.replace(src, path)
+        else:
+            compress_file(src, path, self.codec)
+            os.remove(src)
+        return path
+
+    def put_bytes(self, key: str, suffix: str, data: bytes) -> str:
+        """Scrie `data` în store (comprimat cu codec-ul store-ului), atomic; întoarce calea stocată."""
+        path = self._stored_path(key, suffix)
+        write_bytes(path, data, self.codec)
+        return path
+
+    def legacy_entries(self) -> Iterator[str]:
+        """Numele fișierelor rămase direct în root (layout-ul plat)."""
+        if not os.path.isdir(self.root):
+            return
+        with os.scandir(self.root) as it:
+            for entry in it:
+                if entry.is_file(follow_symlinks=False) and not entry.name.startswith(".") \
+                        and not entry.name.endswith(".tmp"):
+                    yield entry.name
+
+    def migrate(self, dry_run: bool = False) -> Dict[str, int]:
+        """Mută fișierele plate în shard-uri (os.replace, idempotent; reluabil oricând)."""
+        moved = skipped = 0
+        for name in list(self.legacy_entries()):
+            src = os.path.join(self.root, name)
+            dst = self.path(name)
+            if os.path.exists(dst):
+                skipped += 1        # există deja în shard: sursa plată e un duplicat vechi
+                continue
+            if not dry_run:
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                os.replace(src, dst)
+            moved += 1
+        return {"moved": moved, "skipped": skipped}
+
+    def compress(self, suffixes=(".csv", ".json"), dry_run: bool = False) -> Dict[str, int]:
+        """Comprimă cu codec-ul store-ului fișierele stocate încă necomprimate (reluabil oricând)."""
+        compressed = saved = 0
+        if self.codec is None or not os.path.isdir(self.root):
+            return {"compressed": 0, "bytes_saved": 0}
+        for dirpath, dirnames, filenames in os.walk(self.root):
+            depth = 0 if dirpath == self.root else os.path.relpath(dirpath, self.root).count(os.sep) + 1
+            # doar directoarele shard-urilor (hex, `width` caractere), nu compliance_cache/ etc.
+            dirnames[:] = [d for d in dirnames if depth < self.levels and len(d) == self.width
+                           and all(c in "0123456789abcdef" for c in d)]
+            for name in filenames:
+                if name.startswith(".") or not name.endswith(tuple(suffixes)):
+                    continue
+                src = os.path.join(dirpath, name)
+                if dry_run:
+                    compressed += 1
+                    continue
+                dst = src + CODECS[self.codec]
+                size = os.path.getsize(src)
+                compress_file(src, dst, self.codec)
+                os.remove(src)
+                compressed += 1
+                saved += size - os.path.getsize(dst)
+        return {"compressed": compressed, "bytes_saved": saved}
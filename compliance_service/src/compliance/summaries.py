@@ -0,0 +1,135 @@
+# src/compliance/summaries.py
+"""Rândurile tabelelor de sumar și ale rollup-urilor (vezi summary_tables.py), calculate
+din JSON-ul unui raport sau din rezultatele verificării de conformitate. Funcții pure, fără DB.
+
+Dimensiunile vin din registrul de scheme: `BrandSchema.dimensions` (grup MCC, canal)
+și `BrandSchema.rollup_keys` (data tranzacției, comerciantul). O coloană absentă dă
+valoarea "unknown"; rândurile fără dată validă nu intră în rollup-urile zilnice.
+
+Ambele funcții publice întorc un dict cu "totals", "dimensions", "rollups" (și
+"features", "shap" pentru rapoarte), scris de `summary_tables.write_summary`.
+"""
+from typing import Dict
+
+import numpy as np
+import pandas as pd
+
+UNKNOWN = "unknown"
+VALUE_MAX_LEN = 64
+
+
+def fee_values(values) -> np.ndarray:
+    """Taxe ca numere: acceptă float-uri și text din export ("5.19 EUR"); restul -> 0."""
+    s = pd.Series(values, dtype=object)
+    num = pd.to_numeric(s, errors="coerce")
+    if num.isna().any():
+        parsed = pd.to_numeric(s.astype(str).str.extract(r"(-?\d+(?:\.\d+)?)")[0], errors="coerce")
+        num = num.fillna(parsed)
+    return num.fillna(0.0).to_numpy(dtype=float)
+
+
+def _labels(frame: pd.DataFrame, col: str, n: int) -> np.ndarray:
+    if col not in frame.columns:
+        return np.full(n, UNKNOWN, dtype=object)
+    vals = frame[col].iloc[:n].reset_index(drop=True)
+    return vals.astype(str).where(vals.notna(), UNKNOWN).str.slice(0, VALUE_MAX_LEN).to_numpy(dtype=object)
+
+
+def _days(frame: pd.DataFrame, col: str, n: int) -> pd.Series:
+    if col not in frame.columns:
+        return pd.Series(pd.NaT, index=range(n), dtype="datetime64[ns]")
+    vals = frame[col].iloc[:n].reset_index(drop=True)
+    return pd.to_datetime(vals, errors="coerce", format="mixed").dt.normalize()
+
+
+def _pack(values: pd.Series, brand: str) -> Dict:
+    return {
+        "brand": brand,
+        **{m: int(values[m]) for m in ("row_count", "downgraded", "non_compliant")},
+        **{m: float(values[m]) for m in ("predicted_fee_sum", "actual_fee_sum", "downgrade_cost",
+                                         "estimated_impact")},
+    }
+
+
+def _summarize(metrics: pd.DataFrame, frame: pd.DataFrame, brand: str, schema, rows_column: str) -> Dict:
+    """Totalul, rândurile per dimensiune și contribuțiile la rollup-urile (zi, comerciant, brand)."""
+    n = len(metrics)
+    keys = {"brand": np.full(n, brand, dtype=object)}
+    for dim, col in (schema.dimensions if schema else {}).items():
+        keys[dim] = _labels(frame, col, n)
+    dims = []
+    for dim, vals in keys.items():
+        for value, group in metrics.groupby(vals, sort=True):
+            dims.append({"dimension": dim, "value": str(value), **_pack(group.sum(), brand)})
+
+    rollup_keys = schema.rollup_keys if schema else {}
+    day = _days(frame, rollup_keys.get("date", ""), n)
+    merchant = _labels(frame, rollup_keys.get("merchant", ""), n)
+    dated = day.notna().to_numpy()
+    rollups = []
+    if dated.any():
+        grouped = metrics[dated].groupby([day[dated].dt.date.to_numpy(), merchant[dated]], sort=True).sum()
+        for (d, m), values in grouped.iterrows():
+            row = _pack(values, brand)
+            rollups.append({
+                "day": d, "merchant": m, "brand": brand,
+                rows_column: row["row_count"],
+                **{k: row[k] for k in ("downgraded", "predicted_fee_sum", "actual_fee_sum", "downgrade_cost",
+                                       "non_compliant", "estimated_impact")},
+            })
+    return {"totals": _pack(metrics.sum(), brand), "dimensions": dims, "rollups": rollups,
+            "undated_rows": int(n - dated.sum())}
+
+
+def report_summary(report_json: dict, frame: pd.DataFrame, schema) -> Dict:
+    """Sumarul unui raport din `per_transaction` și `overall.features`.
+
+    Rândul i din `per_transaction` corespunde rândului i din `frame` (fișierul sursă).
+    """
+    per_tx = report_json.get("per_transaction") or []
+    n = min(len(per_tx), len(frame))
+    predicted = fee_values([t.get("predicted_fee") for t in per_tx[:n]])
+    actual = fee_values([t.get("actual_fee") for t in per_tx[:n]])
+    downgraded = np.fromiter((bool(t.get("downgrade")) for t in per_tx[:n]), dtype=bool, count=n)
+    metrics = pd.DataFrame({
+        "row_count": np.ones(n, dtype=np.int64),
+        "downgraded": downgraded.astype(np.int64),
+        "predicted_fee_sum": predicted,
+        "actual_fee_sum": actual,
+        "downgrade_cost": np.where(downgraded, predicted - actual, 0.0),
+        "non_compliant": np.zeros(n, dtype=np.int64),
+        "estimated_impact": np.zeros(n),
+    })
+    summary = _summarize(metrics, frame, schema.brand, schema, "report_rows")
+    summary["features"] = [
+        {"feature": str(f.get("feature_name"))[:VALUE_MAX_LEN], "brand": schema.brand,
+         "importance": float(f.get("importance_normalized") or 0.0)}
+        for f in (report_json.get("overall") or {}).get("features", [])
+    ]
+    # sumele SHAP brute per (feature, valoare): combinabile între rapoarte, spre deosebire de procente
+    summary["shap"] = [
+        {"feature": str(c.get("feature"))[:VALUE_MAX_LEN], "value": str(c.get("value"))[:VALUE_MAX_LEN],
+         "brand": schema.brand, "shap_sum": float(c.get("shap_sum") or 0.0), "rows": int(c.get("rows") or 0)}
+        for c in (report_json.get("overall") or {}).get("shap_contributions", [])
+    ]
+    return summary
+
+
+def compliance_summary(res: pd.DataFrame, frame: pd.DataFrame, schema) -> Dict:
+    """Sumarul rezultatelor /check (is_compliant, impact_estimated_total).
+
+    `frame` are coloanele brute ale dimensiunilor, în ordinea rândurilor din `res`;
+    `schema` None = format necunoscut (doar totalul și brandul "unknown").
+    """
+    n = len(res)
+    impact = res["impact_estimated_total"] if "impact_estimated_total" in res.columns else pd.Series(0.0, index=res.index)
+    metrics = pd.DataFrame({
+        "row_count": np.ones(n, dtype=np.int64),
+        "downgraded": np.zeros(n, dtype=np.int64),
+        "predicted_fee_sum": np.zeros(n),
+        "actual_fee_sum": np.zeros(n),
+        "downgrade_cost": np.zeros(n),
+        "non_compliant": (~res["is_compliant"].astype(bool)).to_numpy(dtype=np.int64),
+        "estimated_impact": pd.to_numeric(impact, errors="coerce").fillna(0.0).to_numpy(dtype=float),
+    })
+    return _summarize(metrics, frame, schema.brand if schema else UNKNOWN, schema, "compliance_rows")
@@ -0,0 +1,272 @@
+# src/compliance/summary_tables.py
+"""Tabelele de sumar materializate și scrierea lor.
+
+Generarea unui raport (aplicația principală) și /api/compliance/check scriu aici
+câteva rânduri per fișier: un total, câte un rând per valoare de dimensiune (brand,
+grup MCC, canal) și importanța fiecărui feature. Întrebările de portofoliu devin
+agregate SQL pe tabele mici, fără să se redeschidă JSON-urile rapoartelor.
+
+    file_summaries            (file_id, source)                    totaluri per fișier
+    file_dimension_summaries  (file_id, source, dimension, value)  aceleași metrici per grup
+    file_feature_importances  (file_id, feature)                   overall.features din raport
+    daily_merchant_rollups    (day, merchant, brand)               agregate pe tot portofoliul
+    rollup_contributions      (file_id, source, day, merchant, brand)  partea fiecărui fișier
+    report_shap_contributions (report_id, feature, value)          sume SHAP brute per raport
+
+`source` e "report" (taxe prezise/reale, downgrade-uri) sau "compliance" (rânduri
+neconforme, impact estimat); metricile celeilalte surse rămân 0. Rândurile unui
+(file_id, source) se înlocuiesc la fiecare scriere, deci rescrierea e idempotentă.
+
+Rollup-urile se actualizează incremental: se scade contribuția anterioară a
+(file_id, source) și se adună cea nouă, ca upsert aditiv (ON DUPLICATE KEY UPDATE /
+ON CONFLICT) doar pe celulele care s-au schimbat. Un raport regenerat sau o
+verificare repetată nu se numără de două ori, iar nimic nu se recalculează din fișiere.
+
+Sumele SHAP sunt păstrate per raport (nu doar pentru ultimul raport al fișierului),
+nenormalizate: importanța combinată a oricărui set de rapoarte se obține adunându-le
+per (feature, valoare), fără să se mai ruleze SHAP.
+
+Schema e creată de migrările din init-db/. Modulul folosește doar SQLAlchemy Core
+(fără pandas): îl importă și migrările, și ambele servicii (`compliance.summary_tables`).
+"""
+import datetime
+import os
+from typing import Dict, List, Optional
+
+from sqlalchemy import (Column, Date, DateTime, Float, Index, Integer, MetaData, String, Table, create_engine, delete,
+                        select, tuple_)
+
+METADATA = MetaData()
+
+SOURCE_REPORT = "report"
+SOURCE_COMPLIANCE = "compliance"
+DIMENSIONS = ("brand", "mcc_group", "channel")
+
+
+def _metric_columns():
+    return [
+        Column("brand", String(50)),
+        Column("row_count", Integer, nullable=False, default=0),
+        Column("downgraded", Integer, nullable=False, default=0),
+        Column("predicted_fee_sum", Float, nullable=False, default=0.0),
+        Column("actual_fee_sum", Float, nullable=False, default=0.0),
+        Column("downgrade_cost", Float, nullable=False, default=0.0),   # sum(prezis - real) pe rândurile cu downgrade
+        Column("non_compliant", Integer, nullable=False, default=0),
+        Column("estimated_impact", Float, nullable=False, default=0.0),
+        Column("updated_at", DateTime),
+    ]
+
+
+file_summaries = Table(
+    "file_summaries", METADATA,
+    Column("file_id", String(36), primary_key=True),
+    Column("source", String(16), primary_key=True),
+    Column("report_id", String(36)),
+    Column("ruleset_version", String(64)),
+    *_metric_columns(),
+)
+
+file_dimension_summaries = Table(
+    "file_dimension_summaries", METADATA,
+    Column("file_id", String(36), primary_key=True),
+    Column("source", String(16), primary_key=True),
+    Column("dimension", String(32), primary_key=True),
+    Column("value", String(64), primary_key=True),
+    *_metric_columns(),
+    Index("ix_file_dimension_summaries_dimension_value", "source", "dimension", "value"),
+)
+
+file_feature_importances = Table(
+    "file_feature_importances", METADATA,
+    Column("file_id", String(36), primary_key=True),
+    Column("feature", String(64), primary_key=True),
+    Column("report_id", String(36)),
+    Column("brand", String(50)),
+    Column("importance", Float, nullable=False, default=0.0),
+    Index("ix_file_feature_importances_feature", "feature"),
+)
+
+
+def _rollup_columns():
+    return [
+        Column("report_rows", Integer, nullable=False, default=0),
+        Column("downgraded", Integer, nullable=False, default=0),
+        Column("predicted_fee_sum", Float, nullable=False, default=0.0),
+        Column("actual_fee_sum", Float, nullable=False, default=0.0),
+        Column("downgrade_cost", Float, nullable=False, default=0.0),
+        Column("compliance_rows", Integer, nullable=False, default=0),
+        Column("non_compliant", Integer, nullable=False, default=0),
+        Column("estimated_impact", Float, nullable=False, default=0.0),
+    ]
+
+
+ROLLUP_KEY = ("day", "merchant", "brand")
+ROLLUP_METRICS = ("report_rows", "downgraded", "predicted_fee_sum", "actual_fee_sum", "downgrade_cost",
+                  "compliance_rows", "non_compliant", "estimated_impact")
+
+# day = data tranzacției (presentment), nu data procesării
+daily_merchant_rollups = Table(
+    "daily_merchant_rollups", METADATA,
+    Column("day", Date, primary_key=True),
+    Column("merchant", String(64), primary_key=True),
+    Column("brand", String(50), primary_key=True),
+    *_rollup_columns(),
+    Column("updated_at", DateTime),
+    Index("ix_daily_merchant_rollups_merchant_day", "merchant", "day"),
+)
+
+rollup_contributions = Table(
+    "rollup_contributions", METADATA,
+    Column("file_id", String(36), primary_key=True),
+    Column("source", String(16), primary_key=True),
+    Column("day", Date, primary_key=True),
+    Column("merchant", String(64), primary_key=True),
+    Column("brand", String(50), primary_key=True),
+    *_rollup_columns(),
+    Index("ix_rollup_contributions_merchant_source", "merchant", "source"),   # fișierele unui comerciant
+)
+
+# shap_sum = suma valorilor SHAP pe rândurile cu valoarea respectivă ("ALL" pentru feature-uri numerice)
+report_shap_contributions = Table(
+    "report_shap_contributions", METADATA,
+    Column("report_id", String(36), primary_key=True),
+    Column("feature", String(64), primary_key=True),
+    Column("value", String(64), primary_key=True),
+    Column("file_id", String(36), nullable=False),
+    Column("brand", String(50)),
+    Column("shap_sum", Float, nullable=False, default=0.0),
+    Column("rows", Integer, nullable=False, default=0),
+    Index("ix_report_shap_contributions_file_id", "file_id"),
+)
+
+
+def replace_file_summary(conn, file_id: str, source: str, summary: Dict, dimensions: List[Dict],
+                         features: Optional[List[Dict]] = None) -> None:
+    """Înlocuiește rândurile (file_id, source) în tranzacția conexiunii primite.
+
+    `conn` e o Connection sync; din aplicația async se apelează prin session.run_sync.
+    `features` None lasă importanțele neatinse (verificarea de conformitate nu le are).
+    """
+    now = datetime.datetime.utcnow()
+    conn.execute(delete(file_summaries).where(file_summaries.c.file_id == file_id,
+                                              file_summaries.c.source == source))
+    conn.execute(delete(file_dimension_summaries).where(file_dimension_summaries.c.file_id == file_id,
+                                                        file_dimension_summaries.c.source == source))
+    conn.execute(file_summaries.insert(), [{**summary, "file_id": file_id, "source": source, "updated_at": now}])
+    if dimensions:
+        conn.execute(file_dimension_summaries.insert(),
+                     [{**d, "file_id": file_id, "source": source, "updated_at": now} for d in dimensions])
+    if features is not None:
+        conn.execute(delete(file_feature_importances).where(file_feature_importances.c.file_id == file_id))
+        if features:
+            conn.execute(file_feature_importances.insert(), [{**f, "file_id": file_id} for f in features])
+
+
+def _upsert_add(conn, rows: List[Dict]) -> None:
+    """INSERT sau, dacă celula există, adună valorile la cele existente (atomic în DB)."""
+    t = daily_merchant_rollups
+    if conn.dialect.name == "mysql":
+        from sqlalchemy.dialects.mysql import insert
+        stmt = insert(t)
+        stmt = stmt.on_duplicate_key_update(
+            {**{m: t.c[m] + stmt.inserted[m] for m in ROLLUP_METRICS}, "updated_at": stmt.inserted.updated_at})
+    else:
+        if conn.dialect.name == "postgresql":
+            from sqlalchemy.dialects.postgresql import insert
+        else:
+            from sqlalchemy.dialects.sqlite import insert
+        stmt = insert(t)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=list(ROLLUP_KEY),
+            set_={**{m: t.c[m] + stmt.excluded[m] for m in ROLLUP_METRICS}, "updated_at": stmt.excluded.updated_at})
+    conn.execute(stmt, rows)
+
+
+def apply_rollups(conn, file_id: str, source: str, rollups: List[Dict]) -> int:
+    """Înlocuiește contribuția (file_id, source) la rollup-uri; întoarce câte celule s-au schimbat.
+
+    Contribuția veche se citește cu FOR UPDATE (MySQL), ca două scrieri ale aceluiași
+    fișier să nu scadă de două ori același lucru; celulele altor fișiere nu sunt blocate.
+    """
+    c = rollup_contributions
+    where = (c.c.file_id == file_id) & (c.c.source == source)
+    old = conn.execute(select(c).where(where).with_for_update()).mappings().all()
+
+    delta: Dict[tuple, Dict] = {}
+    for row, sign in [(r, -1) for r in old] + [(r, 1) for r in rollups]:
+        cell = delta.setdefault(tuple(row[k] for k in ROLLUP_KEY), dict.fromkeys(ROLLUP_METRICS, 0))
+        for m in ROLLUP_METRICS:
+            cell[m] += sign * (row.get(m) or 0)
+    now = datetime.datetime.utcnow()
+    changed = [
+        {**dict(zip(ROLLUP_KEY, key)), **values, "updated_at": now}
+        for key, values in sorted(delta.items())
+        if any(abs(v) > 1e-9 for v in values.values())
+    ]
+    if changed:
+        _upsert_add(conn, changed)
+        # celulele rămase fără niciun rând (fișierul nu mai are tranzacții în ziua/comerciantul respectiv)
+        r = daily_merchant_rollups
+        emptied = [tuple(row[k] for k in ROLLUP_KEY) for row in changed
+                   if row["report_rows"] < 0 or row["compliance_rows"] < 0]
+        if emptied:
+            conn.execute(delete(r).where(tuple_(*(r.c[k] for k in ROLLUP_KEY)).in_(emptied),
+                                         r.c.report_rows == 0, r.c.compliance_rows == 0))
+
+    conn.execute(delete(c).where(where))
+    if rollups:
+        conn.execute(c.insert(), [{**dict.fromkeys(ROLLUP_METRICS, 0), **{k: r[k] for k in ROLLUP_KEY},
+                                   **{m: r.get(m) or 0 for m in ROLLUP_METRICS},
+                                   "file_id": file_id, "source": source} for r in rollups])
+    return len(changed)
+
+
+def write_summary(conn, file_id: str, source: str, summary: Dict, **extra) -> None:
+    """Scrie tot ce a produs `compliance.summaries` pentru (file_id, source), într-o tranzacție.
+    `extra` se adaugă pe rândul din file_summaries (report_id, ruleset_version)."""
+    features = summary.get("features")
+    if features is not None and extra.get("report_id"):
+        features = [{**f, "report_id": extra["report_id"]} for f in features]
+    replace_file_summary(conn, file_id, source, {**summary["totals"], **extra}, summary["dimensions"], features)
+    apply_rollups(conn, file_id, source, summary.get("rollups") or [])
+    if summary.get("shap") is not None and extra.get("report_id"):
+        replace_report_shap(conn, extra["report_id"], file_id, summary["shap"])
+
+
+def replace_report_shap(conn, report_id: str, file_id: str, contributions: List[Dict]) -> None:
+    """Înlocuiește sumele SHAP ale raportului; valorile duplicate după trunchiere se adună."""
+    merged: Dict[tuple, Dict] = {}
+    for c in contributions:
+        row = merged.setdefault((c["feature"], c["value"]), {**c, "shap_sum": 0.0, "rows": 0})
+        row["shap_sum"] += c["shap_sum"]
+        row["rows"] += c["rows"]
+    t = report_shap_contributions
+    conn.execute(delete(t).where(t.c.report_id == report_id))
+    if merged:
+        conn.execute(t.insert(), [{**r, "report_id": report_id, "file_id": file_id} for r in merged.values()])
+
+
+# Driver sync pentru fiecare driver async acceptat în DATABASE_URL (invers față de db.py)
+SYNC_DRIVERS = {"mysql+aiomysql": "mysql+pymysql", "sqlite+aiosqlite": "sqlite"}
+
+
+def engine_from_env():
+    """Engine sync din DATABASE_URL sau MYSQL_*; None dacă serviciul rulează fără DB."""
+    url = os.getenv("DATABASE_URL")
+    if url:
+        scheme, sep, rest = url.partition("://")
+        url = SYNC_DRIVERS.get(scheme, scheme) + sep + rest
+    elif os.getenv("MYSQL_HOST"):
+        url = "mysql+pymysql://{user}:{password}@{host}:{port}/{name}".format(
+            user=os.getenv("MYSQL_USER", "smartuser"),
+            password=os.getenv("MYSQL_PASSWORD", "smartpass"),
+            host=os.getenv("MYSQL_HOST"),
+            port=os.getenv("MYSQL_PORT", "3306"),
+            name=os.getenv("MYSQL_DATABASE", "smartpay"),
+        )
+    else:
+        return None
+    if url.startswith("sqlite"):
+        return create_engine(url, connect_args={"check_same_thread": False})
+    return create_engine(url, pool_size=int(os.getenv("DB_POOL_SIZE", "5")), pool_pre_ping=True,
+                         pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")))
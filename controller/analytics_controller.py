@@ -0,0 +1,100 @@
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from model.summary_model import PortfolioSummary
+from compliance.summary_tables import DIMENSIONS
+
+
+def _ratio(num, den):
+    return round(float(num) / den, 6) if den else None
+
+
+async def get_portfolio_summary_controller(session: AsyncSession, dimension: str = "brand", brand: Optional[str] = None):
+    """Agregate de portofoliu pe o dimensiune (brand, mcc_group, channel), din tabelele de sumar."""
+    if dimension not in DIMENSIONS:
+        raise HTTPException(status_code=400, detail=f"dimension must be one of {list(DIMENSIONS)}")
+    rows = await PortfolioSummary.by_dimension(session, dimension, brand)
+    groups = []
+    for r in rows:
+        report_rows, compliance_rows = int(r["report_rows"]), int(r["compliance_rows"])
+        groups.append({
+            "value": r["value"],
+            "files": int(r["files"]),
+            "report_rows": report_rows,
+            "downgraded": int(r["downgraded"]),
+            "downgrade_rate": _ratio(r["downgraded"], report_rows),
+            "predicted_fee_sum": float(r["predicted_fee_sum"]),
+            "actual_fee_sum": float(r["actual_fee_sum"]),
+            "avg_fee_gap": _ratio(float(r["predicted_fee_sum"]) - float(r["actual_fee_sum"]), report_rows),
+            "downgrade_cost": float(r["downgrade_cost"]),
+            "compliance_rows": compliance_rows,
+            "non_compliant": int(r["non_compliant"]),
+            "non_compliance_rate": _ratio(r["non_compliant"], compliance_rows),
+            "estimated_impact": float(r["estimated_impact"]),
+        })
+    return {"dimension": dimension, "brand": brand, "groups": groups}
+
+
+async def get_feature_importances_controller(session: AsyncSession, brand: Optional[str] = None):
+    rows = await PortfolioSummary.feature_importances(session, brand)
+    features = [
+        {"feature": r["feature"], "importance": float(r["importance"] or 0.0), "files": int(r["files"])}
+        for r in rows
+    ]
+    features.sort(key=lambda f: f["importance"], reverse=True)
+    return {"brand": brand, "features": features}
+
+
+async def get_rollups_controller(session: AsyncSession, group_by: str = "cell", date_from=None, date_to=None,
+                                 merchant: Optional[str] = None, brand: Optional[str] = None, limit: int = 1000):
+    """Serii zilnice / per comerciant direct din daily_merchant_rollups (fără fișiere sau rapoarte)."""
+    if group_by not in PortfolioSummary.ROLLUP_GROUPS:
+        raise HTTPException(status_code=400, detail=f"group_by must be one of {list(PortfolioSummary.ROLLUP_GROUPS)}")
+    rows = await PortfolioSummary.rollups(session, group_by, date_from, date_to, merchant, brand, limit + 1)
+    items = []
+    for r in rows[:limit]:
+        report_rows, compliance_rows = int(r["report_rows"] or 0), int(r["compliance_rows"] or 0)
+        item = {k: (r[k].isoformat() if k == "day" else r[k]) for k in PortfolioSummary.ROLLUP_GROUPS[group_by]}
+        item.update({
+            "report_rows": report_rows,
+            "downgraded": int(r["downgraded"] or 0),
+            "downgrade_rate": _ratio(r["downgraded"] or 0, report_rows),
+            "predicted_fee_sum": float(r["predicted_fee_sum"] or 0.0),
+            "actual_fee_sum": float(r["actual_fee_sum"] or 0.0),
+            "downgrade_cost": float(r["downgrade_cost"] or 0.0),
+            "compliance_rows": compliance_rows,
+            "non_compliant": int(r["non_compliant"] or 0),
+            "non_compliance_rate": _ratio(r["non_compliant"] or 0, compliance_rows),
+            "estimated_impact": float(r["estimated_impact"] or 0.0),
+        })
+        items.append(item)
+    return {"group_by": group_by, "date_from": date_from, "date_to": date_to, "merchant": merchant, "brand": brand,
+            "rows": items, "truncated": len(rows) > limit}
+
+
+async def get_shap_importances_controller(session: AsyncSession, report_ids: Optional[List[str]] = None,
+                                          brand: Optional[str] = None, date_from=None, date_to=None,
+                                          merchant: Optional[str] = None, latest_only: bool = True):
+    """Importanța combinată a unui set de rapoarte din sumele SHAP brute (fără SHAP re-rulat).
+
+    Sumele per (feature, valoare) se adună între rapoarte, apoi se normalizează ca în
+    evaluate_model: |suma| per valoare, adunat per feature, raportat la total.
+    """
+    rows = await PortfolioSummary.shap_contributions(session, report_ids, brand, date_from, date_to, merchant,
+                                                     latest_only)
+    features = {}
+    for r in rows:
+        shap_sum, count = float(r["shap_sum"] or 0.0), int(r["rows"] or 0)
+        f = features.setdefault(r["feature"], {"feature": r["feature"], "shap_abs": 0.0, "values": []})
+        f["shap_abs"] += abs(shap_sum)
+        f["values"].append({"value": r["value"], "shap_sum": shap_sum, "rows": count,
+                            "mean_contribution": _ratio(shap_sum, count)})
+    total = sum(f["shap_abs"] for f in features.values())
+    merged = sorted(features.values(), key=lambda f: f["shap_abs"], reverse=True)
+    for f in merged:
+        f["importance"] = _ratio(f["shap_abs"], total)
+        f["values"].sort(key=lambda v: abs(v["shap_sum"]), reverse=True)
+    return {"reports": max((int(r["reports"]) for r in rows), default=0), "brand": brand, "merchant": merchant,
+            "date_from": date_from, "date_to": date_to, "features": merged}
@@ -1,62 +1,38 @@
-from fastapi import UploadFile, File as FastAPIFile
+from fastapi import UploadFile, BackgroundTasks
+import asyncio
+import datetime
+import json
 import os
+import shutil
+import tarfile
+import uuid
+import zipfile
+from typing import List, Optional
 from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from file_store import write_sidecar, FRAMES, FILES, MASTERCARD, VISA, get_schema
+from upload_validation import UploadValidator
+from brand_split import BrandSplitter
+from dedup import MAX_SAMPLES, transaction_keys, write_without_rows
 from model.file_model import File
-from db import SessionLocal
+from model.transaction_key_model import TransactionKey
+from model.pagination import DEFAULT_LIMIT, InvalidCursor
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
  
-UPLOAD_DIR = "files"
+UPLOAD_DIR = FILES.root   # temporarele stau în root; fișierele finale în shard-uri
+UPLOAD_CHUNK_BYTES = 1 << 20
  
-mastercard_fields = [
-    "mc_mti",
-    "mc_processing_code",
-    "mc_acquirer_bin",
-    "mc_issuer_bin",
-    "mc_merchant_category_code",
-    "mc_merchant_country_code",
-    "mc_card_acceptor_id_code",
-    "mc_card_acceptor_name_location",
-    "mc_transaction_currency_code",
-    "mc_settlement_currency_code",
-    "mc_transaction_amount",
-    "mc_settlement_amount",
-    "mc_exchange_rate",
-    "mc_presentment_date",
-    "mc_pos_entry_mode",
-    "mc_eci_indicator",
-    "mc_ucaf_collection_indicator",
-    "mc_cvv2_result_code",
-    "mc_avs_result_code",
-    "mc_cross_border_indicator",
-    "mc_retrieval_reference_number",
-    "mc_auth_id_response",
-    "interchange_fee",
-    "rate_pct",
-    "fixed_fee",
-    "mcc_group",
-    "downgraded",
-    "channel_type",
-    "cross_border_flag",
-    "eci_3ds_auth"
-]
- 
-visa_fields = [
-        "visa_cross_border_indicator",  # binary categorical: 'Y' or 'N'
-        "visa_channel_type",  # categorical: 'ecommerce', 'card_present', etc.
-        "visa_eci_indicator",  # numeric or ordinal: integer (e.g., 2 to 7)
-        "visa_cvv2_result_code",  # categorical: 'M', 'N', 'U', etc.
-        "visa_avs_result_code",  # categorical: 'Y', 'N', 'A', 'Z', 'U', etc.
-        "visa_pos_entry_mode",  # numeric: e.g., 1 = manual, 5 = chip, 7 = contactless
-        "visa_terminal_capability_code",  # numeric: terminal risk profile (low = risky)
-        "visa_merchant_category_code",  # categorical: MCC code, can be grouped or one-hot
-    ]
+# câmpurile obligatorii per brand vin din registrul de scheme (compliance.ingest)
+mastercard_fields = MASTERCARD.required
+visa_fields = VISA.required
  
  
-async def get_file(file_id: str):
+async def get_file(file_id: str, session: AsyncSession):
     if not file_id:
         raise HTTPException(status_code=404, detail="File not found")
-    session = SessionLocal()
     try:
-        file = File.get_file(session, file_id)
+        file = await File.get_file(session, file_id)
         if not file:
             raise HTTPException(status_code=404, detail="File not found")
         return {
@@ -65,17 +41,32 @@ async def get_file(file_id: str):
             "path": file.path,
             "brand": file.brand,
             "downgraded_transaction": file.downgraded_transaction,
-            "timestamp": str(file.timestamp)
+            "timestamp": str(file.timestamp),
+            "row_count": file.row_count,
+            "invalid_rows": file.invalid_rows,
+            "validation": json.loads(file.validation) if file.validation else None,
+            "parent_id": file.parent_id,
+            "partitions": [
+                {"id": p.id, "brand": p.brand, "row_count": p.row_count}
+                for p in await File.get_partitions(session, file.id)
+            ],
         }
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        session.close()
  
-async def get_all_files_controller():
-    session = SessionLocal()
+async def get_frame_cache_stats_controller():
+    return FRAMES.stats()
+
+async def get_all_files_controller(session: AsyncSession, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+                                   brand: Optional[str] = None, date_from: Optional[datetime.datetime] = None,
+                                   date_to: Optional[datetime.datetime] = None, min_downgraded: Optional[int] = None,
+                                   max_downgraded: Optional[int] = None):
+    """Pagină keyset (cel mai nou întâi); `next_cursor` se trimite ca `cursor` pentru pagina următoare."""
     try:
-        files = File.get_files(session)
+        files, next_cursor = await File.list_files(
+            session, limit, cursor, brand=brand, date_from=date_from, date_to=date_to,
+            min_downgraded=min_downgraded, max_downgraded=max_downgraded,
+        )
         result = [
             {
                 "id": f.id,
@@ -83,14 +74,17 @@ async def get_all_files_controller():
                 "path": f.path,
                 "brand": f.brand,
                 "downgraded_transaction": f.downgraded_transaction,
-                "timestamp": str(f.timestamp)
+                "timestamp": str(f.timestamp),
+                "row_count": f.row_count,
+                "invalid_rows": f.invalid_rows,
+                "parent_id": f.parent_id,
             } for f in files
         ]
-        return {"files": result}
+        return {"files": result, "next_cursor": next_cursor}
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        session.close()
  
  
 import csv
@@ -109,30 +103,367 @@ def detect_brand_and_validate_fields(header):
     missing = required_fields - set(header)
     return brand, missing
  
-async def upload_file_controller(file: UploadFile = FastAPIFile(...)):
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
+def _check_header(header):
+    brand, missing = detect_brand_and_validate_fields(header)
+    if not brand:
+        raise HTTPException(status_code=400, detail="Could not determine brand from the first column of the CSV.")
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Missing required fields for {brand}: {', '.join(missing)}")
+    return brand
+
+def validate_file(path: str):
+    """Validează un fișier deja scris pe disc (upload reluabil, arhive); întoarce (brand, validare)."""
+    validator = UploadValidator()
+    brand = None
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(UPLOAD_CHUNK_BYTES), b""):
+            validator.feed(chunk)
+            if brand is None and validator.header is not None:
+                brand = _check_header(validator.header)
+                validator.start(get_schema(brand))
+    if brand is None:
+        validator.feed(b"\n")
+        brand = _check_header(validator.header or [""])
+        validator.start(get_schema(brand))
+    return brand, validator.close()
+
+async def check_duplicates(session: AsyncSession, file_id: str, path: str, brand: str, validation: dict,
+                           skip: bool = False) -> str:
+    """Caută rândurile deja încărcate (transaction_keys) și indexează cheile noi ale fișierului.
+
+    Cheile se scriu în tranzacția sesiunii, deci se confirmă odată cu rândul File.
+    Rezultatul ajunge în validation["duplicates"]; cu `skip`, duplicatele nu se stochează:
+    întoarce calea unei copii fără ele (altfel `path`), iar validarea (rânduri, rânduri
+    invalide, erori) se reface pe copie.
+    """
+    keys = await run_in_threadpool(transaction_keys, path, get_schema(brand))
+    if keys is None:
+        validation["duplicates"] = {"checked": False, "rows": 0, "skipped": False, "samples": []}
+        return path
+    existing = await TransactionKey.find(session, {k for k in keys if k is not None})
+    first, dup_rows = {}, []
+    for i, k in enumerate(keys):
+        if k is None:
+            continue
+        if k in existing or k in first:
+            dup_rows.append(i)
+        else:
+            first[k] = i
+    skip = skip and bool(dup_rows)
+    # indicele rândului în fișierul stocat (fără duplicate, dacă sunt sărite)
+    position, kept, dups = [], 0, set(dup_rows)
+    for i in range(len(keys)):
+        position.append(kept if skip else i)
+        kept += i not in dups
+    samples = [
+        {"row": i, "file_id": existing[keys[i]][0] if keys[i] in existing else file_id,
+         "row_index": existing[keys[i]][1] if keys[i] in existing else position[first[keys[i]]]}
+        for i in dup_rows[:MAX_SAMPLES]
+    ]
+    stored = path
+    if skip:
+        stored = path + ".dedup"
+        await run_in_threadpool(write_without_rows, path, stored, dup_rows)
+        # rândurile sărite pot fi și invalide: contoarele și erorile descriu fișierul stocat
+        _, revalidated = await run_in_threadpool(validate_file, stored)
+        validation.update(revalidated)
+    try:
+        # savepoint per fișier: un conflict anulează doar cheile acestui fișier, nu și pe ale
+        # celorlalți membri deja verificați în aceeași sesiune (upload în bloc)
+        async with session.begin_nested():
+            await TransactionKey.insert_keys(session, [{"key": k, "file_id": file_id, "row_index": position[i]}
+                                                       for k, i in first.items()])
+    except IntegrityError:
+        # alt upload cu aceleași tranzacții a indexat cheile între timp
+        if stored != path and os.path.exists(stored):
+            os.remove(stored)
+        raise HTTPException(status_code=409, detail="The same transactions are being uploaded concurrently; retry.")
+    validation["duplicates"] = {"checked": True, "rows": len(dup_rows), "skipped": skip, "samples": samples}
+    return stored
+
+async def store_upload(session: AsyncSession, part_path: str, filename: str, brand: str, validation: dict,
+                 background_tasks: Optional[BackgroundTasks] = None, skip_duplicates: bool = False) -> dict:
+    """Creează rândul File, mută fișierul validat în files/<id>.csv (comprimat, vezi FILES.codec)
+    și programează sidecar-ul."""
     import datetime
-    session = SessionLocal()
+    file_id = str(uuid.uuid4())
+    stored = await check_duplicates(session, file_id, part_path, brand, validation, skip_duplicates)
+    new_file = File(
+        id=file_id,
+        name=filename,
+        timestamp=datetime.datetime.now(datetime.timezone.utc),
+        row_count=validation["rows"],
+        invalid_rows=validation["invalid_rows"],
+        validation=json.dumps(validation),
+    )
+    # fișierul se stochează înaintea commit-ului: un rând File (și cheile lui) confirmat
+    # fără fișier ar marca drept duplicate toate reîncărcările ulterioare
+    try:
+        file_path = await run_in_threadpool(FILES.put, stored, file_id, ".csv")
+    except Exception:
+        await session.rollback()
+        if stored != part_path and os.path.exists(stored):
+            os.remove(stored)
+        raise
+    if stored != part_path and os.path.exists(part_path):
+        os.remove(part_path)
+    try:
+        await new_file.insert_file(session, brand=brand)
+    except Exception:
+        await session.rollback()
+        if os.path.exists(file_path):
+            os.remove(file_path)
+        raise
+    # Sidecar Parquet tipizat, după răspuns; până e gata cititorii folosesc CSV-ul
+    if background_tasks is not None:
+        background_tasks.add_task(write_sidecar, file_path)
+    else:
+        write_sidecar(file_path)
+    return {"message": "File uploaded", "file_id": new_file.id, "path": new_file.path, "brand": new_file.brand, "downgraded_transaction": new_file.downgraded_transaction, "validation": validation}
+
+async def upload_file_controller(file: UploadFile, session: AsyncSession, background_tasks: Optional[BackgroundTasks] = None,
+                                 skip_duplicates: bool = False):
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    part_path = os.path.join(UPLOAD_DIR, f".upload-{uuid.uuid4().hex}.part")
     try:
-        # Citește headerul CSV direct din UploadFile
-        content = await file.read()
-        lines = content.decode("utf-8").splitlines()
-        reader = csv.reader(lines)
-        header = next(reader)
-        brand, missing = detect_brand_and_validate_fields(header)
-        if not brand:
-            raise HTTPException(status_code=400, detail="Could not determine brand from the first column of the CSV.")
-        if missing:
-            raise HTTPException(status_code=400, detail=f"Missing required fields for {brand}: {', '.join(missing)}")
+        # Copiază upload-ul pe disc bucată cu bucată; fiecare bucată e validată (tip, valori
+        # permise, lipsuri) într-un thread, în paralel cu citirea/scrierea următoarei bucăți
+        loop = asyncio.get_running_loop()
+        validator = UploadValidator()
+        brand = None
+        pending = None
+        with open(part_path, "wb") as out:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                if not chunk:
+                    break
+                out.write(chunk)
+                if pending is not None:
+                    await pending
+                if brand is None and validator.header is not None:
+                    brand = _check_header(validator.header)
+                    validator.start(get_schema(brand))
+                pending = loop.run_in_executor(None, validator.feed, chunk)
+            if pending is not None:
+                await pending
+        if brand is None:
+            # tot fișierul a venit într-o singură bucată (sau headerul nu se termină cu '\n')
+            validator.feed(b"\n")
+            brand = _check_header(validator.header or [""])
+            validator.start(get_schema(brand))
+        validation = await loop.run_in_executor(None, validator.close)
  
         # Creează fișierul și salvează în DB
-        new_file = File(name=file.filename, timestamp=datetime.datetime.now(datetime.timezone.utc))
-        new_file.insert_file(session, brand=brand)
-        file_path = os.path.join(UPLOAD_DIR, f"{new_file.id}.csv")
-        with open(file_path, "wb") as f:
-            f.write(content)
-        new_file.path = f"/files/{new_file.id}.csv"
-        session.commit()
-        return {"message": "File uploaded", "file_id": new_file.id, "path": new_file.path, "brand": new_file.brand, "downgraded_transaction": new_file.downgraded_transaction}
+        return await store_upload(session, part_path, file.filename, brand, validation, background_tasks,
+                                  skip_duplicates)
+    finally:
+        if os.path.exists(part_path):
+            os.remove(part_path)
+
+
+# -------- upload în bloc: mai multe CSV-uri sau o arhivă zip/tar --------
+TAR_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tar.xz")
+
+def _archive_members(upload: UploadFile):
+    """(nume, fișier) pentru fiecare membru; un upload care nu e arhivă e propriul membru."""
+    name = (upload.filename or "").lower()
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(upload.file) as zf:
+            for info in zf.infolist():
+                if info.is_dir() or info.filename.startswith("__MACOSX/"):
+                    continue
+                with zf.open(info) as src:
+                    yield info.filename, src
+    elif name.endswith(TAR_SUFFIXES):
+        # mod stream ("r|*"): membrii se citesc în ordine, fără seek prin arhivă
+        with tarfile.open(fileobj=upload.file, mode="r|*") as tf:
+            for member in tf:
+                if member.isfile():
+                    yield member.name, tf.extractfile(member)
+    else:
+        yield upload.filename, upload.file
+
+def _receive_members(uploads: List[UploadFile]):
+    """Scrie fiecare membru pe disc și îl validează; întoarce (acceptate, manifest cu erori)."""
+    accepted, failed = [], []
+    for upload in uploads:
+        try:
+            for name, src in _archive_members(upload):
+                part_path = os.path.join(UPLOAD_DIR, f".upload-{uuid.uuid4().hex}.part")
+                try:
+                    with open(part_path, "wb") as out:
+                        shutil.copyfileobj(src, out, UPLOAD_CHUNK_BYTES)
+                    brand, validation = validate_file(part_path)
+                    accepted.append({"name": name, "part": part_path, "brand": brand, "validation": validation})
+                except Exception as e:
+                    failed.append({"name": name, "status": "failed",
+                                   "error": e.detail if isinstance(e, HTTPException) else str(e)})
+                    if os.path.exists(part_path):
+                        os.remove(part_path)
+        except (zipfile.BadZipFile, tarfile.TarError, OSError) as e:
+            failed.append({"name": upload.filename, "status": "failed", "error": f"Unreadable archive: {e}"})
+    return accepted, failed
+
+async def upload_bulk_controller(files: List[UploadFile], session: AsyncSession, background_tasks: Optional[BackgroundTasks] = None,
+                                 skip_duplicates: bool = False):
+    import datetime
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    accepted, failed = await run_in_threadpool(_receive_members, files)
+    manifest = []
+    try:
+        now = datetime.datetime.now(datetime.timezone.utc)
+        rows, moved = [], []
+        # duplicatele se caută înainte de orice mutare; membrii se verifică în ordine,
+        # deci al doilea exemplar al aceluiași lot din arhivă e marcat duplicat
+        checked = []
+        for item in accepted:
+            item["id"] = str(uuid.uuid4())
+            try:
+                item["stored"] = await check_duplicates(session, item["id"], item["part"], item["brand"],
+                                                        item["validation"], skip_duplicates)
+            except HTTPException as e:
+                # conflict doar pe acest membru: ceilalți își păstrează cheile și se stochează
+                failed.append({"name": item["name"], "status": "failed", "error": e.detail})
+                if os.path.exists(item["part"]):
+                    os.remove(item["part"])
+                continue
+            checked.append(item)
+        accepted = checked
+        for item in accepted:
+            file_id = item["id"]
+            rows.append(File(
+                id=file_id,
+                name=item["name"],
+                path=f"/files/{file_id}.csv",
+                brand=item["brand"],
+                timestamp=now,
+                row_count=item["validation"]["rows"],
+                invalid_rows=item["validation"]["invalid_rows"],
+                validation=json.dumps(item["validation"]),
+            ))
+            moved.append(await run_in_threadpool(FILES.put, item["stored"], file_id, ".csv"))
+        try:
+            await File.insert_files(session, rows)
+        except Exception as e:
+            await session.rollback()
+            for path in moved:
+                os.remove(path)
+            for item in accepted:
+                manifest.append({"name": item["name"], "status": "failed", "error": f"Database error: {e}"})
+            rows, moved = [], []
+        for row, file_path, item in zip(rows, moved, accepted):
+            if background_tasks is not None:
+                background_tasks.add_task(write_sidecar, file_path)
+            else:
+                write_sidecar(file_path)
+            manifest.append({"name": item["name"], "status": "uploaded", "file_id": row.id, "path": row.path,
+                             "brand": row.brand, "validation": item["validation"]})
+    finally:
+        for item in accepted:
+            for path in {item["part"], item.get("stored", item["part"])}:
+                if os.path.exists(path):
+                    os.remove(path)
+    manifest.extend(failed)
+    uploaded = sum(1 for m in manifest if m["status"] == "uploaded")
+    return {"message": f"{uploaded} of {len(manifest)} files uploaded", "uploaded": uploaded,
+            "failed": len(manifest) - uploaded, "files": manifest}
+
+
+# -------- upload mixt: un export cu rânduri Visa și Mastercard, împărțit per brand --------
+async def upload_mixed_controller(file: UploadFile, session: AsyncSession, background_tasks: Optional[BackgroundTasks] = None,
+                                  skip_duplicates: bool = False):
+    import datetime
+    import pyarrow as pa
+    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    token = uuid.uuid4().hex
+    part_path = os.path.join(UPLOAD_DIR, f".upload-{token}.part")
+    partition_paths, handles, deduped = {}, [], []
+
+    def open_partition(brand):
+        partition_paths[brand] = os.path.join(UPLOAD_DIR, f".upload-{token}-{brand}.part")
+        handles.append(open(partition_paths[brand], "wb"))
+        return handles[-1]
+
+    splitter = BrandSplitter(open_partition)
+    try:
+        # o singură trecere: originalul se copiază pe disc, iar bucata anterioară se împarte
+        # (și se validează per partiție) într-un thread, în paralel cu citirea următoarei
+        loop = asyncio.get_running_loop()
+        pending = None
+        try:
+            with open(part_path, "wb") as out:
+                while True:
+                    chunk = await file.read(UPLOAD_CHUNK_BYTES)
+                    if not chunk:
+                        break
+                    out.write(chunk)
+                    if pending is not None:
+                        await pending
+                    pending = loop.run_in_executor(None, splitter.feed, chunk)
+                if pending is not None:
+                    await pending
+            stats = await loop.run_in_executor(None, splitter.close)
+        except (pa.ArrowInvalid, UnicodeDecodeError) as e:
+            raise HTTPException(status_code=400, detail=f"Could not parse CSV: {e}")
+        finally:
+            for f in handles:
+                f.close()
+        if not splitter.columns:
+            raise HTTPException(status_code=400, detail="No Visa or Mastercard columns found in the CSV header.")
+        if not stats["partitions"]:
+            raise HTTPException(status_code=400, detail="No row could be assigned to a brand.")
+
+        # părintele (fișierul original) și partițiile, într-o singură tranzacție
+        now = datetime.datetime.now(datetime.timezone.utc)
+        parent_id = str(uuid.uuid4())
+        parent = File(
+            id=parent_id, name=file.filename, path=f"/files/{parent_id}.csv", brand="mixed", timestamp=now,
+            row_count=stats["rows"], invalid_rows=stats["unassigned_rows"],
+            validation=json.dumps({k: v for k, v in stats.items() if k != "partitions"}),
+        )
+        rows, moves = [parent], [(part_path, parent_id)]
+        stem = os.path.splitext(file.filename or "upload")[0]
+        for brand, info in stats["partitions"].items():
+            child_id = str(uuid.uuid4())
+            validation = info["validation"]
+            stored = await check_duplicates(session, child_id, partition_paths[brand], brand, validation,
+                                            skip_duplicates)
+            if stored != partition_paths[brand]:
+                deduped.append(stored)
+            rows.append(File(
+                id=child_id, name=f"{stem}.{brand}.csv", path=f"/files/{child_id}.csv", brand=brand,
+                timestamp=now, parent_id=parent_id, row_count=validation["rows"],
+                invalid_rows=validation["invalid_rows"], validation=json.dumps(validation),
+            ))
+            moves.append((stored, child_id))
+        stored_paths = [await run_in_threadpool(FILES.put, src, key, ".csv") for src, key in moves]
+        try:
+            await File.insert_files(session, rows)
+        except Exception:
+            await session.rollback()
+            for dst in stored_paths:
+                os.remove(dst)
+            raise
+        # sidecar doar pentru partiții: rapoartele și check-urile rulează pe ele
+        for dst in stored_paths[1:]:
+            if background_tasks is not None:
+                background_tasks.add_task(write_sidecar, dst)
+            else:
+                write_sidecar(dst)
+        return {
+            "message": "File uploaded and split by brand",
+            "file_id": parent_id,
+            "path": parent.path,
+            "brand": "mixed",
+            "rows": stats["rows"],
+            "unassigned_rows": stats["unassigned_rows"],
+            "unassigned_samples": stats["unassigned_samples"],
+            "partitions": [
+                {"file_id": r.id, "path": r.path, "brand": r.brand, "validation": stats["partitions"][r.brand]["validation"]}
+                for r in rows[1:]
+            ],
+        }
     finally:
-        session.close()
\ No newline at end of file
+        for path in [part_path, *partition_paths.values(), *deduped]:
+            if os.path.exists(path):
+                os.remove(path)
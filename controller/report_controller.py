@@ -1,82 +1,111 @@
+import asyncio
 import os
-import json
-from fastapi import HTTPException
+from fastapi import HTTPException, Response
+from starlette.concurrency import run_in_threadpool
 from hackathon_mastercard_regressor.evaluate_model import generate_shap_explanations as generate_shap_explanations_mc
 from hackathon_visa_regressor.evaluate_model import generate_shap_explanations as generate_shap_explanations_visa
 from model.report_model import Report
 from model.file_model import File
+from model.pagination import DEFAULT_LIMIT, InvalidCursor
+from typing import Optional
 import datetime, uuid
-from db import SessionLocal
+from sqlalchemy.ext.asyncio import AsyncSession
 import pandas as pd
-import json
-
-FEATURES_MASTERCARD = [
-    "mc_pos_entry_mode",
-    "mc_eci_indicator",
-    "mc_ucaf_collection_indicator",
-    "mc_cvv2_result_code",
-    "mc_avs_result_code",
-    "mc_cross_border_indicator",
-    "mcc_group",
-    "channel_type",
-]
-
-FEATURES_VISA = [
-        "visa_cross_border_indicator",  # binary categorical: 'Y' or 'N'
-        "visa_channel_type",  # categorical: 'ecommerce', 'card_present', etc.
-        "visa_eci_indicator",  # numeric or ordinal: integer (e.g., 2 to 7)
-        "visa_cvv2_result_code",  # categorical: 'M', 'N', 'U', etc.
-        "visa_avs_result_code",  # categorical: 'Y', 'N', 'A', 'Z', 'U', etc.
-        "visa_pos_entry_mode",  # numeric: e.g., 1 = manual, 5 = chip, 7 = contactless
-        "visa_terminal_capability_code",  # numeric: terminal risk profile (low = risky)
-        "visa_merchant_category_code",  # categorical: MCC code, can be grouped or one-hot
-    ]
+from file_store import load_transactions, FILES, REPORTS, MASTERCARD, VISA, get_schema
+from model.summary_model import PortfolioSummary, SOURCE_REPORT
+from compliance.summaries import report_summary
+from compliance.serialization import DEBUG_JSON, MEDIA_TYPE, dumps, write_json
+from compliance.compression import accepts, codec_of, read_bytes
+
+# features-urile modelelor vin din registrul de scheme (compliance.ingest)
+FEATURES_MASTERCARD = MASTERCARD.features
+FEATURES_VISA = VISA.features
+
+# Coloanele citite din fișier la generarea raportului: features + taxa reală + dimensiunile sumarelor
+def _report_columns(schema, fee_columns):
+    return list(dict.fromkeys(schema.features + fee_columns + list(schema.dimensions.values())
+                              + list(schema.rollup_keys.values())))
+
+REPORT_COLUMNS_MASTERCARD = _report_columns(MASTERCARD, ["interchange_fee"])
+REPORT_COLUMNS_VISA = _report_columns(VISA, ["fee_rate", "visa_interchange_fee", "currency"])
     
 
 UPLOAD_DIR = "reports"
 
 
-async def get_report_controller(report_id: str):
+async def get_report_controller(report_id: str, accept_encoding: Optional[str] = None):
     if not report_id:
         raise HTTPException(status_code=404, detail="Report not found")
-    # Caută fișierul JSON în folderul reports
-    report_path = os.path.join(os.path.dirname(__file__), '..', 'reports', f'{report_id}.json')
-    report_path = os.path.abspath(report_path)
-    if not os.path.exists(report_path):
+    # Caută fișierul JSON în folderul reports (shard calculat din id; <id>.json[.gz|.zst])
+    report_path = REPORTS.locate(report_id, ".json")
+    if report_path is None:
         raise HTTPException(status_code=404, detail="Report not found")
+    codec = codec_of(report_path)
+    # raportul comprimat se trimite ca atare dacă clientul acceptă encoding-ul lui
+    direct = codec is not None and accepts(accept_encoding, codec)
     try:
-        with open(report_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        return data
+        # bytes-ii stocați sunt deja JSON: se trimit ca atare, fără decodare + re-encodare
+        content = await run_in_threadpool(_read_stored if direct else read_bytes, report_path)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error reading report: {str(e)}")
+    if direct:
+        return Response(content=content, media_type=MEDIA_TYPE,
+                        headers={"Content-Encoding": codec, "Vary": "Accept-Encoding"})
+    return Response(content=content, media_type=MEDIA_TYPE)
+
+def _read_stored(path):
+    with open(path, "rb") as f:
+        return f.read()
 
 def save_report_json(report_json, report_id):
-    reports_dir = os.path.join(os.path.dirname(__file__), '..', 'reports')
-    os.makedirs(reports_dir, exist_ok=True)
-    report_path = os.path.join(reports_dir, f"{report_id}.json")
-    with open(report_path, "w", encoding="utf-8") as f:
-        json.dump(report_json, f, ensure_ascii=False, indent=2)
+    # compact (orjson; indentat doar cu JSON_DEBUG), comprimat cu REPORTS.codec
+    REPORTS.put_bytes(report_id, ".json", dumps(report_json))
 
-async def generate_report_controller(source_id: str) -> str:
-    
+# Copiile de inspecție din directorul curent, scrise doar în modul debug
+DEBUG_DUMPS = {"mastercard": "shap_explanations.json", "visa": "shap_all_with_transactions.json"}
+
+def _debug_dump_transactions(report_json, count):
+    with open("123333_transactions.json", "wb") as f:
+        f.write(dumps(report_json))
+        f.write(f"\nCount of downgraded transactions: {count}\n".encode("utf-8"))
+
+async def generate_report_controller(source_id: str, session: AsyncSession) -> str:
     if not source_id:
         raise HTTPException(status_code=400, detail="Missing source_id")
-    file = File.get_file(SessionLocal(), source_id)
+    file = await File.get_file(session, source_id)
     if not file:
         raise HTTPException(status_code=404, detail="Source file not found in database")
-    
+    if file.brand == "mixed":
+        partitions = await File.get_partitions(session, file.id)
+        if not partitions:
+            raise HTTPException(status_code=404, detail="Mixed upload has no partitions")
+        # upload mixt: explicațiile SHAP per partiție de brand se calculează în paralel;
+        # scrierile în DB rămân secvențiale (un AsyncSession nu e folosit concurent)
+        built = await asyncio.gather(*(run_in_threadpool(_build_report_json, p) for p in partitions))
+        results = [await _save_report(session, p, *b) for p, b in zip(partitions, built)]
+        return {
+            "message": "Report JSON saved for each brand partition.",
+            "reports": [{"source_id": p.id, "brand": p.brand, **r} for p, r in zip(partitions, results)],
+        }
+    report_json, summary = await run_in_threadpool(_build_report_json, file)
+    return await _save_report(session, file, report_json, summary)
+
 
+def _build_report_json(file: File):
+    """Partea grea (citire + model + SHAP + sumar), sincronă: rulează într-un thread, fără DB.
+
+    Întoarce (report_json, sumar pentru tabelele de sumar sau None).
+    """
     # Caută fișierul CSV în folderul files
-    csv_path = os.path.join(os.path.dirname(__file__), '..', 'files', f'{file.id}.csv')
-    csv_path = os.path.abspath(csv_path)
-    file_source = pd.read_csv(csv_path)
+    csv_path = FILES.locate(file.id, ".csv")
     file_only_features = None
-    if not os.path.exists(csv_path):
+    if csv_path is None:
         raise HTTPException(status_code=404, detail="Source CSV file not found")
 
     report_json = {}
+    file_source = None
     if file.brand.lower() == "mastercard":
+        file_source = load_transactions(file.id, csv_path, REPORT_COLUMNS_MASTERCARD)
         file_only_features = file_source[FEATURES_MASTERCARD]
         base_path = os.path.join(os.path.dirname(__file__), '..', 'hackathon_mastercard_regressor')
         report_json = generate_shap_explanations_mc(
@@ -85,6 +114,7 @@ async def generate_report_controller(source_id: str) -> str:
             file_source=file_source
         )
     elif file.brand.lower() == "visa":
+        file_source = load_transactions(file.id, csv_path, REPORT_COLUMNS_VISA)
         file_only_features = file_source[FEATURES_VISA]
         base_path = os.path.join(os.path.dirname(__file__), '..', 'hackathon_visa_regressor')
         report_json = generate_shap_explanations_visa(
@@ -92,31 +122,46 @@ async def generate_report_controller(source_id: str) -> str:
             x_file=file_only_features,
             full_file=file_source
         )
-    
-    with SessionLocal() as session:
-        report = Report(
-            source_file=source_id,
-            timestamp=datetime.datetime.utcnow(),
-            brand=file.brand
-        )
-        report.insert_report(session, file.brand)
-        report.path = f"/reports/{report.id}.json"
-        session.commit()
-        file_db = File.get_file(session, source_id)
-        if file_db:
-            file_db.update_transaction(session, report_json)
-            session.commit()
-        save_report_json(report_json, report.id)
-        return {"message": "Report JSON saved.", "report_id": report.id, "path": report.path}
-    
-	#Error if not returned
-    return HTTPException(status_code=500, detail="Failed to generate report")
+    if DEBUG_JSON and isinstance(report_json, dict):
+        write_json(DEBUG_DUMPS[file.brand.lower()], report_json)
+    summary = None
+    if isinstance(report_json, dict) and file_source is not None:
+        schema = get_schema(file.brand)
+        summary = report_summary(report_json, file_source, schema)
+    return report_json, summary
+
 
+async def _save_report(session: AsyncSession, file: File, report_json: dict, summary=None) -> dict:
+    report = Report(
+        source_file=file.id,
+        timestamp=datetime.datetime.utcnow(),
+        brand=file.brand
+    )
+    await report.insert_report(session, file.brand)
+    report.path = f"/reports/{report.id}.json"
+    await session.commit()
+    await file.update_transaction(session, report_json)
+    if DEBUG_JSON:
+        await run_in_threadpool(_debug_dump_transactions, report_json, file.downgraded_transaction)
+    if summary is not None:
+        # sumarele + rollup-urile zilnice, în aceeași tranzacție
+        await PortfolioSummary.write(session, file.id, SOURCE_REPORT, summary, report_id=report.id)
+        await session.commit()
+    await run_in_threadpool(save_report_json, report_json, report.id)
+    return {"message": "Report JSON saved.", "report_id": report.id, "path": report.path}
 
-async def get_all_reports_controller():
-    session = SessionLocal()
+
+async def get_all_reports_controller(session: AsyncSession, limit: int = DEFAULT_LIMIT, cursor: Optional[str] = None,
+                                     source_file: Optional[str] = None, brand: Optional[str] = None,
+                                     date_from: Optional[datetime.datetime] = None,
+                                     date_to: Optional[datetime.datetime] = None,
+                                     min_downgraded: Optional[int] = None, max_downgraded: Optional[int] = None):
+    """Pagină keyset (cel mai nou întâi); `next_cursor` se trimite ca `cursor` pentru pagina următoare."""
     try:
-        reports = session.query(Report).all()
+        reports, next_cursor = await Report.list_reports(
+            session, limit, cursor, source_file=source_file, brand=brand, date_from=date_from, date_to=date_to,
+            min_downgraded=min_downgraded, max_downgraded=max_downgraded,
+        )
         result = [
             {
                 "id": r.id,
@@ -126,10 +171,8 @@ async def get_all_reports_controller():
                 "timestamp": str(getattr(r, "timestamp", ""))
             } for r in reports
         ]
-        return {"reports": result}
+        return {"reports": result, "next_cursor": next_cursor}
+    except InvalidCursor as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         return {"error": str(e)}
-    finally:
-        session.close()
-
-
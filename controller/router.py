@@ -1,38 +1,139 @@
-from fastapi import APIRouter, UploadFile, File
-from controller.file_controller import upload_file_controller, get_all_files_controller, get_file
+import datetime
+from typing import List, Optional
+from fastapi import APIRouter, UploadFile, File, BackgroundTasks, Request, Depends, Query
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession
+from db import get_db, pool_stats
+from model.pagination import DEFAULT_LIMIT, MAX_LIMIT
+from controller.file_controller import upload_file_controller, upload_bulk_controller, upload_mixed_controller, get_all_files_controller, get_file, get_frame_cache_stats_controller
+from controller.upload_session_controller import (
+    create_upload_session_controller, get_upload_session_controller, upload_chunk_controller,
+    complete_upload_session_controller, abort_upload_session_controller,
+)
 from controller.report_controller import get_report_controller, generate_report_controller, get_all_reports_controller
+from controller.analytics_controller import get_portfolio_summary_controller, get_feature_importances_controller, get_rollups_controller, get_shap_importances_controller
+from model.summary_model import PortfolioSummary
 
 files_router = APIRouter(prefix="/files", tags=["Files"])
 reports_router = APIRouter(prefix="/reports", tags=["Reports"])
+db_router = APIRouter(prefix="/db", tags=["Database"])
+analytics_router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+# Sesiunea DB vine din get_db: una per request, închisă la final (conexiunea revine în pool)
 
 # Files routes
+# ?skip_duplicates=true: rândurile deja încărcate (indexul transaction_keys) nu se stochează
 @files_router.post("/upload")
-async def upload_file(file: UploadFile = File(...)):
-    return await upload_file_controller(file)
+async def upload_file(background_tasks: BackgroundTasks, file: UploadFile = File(...), skip_duplicates: bool = False,
+                      db: AsyncSession = Depends(get_db)):
+    return await upload_file_controller(file, db, background_tasks, skip_duplicates)
+
+@files_router.post("/upload/bulk")
+async def upload_bulk(background_tasks: BackgroundTasks, files: List[UploadFile] = File(...), skip_duplicates: bool = False,
+                      db: AsyncSession = Depends(get_db)):
+    return await upload_bulk_controller(files, db, background_tasks, skip_duplicates)
+
+@files_router.post("/upload/mixed")
+async def upload_mixed(background_tasks: BackgroundTasks, file: UploadFile = File(...), skip_duplicates: bool = False,
+                       db: AsyncSession = Depends(get_db)):
+    return await upload_mixed_controller(file, db, background_tasks, skip_duplicates)
+
+# Upload reluabil: POST sesiune, PATCH bucăți la offset, POST complete
+class UploadSessionIn(BaseModel):
+    filename: str
+    size: Optional[int] = None
+
+@files_router.post("/uploads")
+async def create_upload_session(body: UploadSessionIn):
+    return await create_upload_session_controller(body.filename, body.size)
+
+@files_router.get("/uploads/{upload_id}")
+async def get_upload_session(upload_id: str):
+    return await get_upload_session_controller(upload_id)
+
+@files_router.patch("/uploads/{upload_id}")
+async def upload_chunk(upload_id: str, request: Request, offset: Optional[int] = None):
+    return await upload_chunk_controller(upload_id, request, offset)
+
+@files_router.post("/uploads/{upload_id}/complete")
+async def complete_upload_session(upload_id: str, background_tasks: BackgroundTasks, skip_duplicates: bool = False,
+                                  db: AsyncSession = Depends(get_db)):
+    return await complete_upload_session_controller(upload_id, db, background_tasks, skip_duplicates)
 
+@files_router.delete("/uploads/{upload_id}")
+async def abort_upload_session(upload_id: str):
+    return await abort_upload_session_controller(upload_id)
+
+# Listări paginate keyset: ?limit=&cursor=<next_cursor>; intervalul de date e [date_from, date_to)
 @files_router.get("/all")
-async def get_all_files():
-    return await get_all_files_controller()
+async def get_all_files(limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT), cursor: Optional[str] = None,
+                        brand: Optional[str] = None, date_from: Optional[datetime.datetime] = None,
+                        date_to: Optional[datetime.datetime] = None, min_downgraded: Optional[int] = None,
+                        max_downgraded: Optional[int] = None, db: AsyncSession = Depends(get_db)):
+    return await get_all_files_controller(db, limit, cursor, brand, date_from, date_to, min_downgraded, max_downgraded)
+
+@files_router.get("/cache/stats")
+async def get_frame_cache_stats():
+    return await get_frame_cache_stats_controller()
 
 @files_router.get("/{file_id}")
-async def get_file_route(file_id: str):
-    return await get_file(file_id)
+async def get_file_route(file_id: str, db: AsyncSession = Depends(get_db)):
+    return await get_file(file_id, db)
 
 # Reports routes
+@reports_router.get("")
 @reports_router.get("/all")
-async def get_all_reports():
-    return await get_all_reports_controller()
+async def get_all_reports(limit: int = Query(DEFAULT_LIMIT, ge=1, le=MAX_LIMIT), cursor: Optional[str] = None,
+                          source_file: Optional[str] = None, brand: Optional[str] = None,
+                          date_from: Optional[datetime.datetime] = None, date_to: Optional[datetime.datetime] = None,
+                          min_downgraded: Optional[int] = None, max_downgraded: Optional[int] = None,
+                          db: AsyncSession = Depends(get_db)):
+    return await get_all_reports_controller(db, limit, cursor, source_file, brand, date_from, date_to,
+                                            min_downgraded, max_downgraded)
 
 @reports_router.get("/{report_id}")
-async def get_report(report_id):
-    return await get_report_controller(report_id)
+async def get_report(report_id, request: Request):
+    return await get_report_controller(report_id, request.headers.get("accept-encoding"))
 
 @reports_router.post("/generate/{source_id}")
-async def generate_report(source_id: str):
-    return await generate_report_controller(source_id)
+async def generate_report(source_id: str, db: AsyncSession = Depends(get_db)):
+    return await generate_report_controller(source_id, db)
+
+# Pool-ul de conexiuni: în uz, inactive, overflow, așteptare la checkout
+@db_router.get("/pool")
+async def get_pool_stats():
+    return pool_stats()
+
+# Analytics: agregate de portofoliu din tabelele de sumar materializate
+@analytics_router.get("/summary")
+async def get_portfolio_summary(dimension: str = "brand", brand: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    return await get_portfolio_summary_controller(db, dimension, brand)
+
+@analytics_router.get("/features")
+async def get_feature_importances(brand: Optional[str] = None, db: AsyncSession = Depends(get_db)):
+    return await get_feature_importances_controller(db, brand)
+
+# Importanță SHAP combinată pentru orice set de rapoarte (?report_id= repetabil sau filtre)
+@analytics_router.get("/shap")
+async def get_shap_importances(report_id: Optional[List[str]] = Query(None), brand: Optional[str] = None,
+                               date_from: Optional[datetime.datetime] = None,
+                               date_to: Optional[datetime.datetime] = None, merchant: Optional[str] = None,
+                               latest_only: bool = True, db: AsyncSession = Depends(get_db)):
+    return await get_shap_importances_controller(db, report_id, brand, date_from, date_to, merchant, latest_only)
+
+# Rollup-uri zilnice (zi x comerciant x brand); intervalul de zile e [date_from, date_to)
+@analytics_router.get("/rollups")
+async def get_rollups(group_by: str = "cell", date_from: Optional[datetime.date] = None,
+                      date_to: Optional[datetime.date] = None, merchant: Optional[str] = None,
+                      brand: Optional[str] = None,
+                      limit: int = Query(1000, ge=1, le=PortfolioSummary.ROLLUP_MAX_LIMIT),
+                      db: AsyncSession = Depends(get_db)):
+    return await get_rollups_controller(db, group_by, date_from, date_to, merchant, brand, limit)
 
 # Include routers in main router
 from fastapi import APIRouter
 router = APIRouter()
 router.include_router(files_router)
-router.include_router(reports_router)
\ No newline at end of file
+router.include_router(reports_router)
+router.include_router(db_router)
+router.include_router(analytics_router)
\ No newline at end of file
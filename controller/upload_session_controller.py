@@ -0,0 +1,289 @@
+import fcntl
+import json
+import os
+import re
+import time
+import uuid
+from contextlib import contextmanager
+from typing import List, Optional
+
+from fastapi import BackgroundTasks, HTTPException, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+
+from controller.file_controller import UPLOAD_DIR, UPLOAD_CHUNK_BYTES, validate_file, store_upload
+
+# Upload reluabil: sesiune -> PATCH bucăți la offset -> complete.
+# Fiecare sesiune are în files/.uploads/:
+#   <id>.part   fișierul țintă; bucățile se scriu direct la offsetul lor (pwrite)
+#   <id>.json   indexul: nume, mărime declarată, intervalele [start, end) primite
+#   <id>.lock   flock pe sesiune, doar pentru actualizarea indexului
+# Pe <id>.part, PATCH-urile țin flock partajat cât scriu, iar complete/abort îl iau exclusiv:
+# o bucată începută cât sesiunea era "open" se termină înainte ca fișierul să fie validat sau șters.
+# Sesiunile nu împart nimic, deci PATCH-urile pe sesiuni diferite merg în paralel.
+# Sesiunile neatinse de UPLOAD_SESSION_TTL secunde sunt șterse (la crearea altor sesiuni).
+
+SESSIONS_DIR = os.path.join(UPLOAD_DIR, ".uploads")
+SESSION_TTL = int(os.getenv("UPLOAD_SESSION_TTL", str(24 * 3600)))
+SWEEP_INTERVAL = 600
+_ID_RE = re.compile(r"^[0-9a-f]{32}$")
+_last_sweep = 0.0
+
+
+def _paths(upload_id: str):
+    if not _ID_RE.match(upload_id or ""):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    base = os.path.join(SESSIONS_DIR, upload_id)
+    return base + ".part", base + ".json", base + ".lock"
+
+
+@contextmanager
+def _part_locked(upload_id: str, mode: int):
+    """flock pe fișierul țintă: LOCK_SH pentru scrieri, LOCK_EX pentru complete/abort/curățare."""
+    part, _, _ = _paths(upload_id)
+    try:
+        fd = os.open(part, os.O_WRONLY)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    try:
+        fcntl.flock(fd, mode)
+        yield fd
+    finally:
+        os.close(fd)    # eliberează și flock-ul
+
+
+@contextmanager
+def _locked(upload_id: str):
+    """Blochează indexul sesiunii (și între workerii uvicorn); întoarce meta curentă."""
+    part, meta_path, lock_path = _paths(upload_id)
+    if not os.path.exists(meta_path):
+        raise HTTPException(status_code=404, detail="Upload session not found")
+    with open(lock_path, "a") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            try:
+                with open(meta_path) as f:
+                    meta = json.load(f)
+            except FileNotFoundError:
+                raise HTTPException(status_code=404, detail="Upload session not found")
+            yield meta
+        finally:
+            fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def _save(upload_id: str, meta: dict) -> None:
+    _, meta_path, _ = _paths(upload_id)
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+
+def _merge(ranges: List[List[int]], start: int, end: int) -> List[List[int]]:
+    out = []
+    for s, e in sorted(ranges + [[start, end]]):
+        if out and s <= out[-1][1]:
+            out[-1][1] = max(out[-1][1], e)
+        else:
+            out.append([s, e])
+    return out
+
+
+def _missing(ranges: List[List[int]], size: Optional[int]) -> List[List[int]]:
+    gaps, pos = [], 0
+    for s, e in ranges:
+        if s > pos:
+            gaps.append([pos, s])
+        pos = max(pos, e)
+    if size is not None and pos < size:
+        gaps.append([pos, size])
+    return gaps
+
+
+def _status(upload_id: str, meta: dict) -> dict:
+    ranges = meta["ranges"]
+    return {
+        "upload_id": upload_id,
+        "filename": meta["filename"],
+        "size": meta["size"],
+        "state": meta["state"],
+        "received_bytes": sum(e - s for s, e in ranges),
+        "ranges": ranges,
+        "missing": _missing(ranges, meta["size"]),
+        # de unde reia un client secvențial
+        "offset": ranges[0][1] if ranges and ranges[0][0] == 0 else 0,
+    }
+
+
+def _remove_session(upload_id: str) -> None:
+    for path in _paths(upload_id):
+        if os.path.exists(path):
+            os.remove(path)
+
+
+def _sweep_expired() -> int:
+    """Șterge sesiunile deschise neatinse de SESSION_TTL secunde și .part-urile fără index."""
+    now, removed = time.time(), 0
+    try:
+        names = os.listdir(SESSIONS_DIR)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        upload_id, ext = os.path.splitext(name)
+        if ext not in (".json", ".part") or not _ID_RE.match(upload_id):
+            continue
+        part, meta_path, _ = _paths(upload_id)
+        try:
+            mtimes = [os.path.getmtime(p) for p in (part, meta_path) if os.path.exists(p)]
+            if now - max(mtimes, default=now) < SESSION_TTL:
+                continue
+            # non-blocant: o sesiune la care se scrie chiar acum nu e abandonată; una rămasă
+            # "finalizing" mai vechi decât TTL e a unui complete întrerupt (worker oprit)
+            with _part_locked(upload_id, fcntl.LOCK_EX | fcntl.LOCK_NB):
+                _remove_session(upload_id)
+            removed += 1
+        except (HTTPException, OSError):
+            continue    # ocupată sau ștearsă între timp
+    return removed
+
+
+async def create_upload_session_controller(filename: str, size: Optional[int] = None):
+    global _last_sweep
+    if not filename:
+        raise HTTPException(status_code=400, detail="filename is required")
+    if size is not None and size < 0:
+        raise HTTPException(status_code=400, detail="size must be >= 0")
+    os.makedirs(SESSIONS_DIR, exist_ok=True)
+    if time.time() - _last_sweep >= SWEEP_INTERVAL:
+        _last_sweep = time.time()
+        await run_in_threadpool(_sweep_expired)
+    upload_id = uuid.uuid4().hex
+    part, _, _ = _paths(upload_id)
+    with open(part, "wb") as f:
+        if size:
+            f.truncate(size)   # fișier rar, de mărimea finală
+    meta = {"filename": filename, "size": size, "ranges": [], "state": "open", "created": time.time()}
+    _save(upload_id, meta)
+    return _status(upload_id, meta)
+
+
+async def get_upload_session_controller(upload_id: str):
+    def _get():
+        with _locked(upload_id) as meta:
+            return _status(upload_id, meta)
+    return await run_in_threadpool(_get)
+
+
+def _pwrite_all(fd: int, data: bytes, pos: int) -> None:
+    view = memoryview(data)
+    while view:
+        n = os.pwrite(fd, view, pos)
+        view, pos = view[n:], pos + n
+
+
+async def upload_chunk_controller(upload_id: str, request: Request, offset: Optional[int] = None):
+    """Scrie corpul cererii în fișierul țintă începând de la `offset` (query sau Upload-Offset)."""
+    part, _, _ = _paths(upload_id)
+    if offset is None:
+        header = request.headers.get("upload-offset")
+        if header is None or not header.isdigit():
+            raise HTTPException(status_code=400, detail="offset (query) or Upload-Offset header is required")
+        offset = int(header)
+    if offset < 0:
+        raise HTTPException(status_code=400, detail="offset must be >= 0")
+
+    # flock partajat pe .part cât durează scrierea: complete/abort (exclusiv) așteaptă bucățile
+    # începute, iar o bucată începută după ele vede starea nouă și e refuzată
+    def _open_shared():
+        try:
+            fd = os.open(part, os.O_WRONLY)
+        except FileNotFoundError:
+            raise HTTPException(status_code=404, detail="Upload session not found")
+        try:
+            fcntl.flock(fd, fcntl.LOCK_SH)
+            with _locked(upload_id) as meta:
+                if meta["state"] != "open":
+                    raise HTTPException(status_code=409, detail=f"Upload session is {meta['state']}")
+                return fd, meta["size"]
+        except BaseException:
+            os.close(fd)
+            raise
+
+    fd, size = await run_in_threadpool(_open_shared)
+    try:
+        length = request.headers.get("content-length")
+        if size is not None and length is not None and length.isdigit() and offset + int(length) > size:
+            raise HTTPException(status_code=400, detail=f"Chunk ends past the declared size ({size} bytes)")
+
+        # Corpul nu se ține în memorie: se adună bucăți de UPLOAD_CHUNK_BYTES și se scriu la locul lor
+        pos, buf = offset, bytearray()
+        async for piece in request.stream():
+            buf += piece
+            if size is not None and pos + len(buf) > size:
+                raise HTTPException(status_code=400, detail=f"Chunk ends past the declared size ({size} bytes)")
+            if len(buf) >= UPLOAD_CHUNK_BYTES:
+                await run_in_threadpool(_pwrite_all, fd, bytes(buf), pos)
+                pos += len(buf)
+                buf = bytearray()
+        if buf:
+            await run_in_threadpool(_pwrite_all, fd, bytes(buf), pos)
+            pos += len(buf)
+
+        # Doar ce s-a scris integral intră în index; o bucată întreruptă se retrimite de la același offset
+        def _record():
+            with _locked(upload_id) as meta:
+                if pos > offset:
+                    meta["ranges"] = _merge(meta["ranges"], offset, pos)
+                    _save(upload_id, meta)
+                return _status(upload_id, meta)
+        return await run_in_threadpool(_record)
+    finally:
+        os.close(fd)    # eliberează și flock-ul
+
+
+async def complete_upload_session_controller(upload_id: str, session: AsyncSession,
+                                             background_tasks: Optional[BackgroundTasks] = None,
+                                             skip_duplicates: bool = False):
+    """Verifică acoperirea, validează fișierul asamblat (brand, schemă) și creează rândul File."""
+    part, meta_path, lock_path = _paths(upload_id)
+
+    def _claim():
+        with _part_locked(upload_id, fcntl.LOCK_EX), _locked(upload_id) as meta:
+            if meta["state"] != "open":
+                raise HTTPException(status_code=409, detail=f"Upload session is {meta['state']}")
+            ranges = meta["ranges"]
+            size = meta["size"] if meta["size"] is not None else (ranges[-1][1] if ranges else 0)
+            gaps = _missing(ranges, size)
+            if gaps or not ranges:
+                raise HTTPException(status_code=409, detail={"message": "Upload is incomplete", "missing": gaps})
+            meta["state"] = "finalizing"
+            _save(upload_id, meta)
+            return meta
+
+    meta = await run_in_threadpool(_claim)
+    try:
+        brand, validation = await run_in_threadpool(validate_file, part)
+        result = await store_upload(session, part, meta["filename"], brand, validation, background_tasks,
+                                    skip_duplicates)
+    except Exception:
+        # sesiunea rămâne reluabilă (ex. header greșit -> se poate rescrie începutul)
+        def _reopen():
+            with _locked(upload_id) as current:
+                current["state"] = "open"
+                _save(upload_id, current)
+        await run_in_threadpool(_reopen)
+        raise
+    for path in (meta_path, lock_path):
+        if os.path.exists(path):
+            os.remove(path)
+    return result
+
+
+async def abort_upload_session_controller(upload_id: str):
+    def _abort():
+        with _part_locked(upload_id, fcntl.LOCK_EX), _locked(upload_id) as meta:
+            if meta["state"] == "finalizing":
+                raise HTTPException(status_code=409, detail="Upload session is finalizing")
+            _remove_session(upload_id)
+    await run_in_threadpool(_abort)
+    return {"message": "Upload session deleted", "upload_id": upload_id}
@@ -1,6 +1,159 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import os
+import threading
+import time
 
-DATABASE_URL = "mysql+pymysql://smartuser:smartpass@db:3306/smartpay"
-engine = create_engine(DATABASE_URL)
-SessionLocal = sessionmaker(bind=engine)
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, StaticPool
+
+# Driver async pentru fiecare driver sync acceptat în DATABASE_URL
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+}
+
+
+def _database_url() -> str:
+    # DATABASE_URL are prioritate (ex. sqlite:///./smartpay.db local); altfel MySQL din MYSQL_*
+    url = os.getenv("DATABASE_URL")
+    if url:
+        scheme, sep, rest = url.partition("://")
+        return ASYNC_DRIVERS.get(scheme, scheme) + sep + rest
+    return "mysql+aiomysql://{user}:{password}@{host}:{port}/{name}".format(
+        user=os.getenv("MYSQL_USER", "smartuser"),
+        password=os.getenv("MYSQL_PASSWORD", "smartpass"),
+        host=os.getenv("MYSQL_HOST", "db"),
+        port=os.getenv("MYSQL_PORT", "3306"),
+        name=os.getenv("MYSQL_DATABASE", "smartpay"),
+    )
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    return os.getenv(name, str(default)).strip().lower() in ("1", "true", "yes", "on")
+
+
+class _PoolStats:
+    """Gauge-uri pentru pool: conexiuni în uz și timpul de așteptare la checkout."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.waits = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self.timeouts = 0
+
+    def record(self, seconds: float, timed_out: bool = False) -> None:
+        with self._lock:
+            self.waits += 1
+            self.wait_seconds_total += seconds
+            self.wait_seconds_max = max(self.wait_seconds_max, seconds)
+            if timed_out:
+                self.timeouts += 1
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.waits,
+                "checkout_wait_seconds_total": round(self.wait_seconds_total, 6),
+                "checkout_wait_seconds_max": round(self.wait_seconds_max, 6),
+                "checkout_wait_seconds_avg": round(self.wait_seconds_total / self.waits, 6) if self.waits else 0.0,
+                "checkout_timeouts": self.timeouts,
+            }
+
+
+POOL_STATS = _PoolStats()
+
+
+class TimedQueuePool(AsyncAdaptedQueuePool):
+    """QueuePool care măsoară cât așteaptă fiecare checkout după o conexiune liberă."""
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            conn = super()._do_get()
+        except Exception:
+            POOL_STATS.record(time.perf_counter() - start, timed_out=True)
+            raise
+        POOL_STATS.record(time.perf_counter() - start)
+        return conn
+
+
+DATABASE_URL = _database_url()
+
+if DATABASE_URL.startswith("sqlite"):
+    # SQLite local / teste (aiosqlite); în memorie toate sesiunile văd aceeași conexiune
+    _memory = DATABASE_URL.endswith("://") or DATABASE_URL.endswith(":memory:")
+    engine = create_async_engine(
+        DATABASE_URL,
+        connect_args={"check_same_thread": False},
+        **({"poolclass": StaticPool} if _memory else {"poolclass": TimedQueuePool}),
+    )
+
+    # driverul sqlite nu emite BEGIN înainte de primul SAVEPOINT, iar un SAVEPOINT în afara
+    # unei tranzacții se confirmă la RELEASE; BEGIN explicit face begin_nested() ca pe MySQL
+    @event.listens_for(engine.sync_engine, "connect")
+    def _sqlite_connect(dbapi_conn, record):
+        dbapi_conn.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def _sqlite_begin(conn):
+        conn.exec_driver_sql("BEGIN")
+else:
+    engine = create_async_engine(
+        DATABASE_URL,
+        poolclass=TimedQueuePool,
+        pool_size=int(os.getenv("DB_POOL_SIZE", "10")),
+        max_overflow=int(os.getenv("DB_MAX_OVERFLOW", "20")),
+        pool_timeout=float(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),   # sub wait_timeout-ul MySQL
+        pool_pre_ping=_env_bool("DB_POOL_PRE_PING", True),
+    )
+
+# expire_on_commit=False: atributele rămân încărcate după commit (fără lazy-load implicit, interzis în async)
+SessionLocal = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+_in_use = 0
+_in_use_max = 0
+_in_use_lock = threading.Lock()
+
+
+@event.listens_for(engine.sync_engine, "checkout")
+def _on_checkout(dbapi_conn, record, proxy):
+    global _in_use, _in_use_max
+    with _in_use_lock:
+        _in_use += 1
+        _in_use_max = max(_in_use_max, _in_use)
+
+
+@event.listens_for(engine.sync_engine, "checkin")
+def _on_checkin(dbapi_conn, record):
+    global _in_use
+    with _in_use_lock:
+        _in_use -= 1
+
+
+async def get_db():
+    """Dependency FastAPI: o sesiune async per request, închisă (conexiunea revine în pool) la final."""
+    async with SessionLocal() as session:
+        yield session
+
+
+def pool_stats() -> dict:
+    pool = engine.sync_engine.pool
+    stats = {
+        "pool": type(pool).__name__,
+        "in_use": _in_use,
+        "in_use_max": _in_use_max,
+        **POOL_STATS.snapshot(),
+    }
+    if isinstance(pool, AsyncAdaptedQueuePool):
+        stats.update({
+            "size": pool.size(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "max_overflow": pool._max_overflow,
+            "timeout": pool.timeout(),
+        })
+    return stats
@@ -0,0 +1,70 @@
+import hashlib
+import os
+from typing import List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.csv as pacsv
+
+from file_store import BrandSchema, csv_columns, read_csv_typed
+
+# Identitatea unei tranzacții: (brand, RRN/ARN, sumă, dată), coloanele din BrandSchema.identity.
+# Cheia persistată e blake2b pe 16 bytes: lățime fixă (PK BINARY(16) compact, la sute de
+# milioane de chei) și coliziuni neglijabile. Același lot încărcat de două ori dă aceleași chei.
+
+KEY_BYTES = 16
+MAX_SAMPLES = 20
+
+
+def _amount_text(col: pd.Series) -> pd.Series:
+    """Suma normalizată (rotunjită la 4 zecimale); o valoare nenumerică rămâne textul din fișier.
+
+    Citirea tipizată revine la object când o sumă e invalidă: rândul e raportat de validare,
+    dar fișierul se stochează, deci cheile nu au voie să eșueze pe el.
+    """
+    num = pd.to_numeric(col, errors="coerce")
+    text = num.round(4).astype("string")
+    raw = col.astype("string").str.strip()
+    return text.where(num.notna(), raw).fillna("")
+
+
+def transaction_keys(path: str, schema: Optional[BrandSchema]) -> Optional[List[Optional[bytes]]]:
+    """Cheia fiecărui rând (None = rând fără referință); None dacă fișierul nu are coloanele de identitate."""
+    if schema is None or not schema.identity:
+        return None
+    reference, amount, date = schema.identity
+    if reference not in set(csv_columns(path)):
+        return None
+    df = read_csv_typed(path, schema.brand, columns=list(schema.identity))
+    ref = df[reference].astype("string").str.strip()
+    amt = _amount_text(df[amount]) if amount in df.columns else ""
+    day = df[date].astype("string").str.strip().fillna("") if date in df.columns else ""
+    text = (schema.brand + "|" + ref.fillna("") + "|" + amt + "|" + day)
+    valid = ref.notna() & (ref != "")
+    return [
+        hashlib.blake2b(t.encode("utf-8"), digest_size=KEY_BYTES).digest() if ok else None
+        for t, ok in zip(text.tolist(), valid.tolist())
+    ]
+
+
+def write_without_rows(src: str, dst: str, drop: List[int]) -> int:
+    """Copiază CSV-ul fără rândurile `drop` (indici de date, 0 = primul rând după header).
+
+    Toate coloanele se citesc ca text, deci valorile rămân exact cele din fișier.
+    Întoarce numărul de rânduri scrise.
+    """
+    header = csv_columns(src)
+    table = pacsv.read_csv(
+        src,
+        read_options=pacsv.ReadOptions(use_threads=True),
+        convert_options=pacsv.ConvertOptions(column_types={c: pa.string() for c in header},
+                                             strings_can_be_null=False),
+    )
+    keep = [True] * table.num_rows
+    for i in drop:
+        keep[i] = False
+    out = table.filter(pa.array(keep))
+    tmp = dst + ".tmp"
+    pacsv.write_csv(out, tmp, write_options=pacsv.WriteOptions(quoting_style="needed"))
+    os.replace(tmp, dst)
+    return out.num_rows
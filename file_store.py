@@ -0,0 +1,42 @@
+import os
+import sys
+from typing import Optional
+
+# registrul de scheme + citirea tipizată sunt comune cu compliance_service
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "compliance_service", "src"))
+from compliance.ingest import SCHEMAS, MASTERCARD, VISA, BrandSchema, get_schema, detect_brand, csv_columns, read_csv_typed  # noqa: E402
+from compliance.storage import ShardedStore  # noqa: E402,F401
+from compliance.compression import resolve as resolve_codec  # noqa: E402
+# citirea din sidecar și cache-ul de cadre: o singură implementare, comună cu serviciul
+from compliance.sidecar import (  # noqa: E402,F401
+    FRAMES, FrameCache, available_columns, content_hash, load_transactions, read_transactions, sidecar_path,
+)
+
+# upload-uri și rapoarte în subdirectoare de fan-out calculate din id (compliance.storage),
+# comprimate (compliance.compression): CSV-urile cu zstd, rapoartele cu gzip, pe care orice
+# client HTTP îl acceptă, deci se trimit fără recomprimare
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+FILES = ShardedStore(os.getenv("FILES_DIR", os.path.join(BASE_DIR, "files")),
+                     codec=resolve_codec(os.getenv("FILES_COMPRESSION", "zstd")))
+REPORTS = ShardedStore(os.getenv("REPORTS_DIR", os.path.join(BASE_DIR, "reports")),
+                       codec=resolve_codec(os.getenv("REPORTS_COMPRESSION", "gzip")))
+
+# Sidecar Parquet lângă fiecare upload: files/<id>.csv[.zst] -> files/<id>.parquet
+# Tipurile vin din schema brandului și se fixează o singură dată, la upload,
+# iar cititorii (compliance.sidecar) încarcă doar coloanele de care au nevoie.
+
+
+def write_sidecar(csv_path: str) -> Optional[str]:
+    """Convertește CSV-ul în Parquet (scriere atomică). La eroare cititorii folosesc CSV-ul."""
+    out = sidecar_path(csv_path)
+    tmp = out + ".tmp"
+    try:
+        df = read_csv_typed(csv_path)
+        df.to_parquet(tmp, engine="pyarrow", index=False, compression=FILES.codec or "snappy")
+        os.replace(tmp, out)
+        return out
+    except Exception as e:
+        print(f"Parquet sidecar failed for {csv_path}: {e}")
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        return None
@@ -2,7 +2,6 @@ import joblib
 import pandas as pd
 import shap
 import numpy as np
-import json
 from sklearn.inspection import permutation_importance
 
 
@@ -71,7 +70,7 @@ def generate_shap_explanations(model_path, file_only_features, file_source):
                     continue
                 impact = shap_df[col_matches].loc[mask].sum().sum()
                 shap_impact_list.append(
-                    {"feature": feat, "value": val_str, "shap_total": impact}
+                    {"feature": feat, "value": val_str, "shap_total": impact, "rows": int(mask.sum())}
                 )
         else:
             col_matches = [c for c in feature_names if c.endswith(feat)]
@@ -79,7 +78,7 @@ def generate_shap_explanations(model_path, file_only_features, file_source):
                 continue
             impact = shap_df[col_matches].sum().sum()
             shap_impact_list.append(
-                {"feature": feat, "value": "ALL", "shap_total": impact}
+                {"feature": feat, "value": "ALL", "shap_total": impact, "rows": len(X_test)}
             )
 
     # === Normalize SHAP values
@@ -288,14 +287,16 @@ def generate_shap_explanations(model_path, file_only_features, file_source):
             }
         )
 
+    # Raw (unnormalized) SHAP sums per feature value: additive across reports
+    shap_contributions = [
+        {"feature": r["feature"], "value": r["value"], "shap_sum": float(r["shap_total"]), "rows": r["rows"]}
+        for r in shap_impact_list
+    ]
+
     # Final output matches template
     output_json = {
-        "overall": {"features": overall_features},
+        "overall": {"features": overall_features, "shap_contributions": shap_contributions},
         "per_transaction": per_transaction_json,
     }
 
-    # save to file for inspection
-    with open("shap_explanations.json", "w") as f:
-        json.dump(output_json, f, indent=4)
-
     return output_json
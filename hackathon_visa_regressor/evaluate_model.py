@@ -2,7 +2,6 @@ import joblib
 import pandas as pd
 import shap
 import numpy as np
-import json
 from sklearn.inspection import permutation_importance
 
 
@@ -68,7 +67,7 @@ def generate_shap_explanations(model_path, x_file, full_file):
                         continue
                     impact = shap_df[col_matches].loc[mask].sum().sum()
                     shap_impact_list.append(
-                        {"feature": feat, "value": val_str, "shap_total": impact}
+                        {"feature": feat, "value": val_str, "shap_total": impact, "rows": int(mask.sum())}
                     )
             else:
                 col_matches = [c for c in feature_names if c.endswith(feat)]
@@ -76,7 +75,7 @@ def generate_shap_explanations(model_path, x_file, full_file):
                     continue
                 impact = shap_df[col_matches].sum().sum()
                 shap_impact_list.append(
-                    {"feature": feat, "value": "ALL", "shap_total": impact}
+                    {"feature": feat, "value": "ALL", "shap_total": impact, "rows": len(X_test)}
                 )
     except Exception as e:
         return False
@@ -185,7 +184,16 @@ def generate_shap_explanations(model_path, x_file, full_file):
     # Sort features by descending importance_normalized
     overall_features.sort(key=lambda x: x["importance_normalized"], reverse=True)
 
-    global_json = {"overall": {"features": overall_features}, "per_transaction": []}
+    # Raw (unnormalized) SHAP sums per feature value: additive across reports
+    shap_contributions = [
+        {"feature": r["feature"], "value": r["value"], "shap_sum": float(r["shap_total"]), "rows": r["rows"]}
+        for r in shap_impact_list
+    ]
+
+    global_json = {
+        "overall": {"features": overall_features, "shap_contributions": shap_contributions},
+        "per_transaction": [],
+    }
 
     # === PER TRANSACTION JSON
     shap_lookup_pct = {
@@ -273,7 +281,4 @@ def generate_shap_explanations(model_path, x_file, full_file):
         "per_transaction": per_txn_json.get("per_transaction", []),
     }
 
-    with open("shap_all_with_transactions.json", "w") as f:
-        json.dump(merged_json, f, indent=2)
-
     return merged_json
@@ -7,6 +7,10 @@ from sklearn.compose import ColumnTransformer
 from sklearn.pipeline import Pipeline
 from sklearn.metrics import mean_squared_error, mean_absolute_error, r2_score
 import joblib
+import os, sys
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "compliance_service", "src"))
+from compliance.ingest import read_csv_typed  # noqa: E402
 
 # === Config ===
 INPUT_CSV = "visa_transactions_final.csv"
@@ -27,7 +31,7 @@ FEATURES = [
 
 
 # === Load data ===
-df = pd.read_csv(INPUT_CSV)
+df = read_csv_typed(INPUT_CSV, "visa", FEATURES + [TARGET])
 df.columns = [c.strip().lower().replace(" ", "_") for c in df.columns]
 
 
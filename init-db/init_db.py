@@ -3,10 +3,31 @@ import os
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 import pymysql
-from sqlalchemy import create_engine
-from model.file_model import File
-from model.report_model import Report
-from model.base import Base
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import create_engine, inspect
+
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.abspath(__file__)), "alembic.ini")
+BASELINE_REVISION = "0001"
+
+
+def migrate(database_url):
+    """Aduce schema la ultima migrare; datele existente rămân.
+
+    O bază creată de versiunea veche (create_all, fără alembic_version) are deja
+    schema reviziei 0001: e marcată cu stamp, apoi primește doar migrările noi.
+    """
+    config = Config(ALEMBIC_INI)
+    config.attributes["url"] = database_url
+    engine = create_engine(database_url)
+    try:
+        tables = set(inspect(engine).get_table_names())
+    finally:
+        engine.dispose()
+    if "files" in tables and "alembic_version" not in tables:
+        print(f"[init-db] Existing schema without migration history, stamping {BASELINE_REVISION}.")
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
 
 def create_database_and_tables():
     db_host = os.getenv('MYSQL_HOST', 'db')
@@ -37,10 +58,8 @@ def create_database_and_tables():
     print(f"Database '{db_name}' ensured.")
 
     DATABASE_URL = f"mysql+pymysql://{db_user}:{db_password}@{db_host}:{db_port}/{db_name}"
-    engine = create_engine(DATABASE_URL, echo=True, future=True)
-    Base.metadata.drop_all(engine)
-    Base.metadata.create_all(engine)
-    print("File și Report tables ensured.")
+    migrate(DATABASE_URL)
+    print("File și Report tables migrated to head.")
 
 if __name__ == "__main__":
     create_database_and_tables()
@@ -0,0 +1,57 @@
+import os
+import sys
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+# model/ e lângă init-db/ în repo și în /init-db/model în imaginea Docker;
+# tabelele de sumar și findings (compliance.summary_tables, findings_tables) sunt în compliance_service/src, respectiv /init-db/compliance
+HERE = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(os.path.dirname(HERE))
+for path in (os.path.dirname(HERE), ROOT, os.path.join(ROOT, "compliance_service", "src")):
+    if path not in sys.path:
+        sys.path.append(path)
+
+from model.base import Base
+import model.file_model  # noqa: F401
+import model.report_model  # noqa: F401
+import model.transaction_key_model  # noqa: F401
+from compliance.summary_tables import METADATA as SUMMARY_METADATA
+import compliance.findings_tables  # noqa: F401  (tabelele de findings, pe același METADATA)
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("configure_logger", True):
+    fileConfig(config.config_file_name)
+
+target_metadata = [Base.metadata, SUMMARY_METADATA]
+
+
+def _url() -> str:
+    # init_db.py setează URL-ul explicit; la rulare manuală vine din DATABASE_URL (driver sync)
+    return config.attributes.get("url") or os.environ["DATABASE_URL"]
+
+
+def run_migrations_offline():
+    url = _url()
+    context.configure(url=url, target_metadata=target_metadata, literal_binds=True,
+                      render_as_batch=url.startswith("sqlite"))
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    engine = create_engine(_url(), poolclass=pool.NullPool)
+    with engine.connect() as connection:
+        # SQLite nu are ALTER complet: batch mode recreează tabela
+        context.configure(connection=connection, target_metadata=target_metadata,
+                          render_as_batch=connection.dialect.name == "sqlite")
+        with context.begin_transaction():
+            context.run_migrations()
+    engine.dispose()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
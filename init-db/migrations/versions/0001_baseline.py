@@ -0,0 +1,47 @@
+"""Schema de bază: files și reports, așa cum le crea create_all înainte de migrări.
+
+Bazele create de vechiul init_db.py (drop_all + create_all) sunt marcate cu această
+revizie (stamp) la prima rulare, apoi primesc doar migrările următoare.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "files",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("name", sa.String(255), nullable=False),
+        sa.Column("path", sa.String(255)),
+        sa.Column("timestamp", sa.DateTime),
+        sa.Column("downgraded_transaction", sa.Integer),
+        sa.Column("brand", sa.String(50)),
+        sa.Column("row_count", sa.Integer),
+        sa.Column("invalid_rows", sa.Integer),
+        sa.Column("validation", sa.Text),
+        sa.Column("parent_id", sa.String(36)),
+    )
+    op.create_index("ix_files_parent_id", "files", ["parent_id"])
+    op.create_table(
+        "reports",
+        sa.Column("id", sa.String(36), primary_key=True),
+        sa.Column("source_file", sa.String(36), sa.ForeignKey("files.id"), nullable=False),
+        sa.Column("path", sa.String(255)),
+        sa.Column("timestamp", sa.DateTime),
+        sa.Column("brand", sa.String(50)),
+    )
+
+
+def downgrade():
+    op.drop_table("reports")
+    op.drop_index("ix_files_parent_id", table_name="files")
+    op.drop_table("files")
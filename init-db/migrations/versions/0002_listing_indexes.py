@@ -0,0 +1,38 @@
+"""Indexuri pentru listările keyset și lookup-ul rapoartelor după fișierul sursă.
+
+(timestamp, id) servește ORDER BY timestamp DESC, id DESC și cursorul; varianta cu
+brand în față servește filtrul pe brand fără sortare separată. Pe reports,
+(source_file, timestamp, id) servește /reports?source_file= (pe MySQL înlocuiește
+și indexul creat implicit pentru cheia străină).
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from alembic import op
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ("ix_files_timestamp_id", "files", ["timestamp", "id"]),
+    ("ix_files_brand_timestamp_id", "files", ["brand", "timestamp", "id"]),
+    ("ix_reports_timestamp_id", "reports", ["timestamp", "id"]),
+    ("ix_reports_brand_timestamp_id", "reports", ["brand", "timestamp", "id"]),
+    ("ix_reports_source_file_timestamp_id", "reports", ["source_file", "timestamp", "id"]),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns)
+
+
+def downgrade():
+    if op.get_bind().dialect.name == "mysql":
+        # MySQL a renunțat la indexul implicit al FK-ului; fără unul, drop-ul de mai jos e refuzat
+        op.create_index("source_file", "reports", ["source_file"])
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
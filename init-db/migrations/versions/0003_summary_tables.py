@@ -0,0 +1,67 @@
+"""Tabelele de sumar materializate: per fișier, per dimensiune și importanțele feature-urilor.
+
+Scrise de generarea rapoartelor și de /api/compliance/check (compliance.summary_tables).
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def _metric_columns():
+    return [
+        sa.Column("brand", sa.String(50)),
+        sa.Column("row_count", sa.Integer, nullable=False),
+        sa.Column("downgraded", sa.Integer, nullable=False),
+        sa.Column("predicted_fee_sum", sa.Float, nullable=False),
+        sa.Column("actual_fee_sum", sa.Float, nullable=False),
+        sa.Column("downgrade_cost", sa.Float, nullable=False),
+        sa.Column("non_compliant", sa.Integer, nullable=False),
+        sa.Column("estimated_impact", sa.Float, nullable=False),
+        sa.Column("updated_at", sa.DateTime),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "file_summaries",
+        sa.Column("file_id", sa.String(36), primary_key=True),
+        sa.Column("source", sa.String(16), primary_key=True),
+        sa.Column("report_id", sa.String(36)),
+        sa.Column("ruleset_version", sa.String(64)),
+        *_metric_columns(),
+    )
+    op.create_table(
+        "file_dimension_summaries",
+        sa.Column("file_id", sa.String(36), primary_key=True),
+        sa.Column("source", sa.String(16), primary_key=True),
+        sa.Column("dimension", sa.String(32), primary_key=True),
+        sa.Column("value", sa.String(64), primary_key=True),
+        *_metric_columns(),
+    )
+    op.create_index("ix_file_dimension_summaries_dimension_value", "file_dimension_summaries",
+                    ["source", "dimension", "value"])
+    op.create_table(
+        "file_feature_importances",
+        sa.Column("file_id", sa.String(36), primary_key=True),
+        sa.Column("feature", sa.String(64), primary_key=True),
+        sa.Column("report_id", sa.String(36)),
+        sa.Column("brand", sa.String(50)),
+        sa.Column("importance", sa.Float, nullable=False),
+    )
+    op.create_index("ix_file_feature_importances_feature", "file_feature_importances", ["feature"])
+
+
+def downgrade():
+    op.drop_index("ix_file_feature_importances_feature", table_name="file_feature_importances")
+    op.drop_table("file_feature_importances")
+    op.drop_index("ix_file_dimension_summaries_dimension_value", table_name="file_dimension_summaries")
+    op.drop_table("file_dimension_summaries")
+    op.drop_table("file_summaries")
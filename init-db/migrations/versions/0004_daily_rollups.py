@@ -0,0 +1,55 @@
+"""Rollup-urile zilnice (zi x comerciant x brand) și contribuția fiecărui fișier la ele.
+
+Actualizate incremental de compliance.summary_tables.apply_rollups.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+
+def _rollup_columns():
+    return [
+        sa.Column("report_rows", sa.Integer, nullable=False),
+        sa.Column("downgraded", sa.Integer, nullable=False),
+        sa.Column("predicted_fee_sum", sa.Float, nullable=False),
+        sa.Column("actual_fee_sum", sa.Float, nullable=False),
+        sa.Column("downgrade_cost", sa.Float, nullable=False),
+        sa.Column("compliance_rows", sa.Integer, nullable=False),
+        sa.Column("non_compliant", sa.Integer, nullable=False),
+        sa.Column("estimated_impact", sa.Float, nullable=False),
+    ]
+
+
+def upgrade():
+    op.create_table(
+        "daily_merchant_rollups",
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("merchant", sa.String(64), primary_key=True),
+        sa.Column("brand", sa.String(50), primary_key=True),
+        *_rollup_columns(),
+        sa.Column("updated_at", sa.DateTime),
+    )
+    op.create_index("ix_daily_merchant_rollups_merchant_day", "daily_merchant_rollups", ["merchant", "day"])
+    op.create_table(
+        "rollup_contributions",
+        sa.Column("file_id", sa.String(36), primary_key=True),
+        sa.Column("source", sa.String(16), primary_key=True),
+        sa.Column("day", sa.Date, primary_key=True),
+        sa.Column("merchant", sa.String(64), primary_key=True),
+        sa.Column("brand", sa.String(50), primary_key=True),
+        *_rollup_columns(),
+    )
+
+
+def downgrade():
+    op.drop_table("rollup_contributions")
+    op.drop_index("ix_daily_merchant_rollups_merchant_day", table_name="daily_merchant_rollups")
+    op.drop_table("daily_merchant_rollups")
@@ -0,0 +1,36 @@
+"""Sumele SHAP brute per (raport, feature, valoare) și indexul pe comerciant al contribuțiilor la rollup-uri.
+
+Scrise la generarea rapoartelor (compliance.summary_tables.replace_report_shap).
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "report_shap_contributions",
+        sa.Column("report_id", sa.String(36), primary_key=True),
+        sa.Column("feature", sa.String(64), primary_key=True),
+        sa.Column("value", sa.String(64), primary_key=True),
+        sa.Column("file_id", sa.String(36), nullable=False),
+        sa.Column("brand", sa.String(50)),
+        sa.Column("shap_sum", sa.Float, nullable=False),
+        sa.Column("rows", sa.Integer, nullable=False),
+    )
+    op.create_index("ix_report_shap_contributions_file_id", "report_shap_contributions", ["file_id"])
+    op.create_index("ix_rollup_contributions_merchant_source", "rollup_contributions", ["merchant", "source"])
+
+
+def downgrade():
+    op.drop_index("ix_rollup_contributions_merchant_source", table_name="rollup_contributions")
+    op.drop_index("ix_report_shap_contributions_file_id", table_name="report_shap_contributions")
+    op.drop_table("report_shap_contributions")
@@ -0,0 +1,55 @@
+"""Findings-urile verificărilor de conformitate: per tranzacție, indexul inversat pe regulă și biții regulilor.
+
+Scrise de /api/compliance/check (compliance.findings_tables).
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0006"
+down_revision = "0005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "compliance_rule_bits",
+        sa.Column("rule_id", sa.String(64), primary_key=True),
+        sa.Column("bit", sa.Integer, nullable=False, unique=True),
+    )
+    op.create_table(
+        "compliance_findings",
+        sa.Column("file_id", sa.String(36), primary_key=True),
+        sa.Column("row_index", sa.Integer, primary_key=True),
+        sa.Column("transaction_id", sa.String(64)),
+        sa.Column("rule_mask", sa.BigInteger, nullable=False),
+        sa.Column("risk_level", sa.String(16), nullable=False),
+        sa.Column("impact", sa.Float, nullable=False),
+        sa.Column("ruleset_version", sa.String(64)),
+        sa.Column("checked_at", sa.DateTime, nullable=False),
+    )
+    op.create_index("ix_compliance_findings_risk_checked", "compliance_findings", ["risk_level", "checked_at"])
+    op.create_index("ix_compliance_findings_transaction_id", "compliance_findings", ["transaction_id"])
+    op.create_table(
+        "compliance_finding_rules",
+        sa.Column("file_id", sa.String(36), primary_key=True),
+        sa.Column("row_index", sa.Integer, primary_key=True),
+        sa.Column("rule_id", sa.String(64), primary_key=True),
+        sa.Column("risk_level", sa.String(16), nullable=False),
+        sa.Column("checked_at", sa.DateTime, nullable=False),
+    )
+    op.create_index("ix_compliance_finding_rules_rule_risk_checked", "compliance_finding_rules",
+                    ["rule_id", "risk_level", "checked_at"])
+
+
+def downgrade():
+    op.drop_index("ix_compliance_finding_rules_rule_risk_checked", table_name="compliance_finding_rules")
+    op.drop_table("compliance_finding_rules")
+    op.drop_index("ix_compliance_findings_transaction_id", table_name="compliance_findings")
+    op.drop_index("ix_compliance_findings_risk_checked", table_name="compliance_findings")
+    op.drop_table("compliance_findings")
+    op.drop_table("compliance_rule_bits")
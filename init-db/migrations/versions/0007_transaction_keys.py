@@ -0,0 +1,26 @@
+"""Indexul persistent al cheilor de tranzacție (RRN/ARN, sumă, dată) pentru deduplicarea între upload-uri.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "transaction_keys",
+        sa.Column("key", sa.BINARY(16), primary_key=True),
+        sa.Column("file_id", sa.String(36), nullable=False),
+        sa.Column("row_index", sa.Integer, nullable=False),
+    )
+
+
+def downgrade():
+    op.drop_table("transaction_keys")
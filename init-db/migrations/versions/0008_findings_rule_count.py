@@ -0,0 +1,45 @@
+"""Findings fără masca de biți: regulile unei tranzacții vin din compliance_finding_rules.
+
+compliance_findings.rule_mask (BIGINT, max. 63 de reguli distincte, biți nerefolosiți)
+devine rule_count; compliance_rule_bits dispare. Regulile existente rămân în tabela
+inversată, deci rule_count se recalculează din ea.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("compliance_findings") as batch:
+        batch.add_column(sa.Column("rule_count", sa.Integer, nullable=False, server_default="0"))
+    op.execute(
+        "UPDATE compliance_findings SET rule_count = ("
+        "SELECT COUNT(*) FROM compliance_finding_rules r "
+        "WHERE r.file_id = compliance_findings.file_id AND r.row_index = compliance_findings.row_index)"
+    )
+    with op.batch_alter_table("compliance_findings") as batch:
+        batch.alter_column("rule_count", server_default=None, existing_type=sa.Integer, existing_nullable=False)
+        batch.drop_column("rule_mask")
+    op.drop_table("compliance_rule_bits")
+
+
+def downgrade():
+    op.create_table(
+        "compliance_rule_bits",
+        sa.Column("rule_id", sa.String(64), primary_key=True),
+        sa.Column("bit", sa.Integer, nullable=False, unique=True),
+    )
+    # măștile nu se pot reconstrui (biții nu mai există): rândurile rămân cu mască 0
+    with op.batch_alter_table("compliance_findings") as batch:
+        batch.add_column(sa.Column("rule_mask", sa.BigInteger, nullable=False, server_default="0"))
+        batch.drop_column("rule_count")
+    with op.batch_alter_table("compliance_findings") as batch:
+        batch.alter_column("rule_mask", server_default=None, existing_type=sa.BigInteger, existing_nullable=False)
@@ -0,0 +1,33 @@
+"""files.timestamp și reports.timestamp devin NOT NULL.
+
+Fără NULL-uri, cursorul listării keyset e doar `ts <= c AND (ts < c OR id < c_id)`:
+un singur range scan pe ix_files_timestamp_id / ix_reports_timestamp_id, fără
+ramura `OR timestamp IS NULL`, pe care MySQL nu o poate combina cu range-ul.
+Rândurile vechi fără timestamp primesc 1970-01-01, deci rămân ultimele în listare.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+TABLES = ("files", "reports")
+
+
+def upgrade():
+    for table in TABLES:
+        op.execute(f"UPDATE {table} SET timestamp = '1970-01-01 00:00:00' WHERE timestamp IS NULL")
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column("timestamp", existing_type=sa.DateTime, nullable=False)
+
+
+def downgrade():
+    for table in TABLES:
+        with op.batch_alter_table(table) as batch:
+            batch.alter_column("timestamp", existing_type=sa.DateTime, nullable=True)
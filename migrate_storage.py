@@ -0,0 +1,44 @@
+"""Mută upload-urile și rapoartele din layout-ul plat în subdirectoarele de fan-out.
+
+    python migrate_storage.py              # files/ și reports/ (FILES_DIR / REPORTS_DIR)
+    python migrate_storage.py --dry-run    # doar numără ce s-ar muta
+    python migrate_storage.py --root /backup/files
+    python migrate_storage.py --compress   # în plus, comprimă fișierele necomprimate rămase
+                                           # (FILES_COMPRESSION / REPORTS_COMPRESSION)
+
+Sigur de rulat cu aplicația pornită: cititorii găsesc fișierul și în locul vechi,
+și în cel nou, iar fiecare mutare e un os.replace în același sistem de fișiere.
+Rularea repetată nu mai mută nimic.
+Comprimarea scrie <id>.csv.zst lângă <id>.csv și abia apoi șterge originalul;
+un cititor care tocmai a găsit originalul îl poate rata, deci rulați --compress
+când nu se generează rapoarte.
+"""
+import argparse
+
+from file_store import FILES, REPORTS, ShardedStore, resolve_codec
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Migrate flat files/ and reports/ into sharded subdirectories")
+    parser.add_argument("--root", action="append", help="Directory to migrate (repeatable; default: files/ and reports/)")
+    parser.add_argument("--dry-run", action="store_true", help="Only count the entries that would move")
+    parser.add_argument("--compress", action="store_true",
+                        help="Also compress stored .csv/.json files with the store's codec")
+    parser.add_argument("--codec", help="Codec for --root stores (zstd, gzip; default: FILES_COMPRESSION's)")
+    args = parser.parse_args()
+
+    stores = [ShardedStore(r, codec=resolve_codec(args.codec) if args.codec else FILES.codec) for r in args.root] \
+        if args.root else [FILES, REPORTS]
+    for store in stores:
+        result = store.migrate(dry_run=args.dry_run)
+        verb = "would move" if args.dry_run else "moved"
+        print(f"{store.root}: {verb} {result['moved']}, skipped {result['skipped']} (already sharded)")
+        if args.compress:
+            result = store.compress(dry_run=args.dry_run)
+            verb = "would compress" if args.dry_run else "compressed"
+            print(f"{store.root}: {verb} {result['compressed']} ({store.codec or 'no codec'}), "
+                  f"saved {result['bytes_saved']} bytes")
+
+
+if __name__ == "__main__":
+    main()
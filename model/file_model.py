@@ -1,7 +1,7 @@
 
-import json
 from model.base import Base
-from sqlalchemy import Column, String, DateTime, Integer
+from sqlalchemy import Column, String, DateTime, Integer, Text, Index, select
+from model.pagination import keyset_page, split_page
 import uuid
 
 
@@ -10,44 +10,84 @@ class File(Base):
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     name = Column(String(255), nullable=False)
     path = Column(String(255),default="tbd")           # ex: /files/<file_id>.csv
-    timestamp = Column(DateTime)
+    timestamp = Column(DateTime, nullable=False)
     downgraded_transaction = Column(Integer, default=0)  
     brand = Column(String(50), default="unknown")  # e.g., Visa, MasterCard, etc.
+    row_count = Column(Integer, default=0)
+    invalid_rows = Column(Integer, default=0)      # rânduri cu cel puțin o problemă la validarea din upload
+    validation = Column(Text)                      # JSON: probleme per coloană + exemple de erori
+    parent_id = Column(String(36), index=True)     # partițiile per brand ale unui upload mixt
 
-    def insert_file(self, session, brand):
+    # Indexurile listării keyset (timestamp desc, id desc); create prin migrarea 0002
+    __table_args__ = (
+        Index("ix_files_timestamp_id", "timestamp", "id"),
+        Index("ix_files_brand_timestamp_id", "brand", "timestamp", "id"),
+    )
+
+    # Metodele primesc un AsyncSession (db.get_db) și se apelează cu await
+    async def insert_file(self, session, brand):
         session.add(self)
-        session.commit()
-        session.refresh(self)
+        await session.commit()
+        await session.refresh(self)
         self.path = f"/files/{self.id}.csv"
         self.brand = brand
-        session.commit()
+        await session.commit()
         return self
 
-    def update_transaction(self, session, json_data):
+    @staticmethod
+    async def insert_files(session, files):
+        # upload în bloc: id-uri/căi setate dinainte, toate rândurile într-o singură tranzacție
+        session.add_all(files)
+        await session.commit()
+        return files
+
+    async def update_transaction(self, session, json_data):
         # Count how many transactions have downgrade == True or False
         count = sum(1 for tx in json_data.get("per_transaction", []) if tx.get("downgrade") is True)
         self.downgraded_transaction = count
-        session.commit()
-        session.refresh(self)
-        #save in  a file the json data as string and the count
-        with open(f"123333_transactions.json", "w") as f:
-            json.dump(json_data, f)
-            f.write(f"\nCount of downgraded transactions: {count}\n")
+        await session.commit()
+        await session.refresh(self)
+
 
+    @staticmethod
+    async def get_file(session, file_id):
+        return (await session.execute(select(File).filter_by(id=file_id))).scalars().first()
+
+    @staticmethod
+    async def get_partitions(session, parent_id):
+        return (await session.execute(select(File).filter_by(parent_id=parent_id))).scalars().all()
 
     @staticmethod
-    def get_file(session, file_id):
-        return session.query(File).filter_by(id=file_id).first()
+    async def get_files(session):
+        return (await session.execute(select(File))).scalars().all()
 
     @staticmethod
-    def get_files(session):
-        return session.query(File).all()
+    async def list_files(session, limit, cursor=None, brand=None, date_from=None, date_to=None,
+                         min_downgraded=None, max_downgraded=None):
+        """O pagină keyset, cea mai nouă întâi; întoarce (fișiere, next_cursor).
+
+        Cu brand se parcurge ix_files_brand_timestamp_id, altfel ix_files_timestamp_id;
+        filtrul pe numărul de downgrade-uri se aplică pe rândurile din scanarea ordonată.
+        """
+        stmt = select(File)
+        if brand:
+            stmt = stmt.where(File.brand == brand)
+        if date_from:
+            stmt = stmt.where(File.timestamp >= date_from)
+        if date_to:
+            stmt = stmt.where(File.timestamp < date_to)
+        if min_downgraded is not None:
+            stmt = stmt.where(File.downgraded_transaction >= min_downgraded)
+        if max_downgraded is not None:
+            stmt = stmt.where(File.downgraded_transaction <= max_downgraded)
+        stmt = keyset_page(stmt, File.timestamp, File.id, limit, cursor)
+        return split_page((await session.execute(stmt)).scalars().all(), limit)
 
     @staticmethod
-    def delete_file(session, file_id):
-        file = session.query(File).filter_by(id=file_id).first()
+    async def delete_file(session, file_id):
+        file = await File.get_file(session, file_id)
         if file:
-            session.delete(file)
-            session.commit()
+            await session.delete(file)
+            await session.commit()
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,56 @@
+import base64
+import datetime
+import json
+
+from sqlalchemy import or_
+
+# Paginare keyset pentru listări: ordinea e (timestamp desc, id desc), iar cursorul e
+# ultima pereche (timestamp, id) de pe pagina precedentă. Pagina următoare continuă
+# din index de la cursor, fără OFFSET: costul e același la pagina 1 și la pagina 10000.
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(timestamp, row_id) -> str:
+    raw = json.dumps([timestamp.isoformat() if timestamp else None, row_id])
+    return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str):
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        ts, row_id = json.loads(raw)
+        return (datetime.datetime.fromisoformat(ts) if ts else None), str(row_id)
+    except (ValueError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+
+def keyset_page(stmt, ts_col, id_col, limit: int, cursor: str = None):
+    """Aplică ordinea, cursorul și limita (+1, ca să știm dacă mai există o pagină).
+
+    Predicatul e scris ca `ts <= c AND (ts < c OR id < c_id)`: partea `ts <= c` dă un
+    range scan pe (…, timestamp, id); comparația pe tupluri nu e folosită de MySQL
+    pentru range. timestamp e NOT NULL (migrarea 0009), deci nu e nevoie de o ramură
+    `OR ts IS NULL`, care ar împiedica range scan-ul.
+    """
+    if cursor:
+        ts, row_id = decode_cursor(cursor)
+        if ts is None:
+            raise InvalidCursor("Invalid cursor")
+        stmt = stmt.where(ts_col <= ts, or_(ts_col < ts, id_col < row_id))
+    return stmt.order_by(ts_col.desc(), id_col.desc()).limit(limit + 1)
+
+
+def split_page(rows, limit: int):
+    """(rândurile paginii, next_cursor sau None)."""
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, encode_cursor(last.timestamp, last.id)
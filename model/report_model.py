@@ -1,6 +1,8 @@
 
 from model.base import Base
-from sqlalchemy import Column, String, DateTime, ForeignKey
+from sqlalchemy import Column, String, DateTime, ForeignKey, Index, select
+from model.file_model import File
+from model.pagination import keyset_page, split_page
 import uuid
 
 
@@ -9,32 +11,65 @@ class Report(Base):
     id = Column(String(36), primary_key=True, default=lambda: str(uuid.uuid4()))
     source_file = Column(String(36), ForeignKey("files.id"), nullable=False)
     path = Column(String(255),default="tbd")           # ex: /reports/<report_id>.csv
-    timestamp = Column(DateTime)
+    timestamp = Column(DateTime, nullable=False)
     brand = Column(String(50), default="unknown")  # e.g., Visa, MasterCard, etc.
 
-    def insert_report(self, session, brand):
+    # Listare keyset și lookup după fișierul sursă; create prin migrarea 0002
+    __table_args__ = (
+        Index("ix_reports_timestamp_id", "timestamp", "id"),
+        Index("ix_reports_brand_timestamp_id", "brand", "timestamp", "id"),
+        Index("ix_reports_source_file_timestamp_id", "source_file", "timestamp", "id"),
+    )
+
+    async def insert_report(self, session, brand):
         session.add(self)
-        session.commit()
-        session.refresh(self)
+        await session.commit()
+        await session.refresh(self)
         self.path = f"/reports/{self.id}.csv"
         self.brand = brand
-        session.commit()
+        await session.commit()
         return self
 
     @staticmethod
-    def get_report(session, report_id):
-        return session.query(Report).filter_by(id=report_id).first()
+    async def get_report(session, report_id):
+        return (await session.execute(select(Report).filter_by(id=report_id))).scalars().first()
+
+    @staticmethod
+    async def get_reports(session):
+        return (await session.execute(select(Report))).scalars().all()
 
     @staticmethod
-    def get_reports(session):
-        return session.query(Report).all()
+    async def list_reports(session, limit, cursor=None, source_file=None, brand=None, date_from=None, date_to=None,
+                           min_downgraded=None, max_downgraded=None):
+        """O pagină keyset, cel mai nou întâi; întoarce (rapoarte, next_cursor).
+
+        source_file e servit de ix_reports_source_file_timestamp_id (egalitate + ordinea
+        din index). Numărul de downgrade-uri e pe fișierul sursă: filtrul face join pe files.
+        """
+        stmt = select(Report)
+        if source_file:
+            stmt = stmt.where(Report.source_file == source_file)
+        if brand:
+            stmt = stmt.where(Report.brand == brand)
+        if date_from:
+            stmt = stmt.where(Report.timestamp >= date_from)
+        if date_to:
+            stmt = stmt.where(Report.timestamp < date_to)
+        if min_downgraded is not None or max_downgraded is not None:
+            stmt = stmt.join(File, File.id == Report.source_file)
+            if min_downgraded is not None:
+                stmt = stmt.where(File.downgraded_transaction >= min_downgraded)
+            if max_downgraded is not None:
+                stmt = stmt.where(File.downgraded_transaction <= max_downgraded)
+        stmt = keyset_page(stmt, Report.timestamp, Report.id, limit, cursor)
+        return split_page((await session.execute(stmt)).scalars().all(), limit)
 
     @staticmethod
-    def delete_report(session, report_id):
-        report = session.query(Report).filter_by(id=report_id).first()
+    async def delete_report(session, report_id):
+        report = await Report.get_report(session, report_id)
         if report:
-            session.delete(report)
-            session.commit()
+            await session.delete(report)
+            await session.commit()
             return True
         return False
     
\ No newline at end of file
@@ -0,0 +1,129 @@
+from sqlalchemy import case, func, select
+
+import file_store  # noqa: F401  (compliance_service/src în sys.path)
+from compliance.summary_tables import (
+    ROLLUP_METRICS, SOURCE_COMPLIANCE, SOURCE_REPORT, daily_merchant_rollups, file_dimension_summaries,
+    file_feature_importances, file_summaries, report_shap_contributions, rollup_contributions, write_summary,
+)
+from model.report_model import Report
+
+
+def _by_source(column, source):
+    return func.coalesce(func.sum(case((file_dimension_summaries.c.source == source, column), else_=0)), 0)
+
+
+class PortfolioSummary:
+    """Sumarele materializate per fișier (compliance.summary_tables) și agregatele de portofoliu peste ele."""
+
+    @staticmethod
+    async def write(session, file_id, source, summary, **extra):
+        # scrierea e Core sync, comună cu compliance_service; rulează pe conexiunea sesiunii
+        await session.run_sync(
+            lambda sync_session: write_summary(sync_session.connection(), file_id, source, summary, **extra)
+        )
+
+    @staticmethod
+    async def by_dimension(session, dimension, brand=None):
+        """Un rând per valoare a dimensiunii; metricile de raport și de conformitate se
+        însumează separat (un fișier are câte un rând din fiecare sursă)."""
+        t = file_dimension_summaries
+        stmt = (
+            select(
+                t.c.value,
+                _by_source(t.c.row_count, SOURCE_REPORT).label("report_rows"),
+                _by_source(t.c.downgraded, SOURCE_REPORT).label("downgraded"),
+                _by_source(t.c.predicted_fee_sum, SOURCE_REPORT).label("predicted_fee_sum"),
+                _by_source(t.c.actual_fee_sum, SOURCE_REPORT).label("actual_fee_sum"),
+                _by_source(t.c.downgrade_cost, SOURCE_REPORT).label("downgrade_cost"),
+                _by_source(t.c.row_count, SOURCE_COMPLIANCE).label("compliance_rows"),
+                _by_source(t.c.non_compliant, SOURCE_COMPLIANCE).label("non_compliant"),
+                _by_source(t.c.estimated_impact, SOURCE_COMPLIANCE).label("estimated_impact"),
+                func.count(func.distinct(t.c.file_id)).label("files"),
+            )
+            .where(t.c.dimension == dimension)
+            .group_by(t.c.value)
+            .order_by(t.c.value)
+        )
+        if brand:
+            stmt = stmt.where(t.c.brand == brand)
+        return (await session.execute(stmt)).mappings().all()
+
+    @staticmethod
+    async def feature_importances(session, brand=None):
+        """Importanța medie a fiecărui feature, ponderată cu numărul de rânduri al raportului."""
+        f, s = file_feature_importances, file_summaries
+        stmt = (
+            select(
+                f.c.feature,
+                (func.sum(f.c.importance * s.c.row_count) / func.nullif(func.sum(s.c.row_count), 0)).label("importance"),
+                func.count().label("files"),
+            )
+            .join(s, (s.c.file_id == f.c.file_id) & (s.c.source == SOURCE_REPORT))
+            .group_by(f.c.feature)
+            .order_by(f.c.feature)
+        )
+        if brand:
+            stmt = stmt.where(f.c.brand == brand)
+        return (await session.execute(stmt)).mappings().all()
+
+    ROLLUP_GROUPS = {"cell": ("day", "merchant", "brand"), "day": ("day",), "merchant": ("merchant", "brand")}
+    ROLLUP_MAX_LIMIT = 10000
+
+    @staticmethod
+    async def rollups(session, group_by="cell", date_from=None, date_to=None, merchant=None, brand=None,
+                      limit=1000):
+        """Intervale de zile [date_from, date_to) direct din daily_merchant_rollups, grupate pe
+        celulă (zi, comerciant, brand), pe zi sau pe comerciant. Intervalul pe zi folosește PK-ul,
+        filtrul pe comerciant indexul (merchant, day)."""
+        t = daily_merchant_rollups
+        keys = [t.c[k] for k in PortfolioSummary.ROLLUP_GROUPS[group_by]]
+        metrics = [func.sum(t.c[m]).label(m) for m in ROLLUP_METRICS]
+        stmt = select(*keys, *metrics).group_by(*keys).order_by(*keys).limit(limit)
+        if date_from:
+            stmt = stmt.where(t.c.day >= date_from)
+        if date_to:
+            stmt = stmt.where(t.c.day < date_to)
+        if merchant:
+            stmt = stmt.where(t.c.merchant == merchant)
+        if brand:
+            stmt = stmt.where(t.c.brand == brand)
+        return (await session.execute(stmt)).mappings().all()
+
+    @staticmethod
+    async def shap_contributions(session, report_ids=None, brand=None, date_from=None, date_to=None, merchant=None,
+                                 latest_only=True):
+        """Sumele SHAP brute ale unui set de rapoarte, adunate per (feature, valoare).
+
+        Fără report_ids, latest_only păstrează doar raportul curent al fișierului
+        (file_summaries.report_id), ca regenerările să nu fie numărate de două ori.
+        merchant selectează rapoartele fișierelor care au tranzacții ale comerciantului.
+        """
+        t = report_shap_contributions
+        stmt = (
+            select(
+                t.c.feature, t.c.value,
+                func.sum(t.c.shap_sum).label("shap_sum"),
+                func.sum(t.c.rows).label("rows"),
+                func.count(func.distinct(t.c.report_id)).label("reports"),
+            )
+            .group_by(t.c.feature, t.c.value)
+            .order_by(t.c.feature, t.c.value)
+        )
+        if report_ids:
+            stmt = stmt.where(t.c.report_id.in_(report_ids))
+        elif latest_only:
+            stmt = stmt.join(file_summaries, (file_summaries.c.report_id == t.c.report_id)
+                             & (file_summaries.c.source == SOURCE_REPORT))
+        if brand:
+            stmt = stmt.where(t.c.brand == brand)
+        if date_from or date_to:
+            stmt = stmt.join(Report, Report.id == t.c.report_id)
+            if date_from:
+                stmt = stmt.where(Report.timestamp >= date_from)
+            if date_to:
+                stmt = stmt.where(Report.timestamp < date_to)
+        if merchant:
+            r = rollup_contributions
+            stmt = stmt.where(t.c.file_id.in_(
+                select(r.c.file_id).where(r.c.merchant == merchant, r.c.source == SOURCE_REPORT)))
+        return (await session.execute(stmt)).mappings().all()
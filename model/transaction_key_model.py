@@ -0,0 +1,32 @@
+from model.base import Base
+from sqlalchemy import BINARY, Column, Integer, String, select
+
+LOOKUP_BATCH = 1000
+INSERT_BATCH = 5000
+
+
+class TransactionKey(Base):
+    """Indexul persistent al tranzacțiilor deja încărcate: cheia de identitate (dedup.py)
+    -> prima apariție (fișier, rând). Doar PK-ul pe 16 bytes, ca indexul să rămână mic."""
+    __tablename__ = "transaction_keys"
+    key = Column(BINARY(16), primary_key=True)
+    file_id = Column(String(36), nullable=False)
+    row_index = Column(Integer, nullable=False)
+
+    @staticmethod
+    async def find(session, keys):
+        """{cheie: (file_id, row_index)} pentru cheile deja indexate; lookup-uri pe PK în loturi."""
+        found = {}
+        keys = list(keys)
+        for start in range(0, len(keys), LOOKUP_BATCH):
+            stmt = select(TransactionKey.key, TransactionKey.file_id, TransactionKey.row_index) \
+                .where(TransactionKey.key.in_(keys[start:start + LOOKUP_BATCH]))
+            found.update((k, (f, r)) for k, f, r in (await session.execute(stmt)).all())
+        return found
+
+    @staticmethod
+    async def insert_keys(session, rows):
+        # în tranzacția sesiunii: se confirmă odată cu rândul File
+        table = TransactionKey.__table__
+        for start in range(0, len(rows), INSERT_BATCH):
+            await session.execute(table.insert(), rows[start:start + INSERT_BATCH])
@@ -0,0 +1,160 @@
+import csv
+import io
+from typing import Any, Dict, List, Optional
+
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pacsv
+
+from file_store import BrandSchema
+
+# Validare pe tot fișierul, în timp ce upload-ul curge: bucățile primite se taie la
+# ultimul '\n', iar blocul de rânduri complete e parsat de pyarrow (toate coloanele ca
+# text) și verificat vectorial după schema brandului: tip, valori permise, lipsuri.
+
+INT_RE = r"^\s*[+-]?\d+\s*$"
+FLOAT_RE = r"^\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?\s*$"
+BOOL_VALUES = ["True", "TRUE", "true", "False", "FALSE", "false", "1", "0"]
+TYPE_PATTERNS = {"int64": INT_RE, "float64": FLOAT_RE}
+
+MAX_ERRORS = 100          # câte exemple de erori întoarcem, în total
+MAX_ERRORS_PER_RULE = 5   # și per (coloană, regulă), ca să nu domine o singură problemă
+
+
+class UploadValidator:
+    def __init__(self, max_errors: int = MAX_ERRORS, max_errors_per_rule: int = MAX_ERRORS_PER_RULE):
+        self.max_errors = max_errors
+        self.max_errors_per_rule = max_errors_per_rule
+        self.header: Optional[List[str]] = None
+        self.schema: Optional[BrandSchema] = None
+        self.rows = 0
+        self.invalid_rows = 0
+        self.issues: Dict[str, Dict[str, int]] = {}
+        self.errors: List[Dict[str, Any]] = []
+        self._tail = b""
+        self._columns: List[str] = []
+
+    def start(self, schema: BrandSchema) -> None:
+        """Activează verificările după ce brandul a fost determinat din header."""
+        self.schema = schema
+        # doar coloanele cu ceva de verificat (textul liber fără domeniu nu se parsează)
+        self._columns = [
+            c for c in self.header
+            if schema.dtypes.get(c) in ("int64", "float64", "bool") or c in schema.domains or c in schema.not_null
+        ]
+        if self._tail:
+            self._flush(final=False)
+
+    def feed(self, chunk: bytes) -> None:
+        self._tail += chunk
+        if self.header is None:
+            nl = self._tail.find(b"\n")
+            if nl < 0:
+                return
+            line, self._tail = self._tail[:nl + 1], self._tail[nl + 1:]
+            self.header = next(csv.reader([line.decode("utf-8-sig").rstrip("\r\n")]))
+            return
+        if self.schema is not None:
+            self._flush(final=False)
+
+    def close(self) -> Dict[str, Any]:
+        if self.schema is not None:
+            self._flush(final=True)
+        return self.stats()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "invalid_rows": self.invalid_rows,
+            "issues": self.issues,
+            "errors": self.errors,
+            "errors_truncated": sum(sum(v.values()) for v in self.issues.values()) > len(self.errors),
+        }
+
+    # -------- intern --------
+    def _flush(self, final: bool) -> None:
+        cut = len(self._tail) if final else self._tail.rfind(b"\n") + 1
+        if cut <= 0:
+            return
+        block, self._tail = self._tail[:cut], self._tail[cut:]
+        if block.strip():
+            self._check(block)
+
+    def _record(self, column: str, rule: str, mask: pa.Array, values: pa.Array) -> None:
+        n = pc.sum(mask).as_py() or 0
+        if not n:
+            return
+        per_col = self.issues.setdefault(column, {})
+        seen = per_col.get(rule, 0)
+        per_col[rule] = seen + n
+        room = min(self.max_errors - len(self.errors), self.max_errors_per_rule - seen)
+        if room <= 0:
+            return
+        for i in pc.indices_nonzero(mask)[:room].to_pylist():
+            self.errors.append({
+                "row": self.rows + i + 2,   # 1-based, după header
+                "column": column,
+                "rule": rule,
+                "value": values[i].as_py(),
+            })
+
+    def _check(self, block: bytes) -> None:
+        try:
+            table = pacsv.read_csv(
+                io.BytesIO(block),
+                read_options=pacsv.ReadOptions(column_names=self.header, use_threads=True),
+                convert_options=pacsv.ConvertOptions(
+                    include_columns=self._columns,
+                    column_types={c: pa.string() for c in self._columns},
+                    strings_can_be_null=True,
+                ),
+            )
+        except (pa.ArrowInvalid, ValueError) as e:
+            n = block.count(b"\n") or 1
+            self.issues.setdefault("*", {})["parse"] = self.issues.get("*", {}).get("parse", 0) + n
+            if len(self.errors) < self.max_errors:
+                self.errors.append({"row": self.rows + 2, "column": "*", "rule": "parse", "value": str(e)[:200]})
+            self.rows += n
+            self.invalid_rows += n
+            return
+
+        schema = self.schema
+        bad_rows = pa.array([False] * table.num_rows) if table.num_rows else None
+        for c in self._columns:
+            values = table.column(c).combine_chunks()
+            missing = values.is_null()
+            bad = None
+            if c in schema.not_null:
+                self._record(c, "missing", missing, values)
+                bad = missing
+            dtype = schema.dtypes.get(c)
+            ok, nums = pc.invert(missing), None
+            if dtype in TYPE_PATTERNS:
+                # cazul obișnuit: tot blocul se convertește direct; regex doar dacă ceva nu trece
+                try:
+                    nums = pc.cast(values, pa.int64() if dtype == "int64" else pa.float64())
+                except pa.ArrowInvalid:
+                    ok = pc.match_substring_regex(values, TYPE_PATTERNS[dtype])
+            elif dtype == "bool":
+                ok = pc.is_in(values, value_set=pa.array(BOOL_VALUES))
+            ok = pc.fill_null(ok, False)
+            wrong_type = pc.and_(pc.invert(missing), pc.invert(ok))
+            self._record(c, "type", wrong_type, values)
+            bad = wrong_type if bad is None else pc.or_(bad, wrong_type)
+
+            domain = schema.domains.get(c)
+            if domain:
+                if isinstance(domain[0], str):
+                    allowed = pc.is_in(values, value_set=pa.array(domain))
+                else:   # coduri numerice: "05" == 5
+                    if nums is None:
+                        nums = pc.cast(pc.if_else(ok, pc.utf8_trim_whitespace(values), None), pa.float64())
+                    allowed = pc.is_in(pc.cast(nums, pa.float64()), value_set=pa.array([float(v) for v in domain]))
+                outside = pc.and_(ok, pc.invert(pc.fill_null(allowed, False)))
+                self._record(c, "domain", outside, values)
+                bad = pc.or_(bad, outside)
+            bad_rows = pc.or_(bad_rows, bad)
+
+        self.rows += table.num_rows
+        if bad_rows is not None:
+            self.invalid_rows += pc.sum(bad_rows).as_py() or 0
@@ -13,9 +13,17 @@ const ComplianceChecker = () => {
   useEffect(() => {
     const fetchFiles = async () => {
       try {
-        const res = await axios.get(`${API_BASE}/files/all`);
+        // /files/all is keyset-paginated: follow next_cursor until the last page
+        const raw: any[] = [];
+        let cursor: string | null = null;
+        do {
+          const res = await axios.get(`${API_BASE}/files/all`, {
+            params: { limit: 1000, ...(cursor ? { cursor } : {}) },
+          });
+          raw.push(...(res?.data?.files ?? []));
+          cursor = res?.data?.next_cursor ?? null;
+        } while (cursor);
         // Map backend response to ComplianceFile[] structure
-        const raw = res?.data?.files ?? [];
         const mapped: ComplianceFile[] = raw.map((f: any) => ({
           id: String(f.id),
           fileName: f.name ?? f.fileName ?? String(f.id),
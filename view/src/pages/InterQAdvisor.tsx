@@ -66,8 +66,16 @@ const InterQAdvisor = () => {
   const loadReports = async () => {
     setReportsLoading(true);
     try {
-      const res = await axios.get(`${API_BASE}/reports/all`);
-      const raw = res?.data?.reports ?? [];
+      // /reports/all is keyset-paginated: follow next_cursor until the last page
+      const raw: any[] = [];
+      let cursor: string | null = null;
+      do {
+        const res = await axios.get(`${API_BASE}/reports/all`, {
+          params: { limit: 1000, ...(cursor ? { cursor } : {}) },
+        });
+        raw.push(...(res?.data?.reports ?? []));
+        cursor = res?.data?.next_cursor ?? null;
+      } while (cursor);
 
       // Map to table rows + enrich with downgraded count from files/{source_file}
       const rows: Report[] = await Promise.all(